@@ -0,0 +1,118 @@
+import os
+import sys
+from tempfile import mkdtemp
+
+import click
+
+
+@click.command()
+@click.option(
+    "--database-url",
+    help="Database to run against. Defaults to a scratch SQLite file.",
+)
+@click.option("--iterations", default=200, show_default=True)
+@click.option("--warmup", default=20, show_default=True)
+@click.option(
+    "--suite",
+    "suites",
+    multiple=True,
+    type=click.Choice(["routes", "socket", "repositories", "primitives"]),
+    help="Suites to run. Defaults to all.",
+)
+@click.option("--output", default="benchmark-results.json", show_default=True)
+@click.option("--baseline", help="Report to compare the results with.")
+@click.option(
+    "--threshold",
+    default=0.2,
+    show_default=True,
+    help="Allowed relative slowdown before a benchmark counts as a regression.",
+)
+def main(
+    database_url: str | None,
+    iterations: int,
+    warmup: int,
+    suites: tuple[str, ...],
+    output: str,
+    baseline: str | None,
+    threshold: float,
+):
+    """
+    Benchmark the API routes, repositories and hot helpers.
+
+    Run against a scratch database: benchmark users are inserted and left behind.
+    """
+    # The settings are read on import, so the database has to be chosen first.
+    os.environ["DATABASE_URL"] = database_url or f"sqlite:///{mkdtemp()}/bench.db"
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+
+    from benchmarks.environment import Seeder, SocketTransport, TestClientTransport
+    from benchmarks.harness import BenchmarkReport, compare
+    from benchmarks.primitives import run_primitive_benchmarks
+    from benchmarks.repositories import run_repository_benchmarks
+    from benchmarks.routes import run_route_benchmarks
+    from src.config import config
+    from src.extensions import db
+    from src.repositories import UserRepository
+    from src.server import create_app
+
+    suites = suites or ("routes", "socket", "repositories", "primitives")
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        report = BenchmarkReport(database=db.engine.dialect.name)
+
+    seeder = Seeder(app)
+    admin = seeder.next_user()
+    with app.app_context():
+        admin_id = UserRepository().create(attributes=admin).id
+    config.ADMIN_USER_IDS = [*config.ADMIN_USER_IDS, admin_id]
+
+    for suite in suites:
+        click.echo(f"Running {suite} benchmarks...", err=True)
+        if suite == "primitives":
+            results = run_primitive_benchmarks(iterations, warmup)
+        elif suite == "repositories":
+            results = run_repository_benchmarks(app, seeder, iterations, warmup)
+        else:
+            transport = (
+                SocketTransport(app) if suite == "socket" else TestClientTransport(app)
+            )
+            try:
+                results = run_route_benchmarks(
+                    app, transport, seeder, admin, iterations, warmup
+                )
+            finally:
+                transport.close()
+
+        for result in results:
+            report.add(result)
+            click.echo(
+                f"{result.name:<60} {result.ops_per_sec:>10.1f} op/s"
+                f"  p50 {result.p50_ms:>8.2f} ms"
+                f"  p95 {result.p95_ms:>8.2f} ms"
+                f"  p99 {result.p99_ms:>8.2f} ms"
+                + (
+                    f"  peak {result.peak_kib:>8.1f} KiB"
+                    if result.peak_kib is not None
+                    else ""
+                )
+            )
+
+    report.save(output)
+    click.echo(f"Results saved to {output}.", err=True)
+
+    if baseline:
+        regressions = compare(report, BenchmarkReport.load(baseline), threshold)
+        for regression in regressions:
+            click.echo(
+                f"REGRESSION {regression.name}: {regression.metric} "
+                f"{regression.baseline:.2f} -> {regression.current:.2f} "
+                f"({regression.change:+.0%})",
+                err=True,
+            )
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import json
+import logging
+from abc import ABC, abstractmethod
+from http.client import HTTPConnection
+from random import randrange
+from threading import Thread
+from uuid import uuid4
+
+from flask import Flask
+from werkzeug.security import generate_password_hash
+from werkzeug.serving import make_server
+
+from src.extensions import db
+from src.models import User
+
+PASSWORD = "Bench@123"
+
+
+class Transport(ABC):
+    """
+    Issues requests against the app and returns the status code.
+    """
+
+    name = ""
+
+    @abstractmethod
+    def request(self, method: str, path: str, body: dict | None = None) -> int:
+        """
+        Issue a request, with `body` as JSON, and return its status code.
+        """
+
+    def close(self) -> None:
+        pass
+
+
+class TestClientTransport(Transport):
+    """
+    Requests through the Flask test client, without any networking.
+    """
+
+    name = "client"
+
+    def __init__(self, app: Flask) -> None:
+        self.client = app.test_client()
+
+    def request(self, method: str, path: str, body: dict | None = None) -> int:
+        response = self.client.open(path, method=method, json=body)
+        response.close()
+        return response.status_code
+
+
+class SocketTransport(Transport):
+    """
+    Requests over a keep-alive HTTP connection to a threaded server on a
+    local port.
+    """
+
+    name = "socket"
+
+    def __init__(self, app: Flask) -> None:
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)
+        self.server = make_server("127.0.0.1", 0, app, threaded=True)
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.connection = HTTPConnection("127.0.0.1", self.server.server_port)
+        self.cookie: str | None = None
+
+    def request(self, method: str, path: str, body: dict | None = None) -> int:
+        headers = {"Cookie": self.cookie} if self.cookie else {}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+
+        self.connection.request(method, path, body=payload, headers=headers)
+        response = self.connection.getresponse()
+        response.read()
+
+        cookie = response.getheader("Set-Cookie")
+        if cookie:
+            self.cookie = cookie.split(";", 1)[0]
+        return response.status
+
+    def close(self) -> None:
+        self.connection.close()
+        self.server.shutdown()
+
+
+class Seeder:
+    """
+    Inserts benchmark users with unique usernames and phones, so repeated
+    runs against the same database do not collide.
+    """
+
+    def __init__(self, app: Flask) -> None:
+        self.app = app
+        self.run = uuid4().hex[:8]
+        self.counter = randrange(10**8)
+        self.password = generate_password_hash(PASSWORD)
+
+    def next_user(self) -> dict[str, str]:
+        """
+        Attributes of a new, unique user.
+        """
+        self.counter += 1
+        return {
+            "username": f"bench_{self.run}_{self.counter}",
+            "phone": f"09{self.counter % 10**9:09d}",
+            "password": self.password,
+        }
+
+    def users(self, count: int) -> list[int]:
+        """
+        Insert `count` users sharing one precomputed password hash.
+
+        Returns:
+            list[int]: IDs of the inserted users.
+        """
+        with self.app.app_context():
+            users = [User(**self.next_user()) for _ in range(count)]
+            db.session.add_all(users)
+            db.session.commit()
+            return [user.id for user in users]
@@ -0,0 +1,129 @@
+import json
+import platform
+import tracemalloc
+from pathlib import Path
+from time import perf_counter, perf_counter_ns, strftime
+from typing import Callable
+
+from pydantic import BaseModel, Field
+
+from src.capture import percentile
+
+
+class BenchmarkResult(BaseModel):
+    name: str = Field(examples=["route:GET /api/v1/users"])
+    iterations: int = Field(examples=[200])
+    ops_per_sec: float = Field(description="Sequential throughput.")
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    peak_kib: float | None = Field(
+        None, description="Peak memory allocated by one call, when traced."
+    )
+
+
+class BenchmarkReport(BaseModel):
+    created: str = Field(default_factory=lambda: strftime("%Y-%m-%d %H:%M:%S"))
+    python: str = Field(default_factory=platform.python_version)
+    database: str = Field(examples=["postgresql"])
+    results: dict[str, BenchmarkResult] = Field(default_factory=dict)
+
+    def add(self, result: BenchmarkResult) -> None:
+        self.results[result.name] = result
+
+    def save(self, path: str) -> None:
+        Path(path).write_text(self.model_dump_json(indent=2))
+
+    @classmethod
+    def load(cls, path: str) -> "BenchmarkReport":
+        return cls.model_validate(json.loads(Path(path).read_text()))
+
+
+class Regression(BaseModel):
+    name: str
+    metric: str
+    baseline: float
+    current: float
+    change: float = Field(description="Relative change, 0.25 meaning 25% worse.")
+
+
+def measure(
+    name: str,
+    fn: Callable[[int], object],
+    iterations: int,
+    warmup: int = 0,
+    trace_memory: bool = False,
+) -> BenchmarkResult:
+    """
+    Call `fn(i)` `warmup` times, then time `iterations` calls.
+
+    Each call gets a distinct index, so write benchmarks can pick unique rows.
+    With `trace_memory`, one more untimed call, repeating the last index,
+    records the peak memory it allocates.
+    """
+    for i in range(warmup):
+        fn(i)
+
+    timings = []
+    start_total = perf_counter()
+    for i in range(warmup, warmup + iterations):
+        start = perf_counter_ns()
+        fn(i)
+        timings.append((perf_counter_ns() - start) / 1_000_000)
+    elapsed = perf_counter() - start_total
+
+    peak_kib = None
+    if trace_memory:
+        tracemalloc.start()
+        fn(warmup + iterations - 1)
+        peak_kib = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+
+    timings.sort()
+    return BenchmarkResult(
+        name=name,
+        iterations=iterations,
+        ops_per_sec=iterations / elapsed if elapsed else 0.0,
+        mean_ms=sum(timings) / len(timings),
+        p50_ms=percentile(timings, 0.50),
+        p95_ms=percentile(timings, 0.95),
+        p99_ms=percentile(timings, 0.99),
+        peak_kib=peak_kib,
+    )
+
+
+def compare(
+    report: BenchmarkReport, baseline: BenchmarkReport, threshold: float
+) -> list[Regression]:
+    """
+    List the benchmarks whose p95 latency grew, or whose throughput dropped,
+    by more than `threshold` compared with the baseline.
+    """
+    regressions = []
+    for name, result in report.results.items():
+        previous = baseline.results.get(name)
+        if previous is None:
+            continue
+
+        if previous.p95_ms and result.p95_ms > previous.p95_ms * (1 + threshold):
+            regressions.append(
+                Regression(
+                    name=name,
+                    metric="p95_ms",
+                    baseline=previous.p95_ms,
+                    current=result.p95_ms,
+                    change=result.p95_ms / previous.p95_ms - 1,
+                )
+            )
+        if result.ops_per_sec < previous.ops_per_sec * (1 - threshold):
+            regressions.append(
+                Regression(
+                    name=name,
+                    metric="ops_per_sec",
+                    baseline=previous.ops_per_sec,
+                    current=result.ops_per_sec,
+                    change=1 - result.ops_per_sec / previous.ops_per_sec,
+                )
+            )
+    return regressions
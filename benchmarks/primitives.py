@@ -0,0 +1,64 @@
+import json
+
+from benchmarks.environment import PASSWORD
+from benchmarks.harness import BenchmarkResult, measure
+from src.mixins import utc_to_jalali
+from src.models import User
+from src.schemas import PaginationResponse, UserResponse
+from src.utils import hash_password, verify_password
+
+
+def run_primitive_benchmarks(iterations: int, warmup: int) -> list[BenchmarkResult]:
+    """
+    Time password hashing, Jalali timestamps and response serialization.
+    """
+    password_hash = hash_password(PASSWORD)
+    hash_iterations = max(iterations // 10, 1)
+    hash_warmup = max(warmup // 10, 1)
+
+    rows = [
+        User(
+            id=i,
+            username=f"user{i}",
+            phone=f"09{i:09d}",
+            password=password_hash,
+            created="1404-02-29 11:26:15",
+            version=1,
+        )
+        for i in range(100)
+    ]
+
+    def validate_page(i: int) -> PaginationResponse[UserResponse]:
+        return PaginationResponse[UserResponse](
+            limit=100,
+            offset=0,
+            total=len(rows),
+            items=[UserResponse.model_validate(row) for row in rows],
+        )
+
+    page = validate_page(0)
+
+    return [
+        measure(
+            "primitive:hash_password",
+            lambda i: hash_password(PASSWORD),
+            hash_iterations,
+            hash_warmup,
+        ),
+        measure(
+            "primitive:verify_password",
+            lambda i: verify_password(password_hash, PASSWORD),
+            hash_iterations,
+            hash_warmup,
+        ),
+        measure(
+            "primitive:utc_to_jalali", lambda i: utc_to_jalali(), iterations, warmup
+        ),
+        measure("serialization:validate_page_100", validate_page, iterations, warmup),
+        measure(
+            "serialization:dump_page_100",
+            lambda i: json.dumps(page.model_dump()),
+            iterations,
+            warmup,
+        ),
+    ]
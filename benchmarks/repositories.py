@@ -0,0 +1,110 @@
+from flask import Flask
+
+from benchmarks.environment import Seeder
+from benchmarks.harness import BenchmarkResult, measure
+from src.controllers import UserController
+from src.extensions import db
+from src.repositories import UserRepository
+from src.schemas import PaginationResponse, UserFilterParams, UserResponse
+
+
+def run_repository_benchmarks(
+    app: Flask, seeder: Seeder, iterations: int, warmup: int
+) -> list[BenchmarkResult]:
+    """
+    Time the BaseRepository operations through UserRepository, and the
+    users page built from ORM instances against the one built from rows.
+    """
+    repository = UserRepository()
+    controller = UserController()
+    total = iterations + warmup
+    user_ids = seeder.users(total)
+    victim_ids = seeder.users(total)
+
+    with app.app_context():
+        users = [repository.get_by_id(id_=user_id) for user_id in user_ids]
+        victims = [repository.get_by_id(id_=user_id) for user_id in victim_ids]
+        usernames = [user.username for user in users]
+        filter_params = UserFilterParams(limit=100)
+
+        def orm_page(i: int) -> PaginationResponse[UserResponse]:
+            users, total = repository.get_filtered_users(filter_params=filter_params)
+            return PaginationResponse[UserResponse](
+                limit=filter_params.limit,
+                offset=filter_params.offset,
+                total=total,
+                items=[UserResponse.model_validate(user) for user in users],
+            )
+
+        results = [
+            measure(
+                "repository:create",
+                lambda i: repository.create(attributes=seeder.next_user()),
+                iterations,
+                warmup,
+            ),
+            measure(
+                "repository:get_by_id",
+                lambda i: repository.get_by_id(id_=user_ids[i]),
+                iterations,
+                warmup,
+            ),
+            measure(
+                "repository:get_by_username",
+                lambda i: repository.get_by_username(username=usernames[i]),
+                iterations,
+                warmup,
+            ),
+            measure(
+                "repository:update",
+                lambda i: repository.update(
+                    model=users[i], attributes={"username": f"{usernames[i]}_u"}
+                ),
+                iterations,
+                warmup,
+            ),
+            measure(
+                "repository:get_filtered_users",
+                lambda i: repository.get_filtered_users(filter_params=filter_params),
+                iterations,
+                warmup,
+            ),
+            measure(
+                "repository:get_filtered_user_rows",
+                lambda i: repository.get_filtered_user_rows(
+                    filter_params=filter_params
+                ),
+                iterations,
+                warmup,
+            ),
+            measure("page:orm_100", orm_page, iterations, warmup, trace_memory=True),
+            measure(
+                "page:rows_100",
+                lambda i: controller.get_users(filter_params=filter_params),
+                iterations,
+                warmup,
+                trace_memory=True,
+            ),
+            measure(
+                "page:json_100",
+                lambda i: controller.get_users_json(filter_params=filter_params),
+                iterations,
+                warmup,
+                trace_memory=True,
+            ),
+            measure(
+                "repository:count",
+                lambda i: repository._count(repository._query()),
+                iterations,
+                warmup,
+            ),
+            measure(
+                "repository:delete",
+                lambda i: repository.delete(model=victims[i]),
+                iterations,
+                warmup,
+            ),
+        ]
+        db.session.remove()
+
+    return results
@@ -0,0 +1,151 @@
+from typing import Callable, NamedTuple
+
+import click
+from flask import Flask
+
+from benchmarks.environment import PASSWORD, Seeder, Transport
+from benchmarks.harness import BenchmarkResult, measure
+
+
+class RouteCase(NamedTuple):
+    method: str
+    rule: str
+    build: Callable[[int], tuple[str, dict | None]]
+    expected: int
+    # Share of the configured iterations, for routes dominated by hashing.
+    scale: float = 1.0
+
+
+def route_cases(seeder: Seeder, admin: dict, iterations: int) -> list[RouteCase]:
+    """
+    One case per route, in an order that keeps the session logged in until
+    the logout case.
+    """
+    user_ids = seeder.users(100)
+    victims = seeder.users(iterations * 2)
+
+    def register(i: int):
+        user = seeder.next_user()
+        return "/api/v1/users", {**user, "password": PASSWORD}
+
+    return [
+        RouteCase(
+            "POST",
+            "/api/v1/auth/login",
+            lambda i: (
+                "/api/v1/auth/login",
+                {"username": admin["username"], "password": PASSWORD},
+            ),
+            200,
+            scale=0.1,
+        ),
+        RouteCase(
+            "GET", "/api/v1/users", lambda i: ("/api/v1/users?limit=100", None), 200
+        ),
+        RouteCase(
+            "GET",
+            "/api/v1/users/<int:user_id>",
+            lambda i: (f"/api/v1/users/{user_ids[i % len(user_ids)]}", None),
+            200,
+        ),
+        RouteCase("POST", "/api/v1/users", register, 201, scale=0.1),
+        RouteCase(
+            "PUT",
+            "/api/v1/users/<int:user_id>",
+            lambda i: (
+                f"/api/v1/users/{user_ids[i % len(user_ids)]}",
+                {"username": seeder.next_user()["username"]},
+            ),
+            200,
+        ),
+        RouteCase(
+            "DELETE",
+            "/api/v1/users/<int:user_id>",
+            lambda i: (f"/api/v1/users/{victims[i]}", None),
+            204,
+        ),
+        RouteCase(
+            "POST",
+            "/api/v1/batch",
+            lambda i: (
+                "/api/v1/batch",
+                {
+                    "requests": [
+                        {"method": "GET", "path": f"/api/v1/users/{user_id}"}
+                        for user_id in user_ids[:5]
+                    ]
+                },
+            ),
+            200,
+        ),
+        RouteCase(
+            "GET",
+            "/api/v1/diagnostics/memory",
+            lambda i: ("/api/v1/diagnostics/memory?limit=5", None),
+            200,
+            scale=0.1,
+        ),
+        RouteCase(
+            "DELETE",
+            "/api/v1/auth/logout",
+            lambda i: ("/api/v1/auth/logout", None),
+            204,
+        ),
+    ]
+
+
+def check_coverage(app: Flask, cases: list[RouteCase]) -> None:
+    """
+    Warn about v1 routes that have no benchmark case.
+    """
+    covered = {(case.rule, case.method) for case in cases}
+    for rule in app.url_map.iter_rules():
+        if not rule.rule.startswith("/api/v1"):
+            continue
+        for method in rule.methods - {"HEAD", "OPTIONS"}:
+            if (rule.rule, method) not in covered:
+                click.echo(f"warning: no benchmark for {method} {rule.rule}", err=True)
+
+
+def run_route_benchmarks(
+    app: Flask,
+    transport: Transport,
+    seeder: Seeder,
+    admin: dict,
+    iterations: int,
+    warmup: int,
+) -> list[BenchmarkResult]:
+    """
+    Time every v1 route through the given transport.
+    """
+    status = transport.request(
+        "POST",
+        "/api/v1/auth/login",
+        {"username": admin["username"], "password": PASSWORD},
+    )
+    if status != 200:
+        raise click.ClickException(f"Benchmark login failed with {status}.")
+
+    cases = route_cases(seeder, admin, iterations + warmup)
+    check_coverage(app, cases)
+
+    results = []
+    for case in cases:
+
+        def call(i: int, case: RouteCase = case) -> None:
+            path, body = case.build(i)
+            status = transport.request(case.method, path, body)
+            if status != case.expected:
+                raise click.ClickException(
+                    f"{case.method} {path} returned {status}, expected {case.expected}."
+                )
+
+        results.append(
+            measure(
+                f"route:{transport.name}:{case.method} {case.rule}",
+                call,
+                iterations=max(int(iterations * case.scale), 1),
+                warmup=max(int(warmup * case.scale), 1),
+            )
+        )
+    return results
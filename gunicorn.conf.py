@@ -0,0 +1,44 @@
+from src.config import config as app_config
+from src.metrics import clear_metrics, metrics
+from src.serving import check_signing_keys, dispose_engines, prewarm_engines
+
+wsgi_app = "src.server:app"
+bind = f"{app_config.HOST}:{app_config.PORT}"
+
+# Build the app once in the master; workers inherit it on fork. SIGHUP therefore
+# restarts workers with the same code, settings and signing keys; deploying new
+# ones takes a binary upgrade: SIGUSR2, then SIGWINCH and SIGQUIT to the old master.
+preload_app = True
+
+worker_class = "gthread"
+workers = app_config.WORKERS
+threads = app_config.WORKER_THREADS
+
+# Recycle workers periodically to bound memory growth.
+max_requests = app_config.WORKER_MAX_REQUESTS
+max_requests_jitter = app_config.WORKER_MAX_REQUESTS_JITTER
+
+# On SIGTERM, SIGHUP or SIGQUIT, workers finish in-flight requests within this window.
+graceful_timeout = app_config.WORKER_GRACEFUL_TIMEOUT
+timeout = app_config.WORKER_TIMEOUT
+
+
+def on_starting(server):
+    check_signing_keys(server.cfg.workers)
+    clear_metrics()
+
+
+def post_fork(server, worker):
+    dispose_engines(server.app.wsgi())
+
+
+def post_worker_init(worker):
+    prewarm_engines(worker.wsgi)
+
+
+def worker_exit(server, worker):
+    metrics.flush(force=True)
+
+
+def child_exit(server, worker):
+    metrics.retire(worker.pid)
@@ -90,13 +90,28 @@ def run_migrations_online():
                 directives[:] = []
                 logger.info("No changes in schema detected.")
 
+    connectable = get_engine()
+
+    # skip indexes built only on Postgres, such as BRIN, when comparing
+    # the models with another database
+    def include_object(object, name, type_, reflected, compare_to):
+        if type_ == "index" and connectable.dialect.name != "postgresql":
+            return not object.dialect_options["postgresql"]["using"]
+        return True
+
     conf_args = current_app.extensions["migrate"].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
-
-    connectable = get_engine()
+    if conf_args.get("include_object") is None:
+        conf_args["include_object"] = include_object
 
     with connectable.connect() as connection:
+        # batch mode recreates SQLite tables, which foreign keys referencing
+        # them must not block; the pragma only applies outside a transaction
+        sqlite = connection.dialect.name == "sqlite"
+        if sqlite:
+            connection.connection.driver_connection.execute("PRAGMA foreign_keys = OFF")
+
         context.configure(
             connection=connection, target_metadata=get_metadata(), **conf_args
         )
@@ -104,6 +119,9 @@ def run_migrations_online():
         with context.begin_transaction():
             context.run_migrations()
 
+        if sqlite:
+            connection.connection.driver_connection.execute("PRAGMA foreign_keys = ON")
+
 
 if context.is_offline_mode():
     run_migrations_offline()
@@ -0,0 +1,28 @@
+"""add_users_version
+
+Revision ID: 8c1f2a7d9e30
+Revises: 4018509c0ce4
+Create Date: 2025-06-02 10:12:44.518203
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8c1f2a7d9e30"
+down_revision = "4018509c0ce4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("version", sa.Integer(), server_default="1", nullable=False)
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.drop_column("version")
@@ -0,0 +1,76 @@
+"""tune_indexes
+
+Revision ID: b3e5d1c7a912
+Revises: 8c1f2a7d9e30
+Create Date: 2025-06-09 14:27:05.731942
+
+Drops the indexes duplicating the primary keys, and ix_logs_user_id, which
+ix_logs_user_id_created covers. Adds indexes for ordering users by creation,
+listing a user's logs by time, and a BRIN index for time ranges over logs.
+
+On Postgres the indexes are built and dropped CONCURRENTLY, outside a
+transaction, so writes are not blocked; a failed concurrent build leaves an
+INVALID index to drop before retrying.
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b3e5d1c7a912"
+down_revision = "8c1f2a7d9e30"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    postgres = op.get_bind().dialect.name == "postgresql"
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_users_created",
+            "users",
+            ["created"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_logs_user_id_created",
+            "logs",
+            ["user_id", "created"],
+            postgresql_concurrently=True,
+        )
+        if postgres:
+            op.create_index(
+                "ix_logs_created_brin",
+                "logs",
+                ["created"],
+                postgresql_using="brin",
+                postgresql_concurrently=True,
+            )
+
+        op.drop_index(
+            "ix_logs_user_id", table_name="logs", postgresql_concurrently=True
+        )
+        op.drop_index("ix_logs_id", table_name="logs", postgresql_concurrently=True)
+        op.drop_index("ix_users_id", table_name="users", postgresql_concurrently=True)
+
+
+def downgrade():
+    postgres = op.get_bind().dialect.name == "postgresql"
+
+    with op.get_context().autocommit_block():
+        op.create_index("ix_users_id", "users", ["id"], postgresql_concurrently=True)
+        op.create_index("ix_logs_id", "logs", ["id"], postgresql_concurrently=True)
+        op.create_index(
+            "ix_logs_user_id", "logs", ["user_id"], postgresql_concurrently=True
+        )
+
+        if postgres:
+            op.drop_index(
+                "ix_logs_created_brin", table_name="logs", postgresql_concurrently=True
+            )
+        op.drop_index(
+            "ix_logs_user_id_created", table_name="logs", postgresql_concurrently=True
+        )
+        op.drop_index(
+            "ix_users_created", table_name="users", postgresql_concurrently=True
+        )
@@ -0,0 +1,76 @@
+"""cascade_user_deletes
+
+Revision ID: c7a4e2f19b58
+Revises: b3e5d1c7a912
+Create Date: 2025-06-16 11:03:52.164087
+
+Makes the database delete a user's logs with the user, and adds users.deleted
+for users whose logs are purged in the background.
+
+On Postgres the new foreign key is added NOT VALID and committed, then
+validated in a transaction of its own, so checking the existing logs does not
+block writes to them.
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c7a4e2f19b58"
+down_revision = "b3e5d1c7a912"
+branch_labels = None
+depends_on = None
+
+# SQLite's foreign keys are unnamed, batch mode needs names to replace them.
+naming_convention = {
+    "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"
+}
+
+
+def replace_foreign_key(ondelete):
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_constraint("logs_user_id_fkey", "logs", type_="foreignkey")
+        op.create_foreign_key(
+            "logs_user_id_fkey",
+            "logs",
+            "users",
+            ["user_id"],
+            ["id"],
+            ondelete=ondelete,
+            postgresql_not_valid=True,
+        )
+        # Commits the swap first, releasing its ACCESS EXCLUSIVE lock; VALIDATE
+        # only takes a SHARE UPDATE EXCLUSIVE lock, which lets writes through.
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TABLE logs VALIDATE CONSTRAINT logs_user_id_fkey")
+        return
+
+    with op.batch_alter_table(
+        "logs", naming_convention=naming_convention, recreate="always"
+    ) as batch_op:
+        batch_op.drop_constraint("fk_logs_user_id_users", type_="foreignkey")
+        batch_op.create_foreign_key(
+            "fk_logs_user_id_users", "users", ["user_id"], ["id"], ondelete=ondelete
+        )
+
+
+def upgrade():
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("deleted", sa.String(length=20), nullable=True))
+        batch_op.create_index(
+            "ix_users_deleted",
+            ["deleted"],
+            unique=False,
+            postgresql_where=sa.text("deleted IS NOT NULL"),
+            sqlite_where=sa.text("deleted IS NOT NULL"),
+        )
+
+    replace_foreign_key(ondelete="CASCADE")
+
+
+def downgrade():
+    replace_foreign_key(ondelete=None)
+
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.drop_index("ix_users_deleted")
+        batch_op.drop_column("deleted")
@@ -0,0 +1,223 @@
+import heapq
+from dataclasses import dataclass, field
+from enum import IntEnum
+from itertools import count
+from math import sqrt
+from threading import Event, Lock
+from time import perf_counter
+from typing import Callable
+
+from flask import Flask, current_app, g, request
+
+from src.config import config
+from src.exceptions import ServiceUnavailableException
+from src.metrics import metrics
+from src.utils.deadlines import current_deadline
+
+# Probes and scrapes must be answered however loaded the worker is.
+EXEMPT_BLUEPRINTS = ("health", "metrics")
+
+shed_requests = metrics.counter(
+    "http_requests_shed_total", "Requests shed by admission control."
+)
+
+
+class Priority(IntEnum):
+    """
+    Admission priority of a request; lower values are admitted first and shed last.
+    """
+
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+def priority(level: Priority) -> Callable:
+    """
+    Set the admission priority of a view, by default HIGH for GET and HEAD
+    requests and NORMAL for the others.
+    """
+
+    def decorator(view: Callable) -> Callable:
+        view.admission_priority = level
+        return view
+
+    return decorator
+
+
+class GradientLimit:
+    """
+    Concurrency limit following observed latency.
+
+    Every route learns its baseline latency while the worker is not busy,
+    so queueing does not inflate it. While at least half of the limit is in
+    use, the limit grows by about its square root per request as long as
+    requests take up to `tolerance` times their route's baseline, and beyond
+    that shrinks in proportion to the slowdown, by at most half per request.
+    Changes are smoothed, so a single slow request barely moves it.
+    """
+
+    def __init__(
+        self,
+        initial: float,
+        min_limit: int,
+        max_limit: int,
+        tolerance: float,
+        smoothing: float = 0.2,
+        baseline_smoothing: float = 0.05,
+    ) -> None:
+        self.value = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.baseline_smoothing = baseline_smoothing
+        self._baselines: dict[str, float] = {}
+
+    def update(self, route: str, latency: float, in_flight: int) -> None:
+        busy = in_flight * 2 >= self.value
+        baseline = self._baselines.get(route)
+        if baseline is None or not busy:
+            baseline = latency if baseline is None else baseline
+            baseline += (latency - baseline) * self.baseline_smoothing
+            self._baselines[route] = baseline
+        if not busy:
+            return
+
+        gradient = 1.0
+        if latency > 0:
+            gradient = max(0.5, min(1.0, self.tolerance * baseline / latency))
+        target = self.value * gradient
+        if gradient == 1.0:
+            target += sqrt(self.value)
+
+        value = self.value * (1 - self.smoothing) + target * self.smoothing
+        self.value = max(self.min_limit, min(self.max_limit, value))
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    order: int
+    event: Event = field(default_factory=Event, compare=False)
+    admitted: bool = field(default=False, compare=False)
+    cancelled: bool = field(default=False, compare=False)
+
+
+class AdmissionController:
+    """
+    Admits requests while fewer than the limit are in flight. The others
+    wait, highest priority first, for a bounded time before being shed.
+    """
+
+    def __init__(self, limit: GradientLimit) -> None:
+        self.limit = limit
+        self.in_flight = 0
+        self._waiters: list[_Waiter] = []
+        self._order = count()
+        self._lock = Lock()
+
+    def acquire(self, level: Priority, timeout: float) -> bool:
+        """
+        Wait up to `timeout` seconds for a slot.
+
+        Returns:
+            bool: Whether the request was admitted.
+        """
+        with self._lock:
+            if self.in_flight < self.limit.value and not any(
+                waiter.priority <= level and not waiter.cancelled
+                for waiter in self._waiters
+            ):
+                self.in_flight += 1
+                return True
+            waiter = _Waiter(level, next(self._order))
+            heapq.heappush(self._waiters, waiter)
+
+        waiter.event.wait(timeout)
+
+        with self._lock:
+            if not waiter.admitted:
+                waiter.cancelled = True
+            return waiter.admitted
+
+    def release(self, route: str, latency: float) -> None:
+        """
+        Free a slot, feeding the request's latency to the limit.
+        """
+        with self._lock:
+            self.limit.update(route, latency, self.in_flight)
+            self.in_flight -= 1
+            while self._waiters and self.in_flight < self.limit.value:
+                waiter = heapq.heappop(self._waiters)
+                if waiter.cancelled:
+                    continue
+                waiter.admitted = True
+                self.in_flight += 1
+                waiter.event.set()
+
+
+def _max_limit() -> int:
+    return config.ADMISSION_MAX_LIMIT or config.WORKER_THREADS
+
+
+admission = AdmissionController(
+    GradientLimit(
+        initial=_max_limit(),
+        min_limit=config.ADMISSION_MIN_LIMIT,
+        max_limit=_max_limit(),
+        tolerance=config.ADMISSION_LATENCY_TOLERANCE,
+    )
+)
+
+
+def register_admission_control(app: Flask):
+    """
+    Attach request hooks to the app that limit its in-flight requests with
+    an adaptive limit, and shed requests that waited `ADMISSION_QUEUE_TIMEOUT`
+    seconds, or until their deadline, for a slot with `503 Service Unavailable`
+    and `Retry-After`.
+    Nothing is attached while `ADMISSION_ENABLED` is off.
+    """
+    if not config.ADMISSION_ENABLED:
+        return
+
+    @app.before_request
+    def admit_request():
+        if request.blueprint in EXEMPT_BLUEPRINTS:
+            return
+        # Batch sub-requests run on the slot their batch was admitted to.
+        if g.get("batch_item"):
+            return
+
+        view = current_app.view_functions.get(request.endpoint)
+        level = getattr(view, "admission_priority", None)
+        if level is None:
+            level = (
+                Priority.HIGH if request.method in ("GET", "HEAD") else Priority.NORMAL
+            )
+
+        # Waiting past the request's deadline would only admit it to time out.
+        timeout = config.ADMISSION_QUEUE_TIMEOUT
+        request_deadline = current_deadline()
+        if request_deadline is not None:
+            timeout = max(0.0, min(timeout, request_deadline.remaining()))
+
+        if not admission.acquire(level, timeout):
+            g.shed = True
+            shed_requests.inc(priority=level.name.lower())
+            raise ServiceUnavailableException(
+                message="Server is overloaded, retry later.",
+                retry_after=config.ADMISSION_RETRY_AFTER,
+            )
+        g.admitted_at = perf_counter()
+
+    @app.teardown_request
+    def release_request(exc):
+        g.pop("shed", None)
+        start = g.pop("admitted_at", None)
+        if start is None:
+            return
+
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        admission.release(route, perf_counter() - start)
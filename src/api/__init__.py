@@ -1,5 +1,6 @@
 from flask import Blueprint, Flask
 
+from src.api import health, metrics
 from src.api.v1 import create_v1_blueprint
 
 
@@ -8,3 +9,5 @@ def register_blueprints(app: Flask):
 
     v1_blueprint = create_v1_blueprint()
     app.register_blueprint(v1_blueprint, url_prefix="/api/v1")
+    app.register_blueprint(health.health_bp)
+    app.register_blueprint(metrics.metrics_bp)
@@ -0,0 +1,32 @@
+from http import HTTPStatus
+
+from flask import Blueprint
+
+from src.controllers import HealthController
+from src.schemas import LivenessResponse, ReadinessResponse
+
+health_bp = Blueprint("health", __name__)
+health_controller = HealthController()
+
+
+@health_bp.route("/healthz", methods=["GET"])
+def liveness():
+    """
+    Report that the worker is alive, without any I/O.
+    """
+    return LivenessResponse().model_dump(), HTTPStatus.OK
+
+
+@health_bp.route("/readyz", methods=["GET"])
+def readiness():
+    """
+    Report whether the worker is ready to receive traffic.
+    """
+    readiness_response: ReadinessResponse = health_controller.readiness()
+
+    status = (
+        HTTPStatus.OK
+        if readiness_response.status == "ok"
+        else HTTPStatus.SERVICE_UNAVAILABLE
+    )
+    return readiness_response.model_dump(), status
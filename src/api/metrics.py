@@ -0,0 +1,19 @@
+from http import HTTPStatus
+
+from flask import Blueprint
+
+from src.metrics import metrics
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    """
+    Expose the metrics of every worker in the Prometheus text format.
+    """
+    return (
+        metrics.render(),
+        HTTPStatus.OK,
+        {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+    )
@@ -1,6 +1,6 @@
 from flask import Blueprint
 
-from src.api.v1 import auth, users
+from src.api.v1 import auth, batch, diagnostics, users
 
 
 def create_v1_blueprint():
@@ -9,5 +9,7 @@ def create_v1_blueprint():
 
     bp.register_blueprint(users.user_bp, url_prefix="/users")
     bp.register_blueprint(auth.auth_bp, url_prefix="/auth")
+    bp.register_blueprint(batch.batch_bp, url_prefix="/batch")
+    bp.register_blueprint(diagnostics.diagnostics_bp, url_prefix="/diagnostics")
 
     return bp
@@ -4,12 +4,14 @@ from flask import Blueprint, request
 
 from src.controllers import AuthController
 from src.schemas.auth import LoginRequest
+from src.utils import query_budget
 
 auth_bp = Blueprint("auth", __name__)
 auth_controller = AuthController()
 
 
 @auth_bp.route("/login", methods=["POST"])
+@query_budget(2)
 def login():
     """
     Authenticate a user.
@@ -23,6 +25,7 @@ def login():
 
 
 @auth_bp.route("/logout", methods=["DELETE"])
+@query_budget(0)
 def logout():
     """
     Log out a user.
@@ -0,0 +1,42 @@
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+from flask import Blueprint, request, session
+
+from src.admission import Priority, priority
+from src.controllers import BatchController
+from src.logging import defer_logs
+from src.schemas import BatchRequest, BatchResponse, CreateLog
+
+batch_bp = Blueprint("batch", __name__)
+batch_controller = BatchController()
+
+
+@batch_bp.route("", methods=["POST"])
+@priority(Priority.LOW)
+def batch():
+    """
+    Dispatch several API calls in one request.
+    """
+    data = request.get_json()
+
+    batch_request = BatchRequest(**data)
+    batch_response: BatchResponse = batch_controller.execute(batch_request)
+
+    user_id = session.get("user_id")
+    if user_id:
+        defer_logs(
+            [
+                CreateLog(
+                    method=item.method,
+                    endpoint=urlsplit(item.path).path,
+                    status=str(response.status),
+                    user_id=user_id,
+                )
+                for item, response in zip(
+                    batch_request.requests, batch_response.responses
+                )
+            ]
+        )
+
+    return batch_response.model_dump(), HTTPStatus.OK
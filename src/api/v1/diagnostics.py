@@ -0,0 +1,26 @@
+from http import HTTPStatus
+
+from flask import Blueprint, request
+
+from src.admission import Priority, priority
+from src.controllers import DiagnosticsController
+from src.schemas import MemoryReport
+from src.utils import admin_required, query_budget
+
+diagnostics_bp = Blueprint("diagnostics", __name__)
+diagnostics_controller = DiagnosticsController()
+
+
+@diagnostics_bp.route("/memory", methods=["GET"])
+@query_budget(1)
+@priority(Priority.LOW)
+@admin_required
+def get_memory_report():
+    """
+    Report this worker's memory usage.
+    """
+    limit = int(request.args.get("limit", 20))
+
+    memory_report: MemoryReport = diagnostics_controller.memory_report(limit=limit)
+
+    return memory_report.model_dump(), HTTPStatus.OK
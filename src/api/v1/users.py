@@ -1,7 +1,10 @@
 from http import HTTPStatus
 
+import click
 from flask import Blueprint, request
+from werkzeug.http import quote_etag
 
+from src.config import config
 from src.controllers import UserController
 from src.schemas import (
     PaginationResponse,
@@ -10,13 +13,21 @@ from src.schemas import (
     UserFilterParams,
     UserResponse,
 )
-from src.utils import login_required
+from src.utils import (
+    cache_headers,
+    is_not_modified,
+    login_required,
+    query_budget,
+    request_deadline,
+)
 
-user_bp = Blueprint("users", __name__)
+user_bp = Blueprint("users", __name__, cli_group="users")
 user_controller = UserController()
 
 
 @user_bp.route("", methods=["GET"])
+@query_budget(3)
+@request_deadline(5)
 @login_required
 def get_users():
     """
@@ -44,25 +55,51 @@ def get_users():
 
     filter_params = UserFilterParams(**params)
 
+    if config.DATABASE_JSON_PAGES:
+        body = user_controller.get_users_json(filter_params=filter_params)
+
+        etag = user_controller.users_json_etag(body)
+        if is_not_modified(etag):
+            return "", HTTPStatus.NOT_MODIFIED, cache_headers(etag)
+
+        headers = {**cache_headers(etag), "Content-Type": "application/json"}
+        return body, HTTPStatus.OK, headers
+
     pagination_response: PaginationResponse[UserResponse] = user_controller.get_users(
         filter_params=filter_params
     )
 
-    return pagination_response.model_dump(), HTTPStatus.OK
+    etag = user_controller.users_etag(pagination_response)
+    if is_not_modified(etag):
+        return "", HTTPStatus.NOT_MODIFIED, cache_headers(etag)
+
+    return pagination_response.model_dump(), HTTPStatus.OK, cache_headers(etag)
 
 
 @user_bp.route("/<int:user_id>", methods=["GET"])
+@query_budget(3)
 @login_required
 def get_user(user_id: int):
     """
     Get a user by ID.
+
+    Conditional requests are answered from the version counter alone.
     """
+    if request.if_none_match:
+        etag = user_controller.get_user_etag(user_id)
+        if is_not_modified(etag):
+            return "", HTTPStatus.NOT_MODIFIED, cache_headers(etag)
+
     user_response: UserResponse = user_controller.get_user(user_id)
 
-    return user_response.model_dump(), HTTPStatus.OK
+    etag = user_controller.user_etag(
+        user_id=user_response.id, version=user_response.version
+    )
+    return user_response.model_dump(), HTTPStatus.OK, cache_headers(etag)
 
 
 @user_bp.route("", methods=["POST"])
+@query_budget(3)
 def register_user():
     """
     Register a new user.
@@ -79,23 +116,30 @@ def register_user():
 
 
 @user_bp.route("/<int:user_id>", methods=["PUT"])
+@query_budget(4)
 @login_required
 def update_user(user_id: int):
     """
-    Update an existing user.
+    Update an existing user, if its ETag matches the If-Match header when given.
     """
     user_data = request.get_json()
 
     update_user_request = UpdateUser(**user_data)
 
     updated_user: UserResponse = user_controller.update_user(
-        user_id=user_id, update_user_request=update_user_request
+        user_id=user_id,
+        update_user_request=update_user_request,
+        if_match=request.if_match,
     )
 
-    return updated_user.model_dump(), HTTPStatus.OK
+    etag = user_controller.user_etag(user_id=user_id, version=updated_user.version)
+
+    return updated_user.model_dump(), HTTPStatus.OK, {"ETag": quote_etag(etag)}
 
 
 @user_bp.route("/<int:user_id>", methods=["DELETE"])
+# Deferred deletes queue a purge job along with marking the user deleted.
+@query_budget(4)
 @login_required
 def delete_user(user_id: int):
     """
@@ -104,3 +148,13 @@ def delete_user(user_id: int):
     user_controller.delete_user(user_id=user_id)
 
     return {}, HTTPStatus.NO_CONTENT
+
+
+@user_bp.cli.command("purge")
+def purge_users():
+    """
+    Purge the users marked deleted along with their logs.
+    """
+    purged = user_controller.purge_deleted_users()
+
+    click.echo(f"Purged {purged} users.")
@@ -0,0 +1,293 @@
+import http.client
+import json
+import os
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from math import ceil
+from pathlib import Path
+from random import random
+from time import monotonic, perf_counter, sleep
+from urllib.parse import urlencode, urlsplit
+
+import click
+from flask import Flask, request
+from flask.cli import AppGroup
+
+from src.config import config
+
+REDACTED = "redacted"
+
+traffic_cli = AppGroup("traffic", help="Replay captured traffic.")
+
+
+class TrafficRecorder:
+    """
+    Appends sanitized request shapes to `CAPTURE_DIR/<pid>.jsonl`, one compact
+    JSON object per line:
+
+        {"t": started at, "m": method, "r": route, "p": path,
+         "q": query pairs, "s": status, "d": duration in ms}
+
+    Request bodies, headers and cookies are never recorded, and the values of
+    `CAPTURE_REDACTED_PARAMS` query parameters are replaced.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._file = None
+        self._path = None
+
+    def _open(self):
+        # Workers forked from a preloaded app must not share the parent's file.
+        path = Path(config.CAPTURE_DIR) / f"{os.getpid()}.jsonl"
+        if self._path != path:
+            if self._file is not None:
+                self._file.close()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(path, "a", buffering=1)
+            self._path = path
+        return self._file
+
+    def record(self, started: float, status: int, duration: float) -> None:
+        """
+        Record the current request, unless it matched no route.
+        """
+        if request.url_rule is None:
+            return
+
+        redacted = {name.lower() for name in config.CAPTURE_REDACTED_PARAMS}
+        line = json.dumps(
+            {
+                "t": round(started, 3),
+                "m": request.method,
+                "r": request.url_rule.rule,
+                "p": request.path,
+                "q": [
+                    [key, REDACTED if key.lower() in redacted else value]
+                    for key, value in request.args.items(multi=True)
+                ],
+                "s": status,
+                "d": round(duration * 1000, 3),
+            },
+            separators=(",", ":"),
+        )
+        with self._lock:
+            self._open().write(line + "\n")
+
+
+traffic_recorder = TrafficRecorder()
+
+
+def should_capture() -> bool:
+    """
+    Whether the current request is in the `CAPTURE_SAMPLE_RATE` share of traffic.
+    """
+    return config.CAPTURE_ENABLED and random() < config.CAPTURE_SAMPLE_RATE
+
+
+def load_traffic(paths: list[Path]) -> list[dict]:
+    """
+    Read captured requests from several files, in the order they were received.
+    """
+    records = []
+    for path in paths:
+        with open(path) as file:
+            records.extend(json.loads(line) for line in file if line.strip())
+    return sorted(records, key=lambda record: record["t"])
+
+
+def percentile(sorted_values: list[float], quantile: float) -> float:
+    """
+    Nearest-rank percentile of already sorted values.
+    """
+    index = max(ceil(quantile * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+class TrafficReplayer:
+    """
+    Re-issues captured requests against a target instance, keeping their
+    original spacing divided by `speed`, or as fast as `concurrency` allows
+    when `speed` is None.
+    """
+
+    def __init__(
+        self,
+        target: str,
+        speed: float | None,
+        concurrency: int,
+        headers: dict[str, str],
+        timeout: float,
+    ) -> None:
+        url = urlsplit(target)
+        self.connection_class = (
+            http.client.HTTPSConnection
+            if url.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self.netloc = url.netloc
+        self.prefix = url.path.rstrip("/")
+        self.speed = speed
+        self.concurrency = concurrency
+        self.headers = headers
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _send(self, record: dict) -> tuple[str, int | None, float]:
+        """
+        Send one request over this thread's keep-alive connection.
+
+        Returns the route, the status (None on a connection error) and the latency.
+        """
+        path = self.prefix + record["p"]
+        if record["q"]:
+            path += "?" + urlencode(record["q"])
+
+        start = perf_counter()
+        try:
+            connection = getattr(self._local, "connection", None)
+            if connection is None:
+                connection = self.connection_class(self.netloc, timeout=self.timeout)
+                self._local.connection = connection
+            connection.request(record["m"], path, headers=self.headers)
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            self._local.connection = None
+            status = None
+        return f"{record['m']} {record['r']}", status, perf_counter() - start
+
+    def replay(self, records: list[dict]) -> tuple[list, float]:
+        """
+        Replay the records, returning every outcome and the elapsed seconds.
+        """
+        origin = records[0]["t"] if records else 0.0
+        start = monotonic()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = []
+            for record in records:
+                if self.speed is not None:
+                    delay = (record["t"] - origin) / self.speed - (monotonic() - start)
+                    if delay > 0:
+                        sleep(delay)
+                futures.append(executor.submit(self._send, record))
+            outcomes = [future.result() for future in futures]
+        return outcomes, monotonic() - start
+
+
+def summarize(outcomes: list, elapsed: float) -> list[str]:
+    """
+    Format the overall and per-route latency percentiles and error rates.
+
+    Connection errors and 5xx responses count as errors.
+    """
+    by_route = defaultdict(list)
+    for route, status, latency in outcomes:
+        by_route[route].append((status, latency))
+        by_route["all"].append((status, latency))
+
+    lines = [
+        f"{len(outcomes)} requests in {elapsed:.2f}s "
+        f"({len(outcomes) / elapsed if elapsed else 0:.1f} req/s)",
+        "",
+        f"{'route':<45}{'count':>8}{'errors':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}",
+    ]
+    for route, results in sorted(by_route.items(), key=lambda item: -len(item[1])):
+        latencies = sorted(latency * 1000 for _, latency in results)
+        errors = sum(1 for status, _ in results if status is None or status >= 500)
+        lines.append(
+            f"{route:<45}{len(results):>8}{errors / len(results):>9.1%}"
+            f"{percentile(latencies, 0.50):>10.2f}"
+            f"{percentile(latencies, 0.95):>10.2f}"
+            f"{percentile(latencies, 0.99):>10.2f}"
+        )
+
+    statuses = Counter(
+        "error" if status is None else str(status) for _, status, _ in outcomes
+    )
+    lines.append("")
+    lines.append(
+        "statuses: "
+        + ", ".join(f"{status}={count}" for status, count in sorted(statuses.items()))
+    )
+    return lines
+
+
+def _parse_speed(_ctx, _param, value: str) -> float | None:
+    if value == "max":
+        return None
+    try:
+        speed = float(value.removesuffix("x"))
+    except ValueError:
+        speed = 0.0
+    if speed <= 0:
+        raise click.BadParameter("Use a positive multiplier such as 1x or 10x, or max.")
+    return speed
+
+
+@traffic_cli.command("replay")
+@click.argument("files", nargs=-1, type=click.Path(exists=True, path_type=Path))
+@click.option("--target", required=True, help="Base URL of the instance to load.")
+@click.option(
+    "--speed",
+    default="1x",
+    show_default=True,
+    callback=_parse_speed,
+    help="Multiple of the captured rate, e.g. 1x or 10x, or max.",
+)
+@click.option(
+    "--concurrency", default=8, show_default=True, help="Parallel connections."
+)
+@click.option(
+    "--methods",
+    default="GET,HEAD",
+    show_default=True,
+    help="Methods to replay; bodies are not captured.",
+)
+@click.option(
+    "--header",
+    "headers",
+    multiple=True,
+    help="Extra header, e.g. 'Cookie: session=...'. Can be repeated.",
+)
+@click.option("--timeout", default=10.0, show_default=True, help="Seconds per request.")
+def replay_traffic(
+    files: tuple[Path, ...],
+    target: str,
+    speed: float | None,
+    concurrency: int,
+    methods: str,
+    headers: tuple[str, ...],
+    timeout: float,
+):
+    """
+    Replay captured traffic against TARGET and report latency and error rates.
+
+    Reads FILES, or every capture in `CAPTURE_DIR` when none are given.
+    """
+    paths = list(files) or sorted(Path(config.CAPTURE_DIR).glob("*.jsonl"))
+    allowed = {method.strip().upper() for method in methods.split(",")}
+    records = [record for record in load_traffic(paths) if record["m"] in allowed]
+    if not records:
+        raise click.ClickException("No captured requests to replay.")
+
+    extra_headers = {}
+    for header in headers:
+        name, _, value = header.partition(":")
+        extra_headers[name.strip()] = value.strip()
+
+    replayer = TrafficReplayer(target, speed, concurrency, extra_headers, timeout)
+    outcomes, elapsed = replayer.replay(records)
+    for line in summarize(outcomes, elapsed):
+        click.echo(line)
+
+
+def register_traffic_capture(app: Flask):
+    """
+    Add the `flask traffic` commands to the app.
+
+    Requests are recorded by the request logging hook while `CAPTURE_ENABLED` is set.
+    """
+    app.cli.add_command(traffic_cli)
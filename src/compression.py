@@ -0,0 +1,79 @@
+import zlib
+from typing import Iterable, Iterator
+
+from flask import Flask, Response, g, request
+
+from src.config import config
+
+# zlib window bits for each supported content coding.
+ENCODINGS = {
+    "gzip": 16 + zlib.MAX_WBITS,
+    "deflate": zlib.MAX_WBITS,
+}
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """
+    Lazily compress an iterable of chunks, keeping memory bounded for
+    streamed responses.
+    """
+    compressor = zlib.compressobj(
+        config.COMPRESSION_LEVEL, zlib.DEFLATED, ENCODINGS[encoding]
+    )
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _should_compress(response: Response) -> bool:
+    """
+    Decide whether a response is eligible for compression.
+    """
+    if response.status_code < 200 or response.status_code in (204, 304):
+        return False
+    if response.direct_passthrough or "Content-Encoding" in response.headers:
+        return False
+    if response.mimetype not in config.COMPRESSION_MIMETYPES:
+        return False
+    if not response.is_streamed:
+        return response.calculate_content_length() >= config.COMPRESSION_MIN_SIZE
+    return True
+
+
+def register_compression(app: Flask):
+    """
+    Attach an after_request hook to the app that compresses responses
+    according to the client's Accept-Encoding header.
+    """
+
+    @app.after_request
+    def compress_response(response):
+        # Sub-requests' bodies are embedded in their batch's response.
+        if g.get("batch_item"):
+            return response
+
+        response.vary.add("Accept-Encoding")
+
+        if not _should_compress(response):
+            return response
+
+        encoding = request.accept_encodings.best_match(ENCODINGS)
+        if not encoding:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_stream(response.iter_encoded(), encoding)
+            response.headers.pop("Content-Length", None)
+        else:
+            data = b"".join(compress_stream([response.get_data()], encoding))
+            response.set_data(data)
+
+        response.headers["Content-Encoding"] = encoding
+
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+
+        return response
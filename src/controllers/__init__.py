@@ -1,5 +1,15 @@
 from .auth import AuthController
+from .batch import BatchController
+from .diagnostics import DiagnosticsController
+from .health import HealthController
 from .log import LogController
 from .user import UserController
 
-__all__ = ["UserController", "AuthController", "LogController"]
+__all__ = [
+    "UserController",
+    "AuthController",
+    "LogController",
+    "BatchController",
+    "HealthController",
+    "DiagnosticsController",
+]
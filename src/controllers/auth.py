@@ -1,9 +1,9 @@
 from flask import session
-from werkzeug.security import check_password_hash
 
 from src.exceptions import UnauthorizedException
 from src.repositories import UserRepository
 from src.schemas import LoginRequest, LoginResponse
+from src.utils import verify_password
 
 
 class AuthController:
@@ -32,7 +32,7 @@ class AuthController:
             BadRequestException: If credentials are invalid.
         """
         user = self.user_repository.get_by_username(login_request.username)
-        if not user or not check_password_hash(user.password, login_request.password):
+        if not user or not verify_password(user.password, login_request.password):
             raise UnauthorizedException(message="Invalid credentials.")
 
         session.clear()
@@ -0,0 +1,143 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable
+from urllib.parse import urlsplit
+
+from flask import Flask, current_app, g, request, session
+from flask.sessions import SessionMixin
+from werkzeug.test import EnvironBuilder
+
+from src.config import config
+from src.exceptions import BadRequestException
+from src.schemas import BatchItem, BatchItemResponse, BatchRequest, BatchResponse
+from src.utils.deadlines import Deadline, current_deadline, deadline
+
+
+class BatchController:
+    """Business logic for Batch operations."""
+
+    def __init__(self) -> None:
+        """
+        Initializes the BatchController.
+
+        The thread pool used for concurrent reads is created on first use.
+        """
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=config.BATCH_MAX_WORKERS, thread_name_prefix="batch"
+            )
+        return self._executor
+
+    def execute(self, batch_request: BatchRequest) -> BatchResponse:
+        """
+        Dispatches every sub-request through the app's URL map with the
+        caller's session.
+
+        Consecutive GET sub-requests are independent reads and run
+        concurrently; any other method runs alone, in order.
+
+        Args:
+            batch_request (BatchRequest): Sub-requests to dispatch.
+
+        Returns:
+            BatchResponse: Per sub-request status and body, in order.
+
+        Raises:
+            BadRequestException: If the batch is too large or targets an invalid path.
+        """
+        items = batch_request.requests
+        if len(items) > config.BATCH_MAX_REQUESTS:
+            raise BadRequestException(
+                message=f"A batch may contain at most {config.BATCH_MAX_REQUESTS} requests."
+            )
+        for item in items:
+            path = urlsplit(item.path).path
+            if not path.startswith("/api/") or path.startswith(request.path):
+                raise BadRequestException(message=f"Invalid batch path: {item.path}")
+
+        dispatch = partial(
+            self._dispatch,
+            current_app._get_current_object(),
+            session._get_current_object(),
+            request.host_url,
+            current_deadline(),
+        )
+
+        responses: list[BatchItemResponse] = []
+        reads: list[BatchItem] = []
+        for item in items:
+            if item.method == "GET":
+                reads.append(item)
+                continue
+
+            responses.extend(self._dispatch_many(dispatch, reads))
+            reads = []
+            responses.append(dispatch(item))
+
+        responses.extend(self._dispatch_many(dispatch, reads))
+
+        return BatchResponse(responses=responses)
+
+    def _dispatch_many(
+        self,
+        dispatch: Callable[[BatchItem], BatchItemResponse],
+        items: list[BatchItem],
+    ) -> list[BatchItemResponse]:
+        """
+        Dispatches independent sub-requests concurrently.
+        """
+        if len(items) <= 1 or config.BATCH_MAX_WORKERS <= 1:
+            return [dispatch(item) for item in items]
+
+        return list(self.executor.map(dispatch, items))
+
+    @staticmethod
+    def _dispatch(
+        app: Flask,
+        caller_session: SessionMixin,
+        base_url: str,
+        batch_deadline: Deadline | None,
+        item: BatchItem,
+    ) -> BatchItemResponse:
+        """
+        Dispatches a single sub-request through the app's request hooks, in
+        an app context of its own so their state does not mix with the batch's.
+        Sub-requests are metered and bounded like any request, but marked
+        `g.batch_item`, so they run on the batch's admission slot, and the batch
+        logs and compresses them as a whole.
+
+        Sub-requests may run on the batch's threads, so they get the batch's
+        deadline passed along rather than from their context.
+        """
+        builder = EnvironBuilder(
+            path=item.path,
+            base_url=base_url,
+            method=item.method,
+            headers=item.headers,
+            json=item.body,
+        )
+        try:
+            ctx = app.request_context(builder.get_environ())
+        finally:
+            builder.close()
+        ctx.session = caller_session
+
+        with app.app_context(), ctx, deadline(batch_deadline):
+            g.batch_item = True
+            try:
+                try:
+                    rv = app.preprocess_request() or app.dispatch_request()
+                except Exception as exc:
+                    rv = app.handle_user_exception(exc)
+                response = app.process_response(app.make_response(rv))
+            except Exception:
+                app.logger.exception("Batch sub-request %s failed.", item.path)
+                return BatchItemResponse(status=500)
+
+            return BatchItemResponse(
+                status=response.status_code, body=response.get_json(silent=True)
+            )
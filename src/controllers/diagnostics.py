@@ -0,0 +1,73 @@
+import os
+import tracemalloc
+
+from src.diagnostics import (
+    count_objects,
+    dump_snapshot,
+    identity_map_stats,
+    memory_snapshots,
+)
+from src.schemas import AllocationSite, IdentityMapReport, MemoryReport, ObjectCount
+
+
+class DiagnosticsController:
+    """Business logic for Diagnostics operations."""
+
+    def memory_report(self, limit: int) -> MemoryReport:
+        """
+        Reports this worker's memory usage.
+
+        When tracemalloc is running, a snapshot is taken and its top
+        allocation sites are compared with the previous snapshot.
+
+        Args:
+            limit (int): Number of allocation sites and object types to report.
+
+        Returns:
+            MemoryReport: Allocation sites, object counts and identity-map sizes.
+        """
+        report = MemoryReport(
+            pid=os.getpid(),
+            tracing=tracemalloc.is_tracing(),
+            object_counts=[
+                ObjectCount(type=name, count=count)
+                for name, count in count_objects(limit)
+            ],
+            identity_map=IdentityMapReport(
+                requests=identity_map_stats.requests,
+                last=identity_map_stats.last,
+                max=identity_map_stats.max,
+                average=(
+                    identity_map_stats.total / identity_map_stats.requests
+                    if identity_map_stats.requests
+                    else 0.0
+                ),
+            ),
+        )
+        if not report.tracing:
+            return report
+
+        report.traced_current, report.traced_peak = tracemalloc.get_traced_memory()
+        snapshot, previous = memory_snapshots.take()
+        report.snapshot_file = dump_snapshot(snapshot)
+
+        if previous is None:
+            report.top_allocations = [
+                AllocationSite(
+                    location=str(stat.traceback), size=stat.size, count=stat.count
+                )
+                for stat in snapshot.statistics("lineno")[:limit]
+            ]
+        else:
+            report.top_allocations = [
+                AllocationSite(
+                    location=str(stat.traceback),
+                    size=stat.size,
+                    count=stat.count,
+                    size_diff=stat.size_diff,
+                    count_diff=stat.count_diff,
+                )
+                for stat in snapshot.compare_to(previous, "lineno")[:limit]
+            ]
+
+        return report
@@ -0,0 +1,125 @@
+from math import ceil
+from threading import Lock
+
+from sqlalchemy import Engine, create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from src.config import config
+from src.health import error_rate
+from src.schemas import PoolStatus, ReadinessResponse
+from src.sqlite import read_engine
+from src.utils import deadline
+
+_ping_engines: dict[str, Engine] = {}
+_ping_engines_lock = Lock()
+
+
+def ping_engine() -> Engine:
+    """
+    A single-connection engine for readiness pings, separate from the
+    application's pool, that waits for its connection and to connect for at
+    most `READINESS_DB_TIMEOUT`, so neither a busy pool nor an unreachable
+    database holds a ping past it.
+
+    libpq waits at least 2 seconds to connect, whatever the timeout.
+    """
+    url = read_engine().url
+    key = url.render_as_string(hide_password=False)
+    with _ping_engines_lock:
+        engine = _ping_engines.get(key)
+        if engine is None:
+            seconds = config.READINESS_DB_TIMEOUT / 1000
+            connect_args = (
+                {"connect_timeout": max(ceil(seconds), 2)}
+                if url.get_backend_name() == "postgresql"
+                else {}
+            )
+            engine = _ping_engines[key] = create_engine(
+                url,
+                poolclass=QueuePool,
+                pool_size=1,
+                max_overflow=0,
+                pool_timeout=seconds,
+                pool_pre_ping=True,
+                connect_args=connect_args,
+            )
+        return engine
+
+
+class HealthController:
+    """Business logic for Health operations."""
+
+    def readiness(self) -> ReadinessResponse:
+        """
+        Checks whether this worker should keep receiving traffic.
+
+        The worker reports unavailable once its pool or error rate crosses
+        the configured thresholds, before requests start queueing on it.
+
+        Returns:
+            ReadinessResponse: Readiness status and the metrics behind it.
+        """
+        reasons = []
+
+        pool = self.pool_status()
+        if (
+            pool.saturation is not None
+            and pool.saturation >= config.READINESS_MAX_POOL_SATURATION
+        ):
+            reasons.append("pool saturated")
+
+        database = pool.saturation is None or pool.saturation < 1
+        if database:
+            database = self.ping_database()
+        if not database:
+            reasons.append("database unavailable")
+
+        requests, errors = error_rate.snapshot()
+        rate = errors / requests if requests else 0.0
+        if (
+            requests >= config.READINESS_MIN_REQUESTS
+            and rate >= config.READINESS_MAX_ERROR_RATE
+        ):
+            reasons.append("error rate too high")
+
+        return ReadinessResponse(
+            status="unavailable" if reasons else "ok",
+            database=database,
+            pool=pool,
+            requests=requests,
+            error_rate=rate,
+            reasons=reasons,
+        )
+
+    def pool_status(self) -> PoolStatus:
+        """
+        Reports the connection pool usage, for pools that track it.
+
+        With SQLite's single writer, the readers' pool is reported instead.
+        """
+        pool = read_engine().pool
+        if not isinstance(pool, QueuePool):
+            return PoolStatus()
+
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        return PoolStatus(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            saturation=pool.checkedout() / capacity if capacity else None,
+        )
+
+    def ping_database(self) -> bool:
+        """
+        Runs a trivial query on the ping engine, bounded by
+        `READINESS_DB_TIMEOUT` milliseconds.
+        """
+        try:
+            with (
+                deadline(config.READINESS_DB_TIMEOUT / 1000),
+                ping_engine().connect() as connection,
+            ):
+                connection.execute(text("SELECT 1"))
+            return True
+        except Exception:
+            return False
@@ -27,3 +27,9 @@ class LogController:
             status=log.status,
             user_id=log.user_id,
         )
+
+    def create_logs(self, log_requests: list[CreateLog]) -> None:
+        """
+        Create several users action logs in one write.
+        """
+        self.log_repository.create_many(attributes_list=log_requests)
@@ -1,7 +1,11 @@
-from werkzeug.security import generate_password_hash
-
-from src.exceptions import BadRequestException, NotFoundException
-from src.repositories import UserRepository
+from werkzeug.datastructures import ETags
+
+from src.config import config
+from src.exceptions import NotFoundException, PreconditionFailedException
+from src.invalidation import on_change
+from src.jobs import enqueue, job
+from src.models import User
+from src.repositories import LogRepository, UserRepository
 from src.schemas import (
     PaginationResponse,
     RegisterUser,
@@ -9,6 +13,23 @@ from src.schemas import (
     UserFilterParams,
     UserResponse,
 )
+from src.utils import LocalCache, hash_password, make_etag
+
+# Users by ID, and pages of users by filter parameters, with CACHE_TTL.
+user_cache = LocalCache()
+users_page_cache = LocalCache()
+
+
+@on_change("users")
+def evict_user(user_id: int | None) -> None:
+    """
+    Evict a changed user, and every page it may be listed on.
+    """
+    if user_id is None:
+        user_cache.clear()
+    else:
+        user_cache.evict(user_id)
+    users_page_cache.clear()
 
 
 class UserController:
@@ -20,8 +41,10 @@ class UserController:
 
         Args:
             user_repository (UserRepository): Repository instance for interacting with User model.
+            log_repository (LogRepository): Repository instance for purging deleted users' logs.
         """
         self.user_repository = UserRepository()
+        self.log_repository = LogRepository()
 
     def get_users(
         self, filter_params: UserFilterParams
@@ -29,26 +52,64 @@ class UserController:
         """
         Retrieves a list of users based on filter parameters.
 
+        The page is read as plain rows rather than User instances, and
+        validated from them in a single call, which is cheaper in pydantic's
+        core than `model_construct` per user. Pages are cached for CACHE_TTL
+        seconds, until a user changes.
+
         Args:
             filter_params (UserFilterParams): Filtering and pagination parameters.
 
         Returns:
             PaginationResponse[UserResponse]: Paginated list of users.
         """
-        users, total = self.user_repository.get_filtered_users(
+        return users_page_cache.get_or_set(
+            ("page", filter_params.model_dump_json()),
+            lambda: self._get_users(filter_params=filter_params),
+        )
+
+    def _get_users(
+        self, filter_params: UserFilterParams
+    ) -> PaginationResponse[UserResponse]:
+        """
+        Reads a page of users from the database.
+        """
+        rows, total = self.user_repository.get_filtered_user_rows(
             filter_params=filter_params
         )
 
-        return PaginationResponse[UserResponse](
-            limit=filter_params.limit,
-            offset=filter_params.offset,
-            total=total,
-            items=[UserResponse.model_validate(user) for user in users],
+        fields = rows[0]._fields if rows else ()
+
+        return PaginationResponse[UserResponse].model_validate(
+            {
+                "limit": filter_params.limit,
+                "offset": filter_params.offset,
+                "total": total,
+                "items": [dict(zip(fields, row)) for row in rows],
+            }
+        )
+
+    def get_users_json(self, filter_params: UserFilterParams) -> str:
+        """
+        Retrieves a list of users based on filter parameters, rendered as JSON
+        by the database, in the shape of `PaginationResponse[UserResponse]`.
+
+        Args:
+            filter_params (UserFilterParams): Filtering and pagination parameters.
+
+        Returns:
+            str: Paginated list of users as a JSON document.
+        """
+        return users_page_cache.get_or_set(
+            ("json", filter_params.model_dump_json()),
+            lambda: self.user_repository.get_filtered_users_json(
+                filter_params=filter_params
+            ),
         )
 
     def get_user(self, user_id: int) -> UserResponse:
         """
-        Retrieves a user by their ID.
+        Retrieves a user by their ID, cached for CACHE_TTL seconds until it changes.
 
         Args:
             user_id (int): Unique identifier of the user.
@@ -59,6 +120,12 @@ class UserController:
         Raises:
             NotFoundException: If user does not exist.
         """
+        return user_cache.get_or_set(user_id, lambda: self._get_user(user_id=user_id))
+
+    def _get_user(self, user_id: int) -> UserResponse:
+        """
+        Reads a user from the database.
+        """
         user = self.user_repository.get_by_id(id_=user_id)
         if not user:
             raise NotFoundException(message="User not found.")
@@ -68,8 +135,60 @@ class UserController:
             username=user.username,
             phone=user.phone,
             created=user.created,
+            version=user.version,
+        )
+
+    def get_user_etag(self, user_id: int) -> str:
+        """
+        Computes a user's ETag from its version counter alone, read from the
+        cached user when there is one.
+
+        Args:
+            user_id (int): Unique identifier of the user.
+
+        Returns:
+            str: ETag of the user's current state.
+
+        Raises:
+            NotFoundException: If user does not exist.
+        """
+        cached = user_cache.get(user_id)
+        if cached is not None:
+            return self.user_etag(user_id=user_id, version=cached.version)
+
+        version = self.user_repository.get_version(id_=user_id)
+        if version is None:
+            raise NotFoundException(message="User not found.")
+
+        return self.user_etag(user_id=user_id, version=version)
+
+    @staticmethod
+    def user_etag(*, user_id: int, version: int) -> str:
+        """
+        Builds the ETag of a single user.
+        """
+        return make_etag("user", user_id, version)
+
+    @staticmethod
+    def users_etag(pagination_response: PaginationResponse[UserResponse]) -> str:
+        """
+        Builds the ETag of a users page from its metadata and item versions.
+        """
+        return make_etag(
+            "users",
+            pagination_response.limit,
+            pagination_response.offset,
+            pagination_response.total,
+            *(f"{user.id}.{user.version}" for user in pagination_response.items),
         )
 
+    @staticmethod
+    def users_json_etag(body: str) -> str:
+        """
+        Builds the ETag of a users page rendered by the database from its body.
+        """
+        return make_etag("users", body)
+
     def register_user(self, register_user: RegisterUser) -> UserResponse:
         """
         Registers a new user.
@@ -81,49 +200,64 @@ class UserController:
             UserResponse: Data of the newly created user.
 
         Raises:
-            BadRequestException: If email already exists.
+            BadRequestException: If the username or phone already exists.
         """
-        user = self.user_repository.get_by_username(username=register_user.username)
-        if user:
-            raise BadRequestException(message="User already exists with this username.")
-
-        hashed_password = generate_password_hash(password=register_user.password)
+        hashed_password = hash_password(register_user.password)
 
         user_data = register_user.model_dump(exclude_unset=True)
         user_data["password"] = hashed_password
-        created_user = self.user_repository.create(attributes=user_data)
+        created_user = self.user_repository.create_unique(attributes=user_data)
 
         return UserResponse(
             id=created_user.id,
             username=created_user.username,
             phone=created_user.phone,
             created=created_user.created,
+            version=created_user.version,
         )
 
     def update_user(
-        self, *, user_id: int, update_user_request: UpdateUser
+        self,
+        *,
+        user_id: int,
+        update_user_request: UpdateUser,
+        if_match: ETags | None = None,
     ) -> UserResponse:
         """
         Updates an existing user's data.
 
+        The update only applies to the version of the user that was read, so
+        a concurrent update in between is a conflict rather than lost.
+
         Args:
             user_id (int): Unique identifier of the user.
             update_user (UpdateUser): Updated user data.
+            if_match (ETags | None): ETags one of which the user's must match, from If-Match.
 
         Returns:
             UserResponse: Updated user data.
 
         Raises:
+            BadRequestException: If the new username or phone already exists.
+            ConflictException: If the user was updated concurrently.
             NotFoundException: If user does not exist.
+            PreconditionFailedException: If the user's ETag does not match `if_match`.
         """
         user = self.user_repository.get_by_id(id_=user_id)
         if not user:
             raise NotFoundException(message="User not found.")
 
+        # Weak comparison, as compression weakens the ETags clients receive.
+        etag = self.user_etag(user_id=user.id, version=user.version)
+        if if_match and not if_match.contains_weak(etag):
+            raise PreconditionFailedException(
+                message="User was changed since it was read."
+            )
+
         update_data = update_user_request.model_dump(exclude_unset=True)
         new_password = update_data.get("password")
         if new_password:
-            update_data["password"] = generate_password_hash(password=new_password)
+            update_data["password"] = hash_password(new_password)
 
         updated_user = self.user_repository.update(model=user, attributes=update_data)
 
@@ -132,18 +266,21 @@ class UserController:
             username=updated_user.username,
             phone=updated_user.phone,
             created=updated_user.created,
+            version=updated_user.version,
         )
 
     def delete_user(self, *, user_id: int) -> None:
         """
-        Deletes a user by UUID.
+        Deletes a user by ID.
+
+        In "cascade" mode the database deletes the user's logs with it. In
+        "deferred" mode, and with LOG_SHARDS, which the database cannot cascade
+        to, the user is only marked deleted, and its logs are purged in chunks
+        afterwards, by a `users.purge` job unless USER_PURGE_IN_BACKGROUND is off.
 
         Args:
             user_id (int): Unique identifier of the user.
 
-        Returns:
-            UserResponse: Deleted user data.
-
         Raises:
             NotFoundException: If user does not exist.
         """
@@ -151,4 +288,75 @@ class UserController:
         if not user:
             raise NotFoundException(message="User not found.")
 
-        return self.user_repository.delete(model=user)
+        if config.USER_DELETE_MODE == "cascade" and not self.log_repository.sharded:
+            return self.user_repository.delete(model=user)
+
+        # Queued with the user's mark, so neither happens without the other.
+        if config.USER_PURGE_IN_BACKGROUND:
+            enqueue("users.purge", user_id=user.id)
+        self.user_repository.mark_deleted(model=user)
+
+    def purge_user(self, user: User) -> int:
+        """
+        Deletes a user marked deleted, its logs first, in chunks of
+        USER_PURGE_CHUNK_SIZE so no transaction holds locks for long.
+
+        Args:
+            user (User): The user marked deleted.
+
+        Returns:
+            int: The number of purged logs.
+        """
+        purged = self.purge_logs(user_id=user.id)
+        self.user_repository.delete(model=user)
+        return purged
+
+    def purge_logs(self, *, user_id: int) -> int:
+        """
+        Deletes a user's logs in chunks of USER_PURGE_CHUNK_SIZE.
+
+        Args:
+            user_id (int): Unique identifier of the user.
+
+        Returns:
+            int: The number of purged logs.
+        """
+        purged = 0
+        while deleted := self.log_repository.delete_by_user(
+            user_id=user_id, limit=config.USER_PURGE_CHUNK_SIZE
+        ):
+            purged += deleted
+
+        return purged
+
+    def purge_deleted_users(self) -> int:
+        """
+        Purges every user marked deleted, such as those whose purge job failed.
+
+        Returns:
+            int: The number of purged users.
+        """
+        users = self.user_repository.get_deleted()
+        for user in users:
+            self.purge_user(user)
+
+        return len(users)
+
+
+@job("users.purge", queue="purge")
+def purge_user(user_id: int) -> None:
+    """
+    Purge a user marked deleted, unless an earlier run did.
+    """
+    controller = UserController()
+    user = controller.user_repository.get_deleted_by_id(id_=user_id)
+    if user:
+        controller.purge_user(user)
+
+
+@job("users.purge_deleted", queue="purge", every=3600)
+def purge_deleted_users() -> None:
+    """
+    Purge the users whose purge job failed or was never queued.
+    """
+    UserController().purge_deleted_users()
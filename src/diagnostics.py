@@ -0,0 +1,144 @@
+import gc
+import os
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from threading import Lock
+from time import strftime
+
+import click
+from flask import Flask
+from flask.cli import AppGroup
+from pydantic import BaseModel
+
+from src.config import config
+from src.extensions import Base, db
+
+diagnostics_cli = AppGroup("diagnostics", help="Inspect worker memory usage.")
+
+
+class IdentityMapStats:
+    """
+    Size of the session identity map at the end of each request.
+    """
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.total = 0
+        self.last = 0
+        self.max = 0
+        self._lock = Lock()
+
+    def record(self, size: int) -> None:
+        with self._lock:
+            self.requests += 1
+            self.total += size
+            self.last = size
+            self.max = max(self.max, size)
+
+
+class MemorySnapshots:
+    """
+    The tracemalloc snapshots taken in this worker, so each new one can be
+    compared with the previous one.
+    """
+
+    def __init__(self) -> None:
+        self.previous: tracemalloc.Snapshot | None = None
+        self._lock = Lock()
+
+    def take(self) -> tuple[tracemalloc.Snapshot, tracemalloc.Snapshot | None]:
+        """
+        Take a snapshot and return it together with the previous one.
+        """
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        with self._lock:
+            previous, self.previous = self.previous, snapshot
+        return snapshot, previous
+
+
+identity_map_stats = IdentityMapStats()
+memory_snapshots = MemorySnapshots()
+
+
+def count_objects(limit: int) -> list[tuple[str, int]]:
+    """
+    Count live SQLAlchemy model and Pydantic schema instances by class.
+    """
+    # `type()` rather than `isinstance()`, which would consult `__class__`
+    # on proxies such as SQLAlchemy's class registries.
+    counts = Counter(
+        cls.__name__
+        for cls in map(type, gc.get_objects())
+        if issubclass(cls, (Base, BaseModel))
+    )
+    return counts.most_common(limit)
+
+
+def dump_snapshot(snapshot: tracemalloc.Snapshot) -> str | None:
+    """
+    Save a snapshot to `DIAGNOSTICS_DIR` for offline comparison, removing
+    all but the newest `DIAGNOSTICS_KEEP` snapshots there.
+    """
+    if not config.DIAGNOSTICS_DIR:
+        return None
+
+    directory = Path(config.DIAGNOSTICS_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{strftime('%Y%m%dT%H%M%S')}-{os.getpid()}.snapshot"
+    snapshot.dump(str(path))
+
+    # Names start with their time, so they sort oldest first.
+    snapshots = sorted(directory.glob("*.snapshot"))
+    for old in snapshots[: max(len(snapshots) - config.DIAGNOSTICS_KEEP, 0)]:
+        old.unlink(missing_ok=True)
+    return str(path)
+
+
+def register_memory_diagnostics(app: Flask):
+    """
+    Start tracemalloc when `MEMORY_TRACING` is set, and attach a teardown
+    hook to the app that records the session identity-map size of every
+    request.
+    """
+    app.cli.add_command(diagnostics_cli)
+
+    if config.MEMORY_TRACING and not tracemalloc.is_tracing():
+        tracemalloc.start(config.MEMORY_TRACING_FRAMES)
+
+    @app.teardown_request
+    def record_identity_map(exc):
+        if db.session.registry.has():
+            identity_map_stats.record(len(db.session.identity_map))
+
+
+def _print_stats(stats: list, limit: int) -> None:
+    for stat in stats[:limit]:
+        click.echo(str(stat))
+
+
+@diagnostics_cli.command("top")
+@click.argument("snapshot", type=click.Path(exists=True, dir_okay=False))
+@click.option("--limit", default=20, show_default=True, help="Sites to show.")
+def top_allocations(snapshot: str, limit: int):
+    """
+    Print the top allocation sites of a dumped snapshot.
+    """
+    stats = tracemalloc.Snapshot.load(snapshot).statistics("lineno")
+    _print_stats(stats, limit)
+
+
+@diagnostics_cli.command("diff")
+@click.argument("old", type=click.Path(exists=True, dir_okay=False))
+@click.argument("new", type=click.Path(exists=True, dir_okay=False))
+@click.option("--limit", default=20, show_default=True, help="Sites to show.")
+def diff_snapshots(old: str, new: str, limit: int):
+    """
+    Print the allocation sites that grew the most between two dumped snapshots.
+    """
+    stats = tracemalloc.Snapshot.load(new).compare_to(
+        tracemalloc.Snapshot.load(old), "lineno"
+    )
+    _print_stats(stats, limit)
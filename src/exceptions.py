@@ -9,6 +9,7 @@ class CustomException(Exception):
     code = HTTPStatus.BAD_GATEWAY
     error_code = HTTPStatus.BAD_GATEWAY
     message = HTTPStatus.BAD_GATEWAY.description
+    headers: dict[str, str] = {}
 
     def __init__(self, message=None):
         """
@@ -56,3 +57,62 @@ class UnauthorizedException(CustomException):
     code = HTTPStatus.UNAUTHORIZED
     error_code = HTTPStatus.UNAUTHORIZED
     message = HTTPStatus.UNAUTHORIZED.description
+
+
+class ForbiddenException(CustomException):
+    """
+    Exception raised for HTTP 403 Forbidden.
+    """
+
+    code = HTTPStatus.FORBIDDEN
+    error_code = HTTPStatus.FORBIDDEN
+    message = HTTPStatus.FORBIDDEN.description
+
+
+class ConflictException(CustomException):
+    """
+    Exception raised for HTTP 409 Conflict.
+    """
+
+    code = HTTPStatus.CONFLICT
+    error_code = HTTPStatus.CONFLICT
+    message = HTTPStatus.CONFLICT.description
+
+
+class PreconditionFailedException(CustomException):
+    """
+    Exception raised for HTTP 412 Precondition Failed.
+    """
+
+    code = HTTPStatus.PRECONDITION_FAILED
+    error_code = HTTPStatus.PRECONDITION_FAILED
+    message = HTTPStatus.PRECONDITION_FAILED.description
+
+
+class ServiceUnavailableException(CustomException):
+    """
+    Exception raised for HTTP 503 Service Unavailable.
+    """
+
+    code = HTTPStatus.SERVICE_UNAVAILABLE
+    error_code = HTTPStatus.SERVICE_UNAVAILABLE
+    message = HTTPStatus.SERVICE_UNAVAILABLE.description
+
+    def __init__(self, message=None, retry_after: int | None = None):
+        """
+        Initializes the exception with an optional custom message, and the
+        seconds after which clients should retry.
+        """
+        super().__init__(message)
+        if retry_after is not None:
+            self.headers = {"Retry-After": str(retry_after)}
+
+
+class GatewayTimeoutException(CustomException):
+    """
+    Exception raised for HTTP 504 Gateway Timeout.
+    """
+
+    code = HTTPStatus.GATEWAY_TIMEOUT
+    error_code = HTTPStatus.GATEWAY_TIMEOUT
+    message = HTTPStatus.GATEWAY_TIMEOUT.description
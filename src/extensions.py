@@ -1,7 +1,12 @@
 from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
 from sqlalchemy.orm import DeclarativeBase
 
+# Bind key of the read-only engine used alongside the single SQLite writer.
+READER_BIND = "sqlite_reader"
+
 
 class Base(DeclarativeBase):
     """
@@ -12,5 +17,43 @@ class Base(DeclarativeBase):
     """
 
 
-db = SQLAlchemy(model_class=Base)
+class RoutingSession(Session):
+    """
+    Session that sends plain reads to the `READER_BIND` engine when one is
+    configured, and everything else to the default (writer) engine.
+
+    Once a transaction has used the writer, its reads stay there too so they
+    see its own uncommitted changes.
+    """
+
+    _writing = False
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        engines = self._db.engines
+        if (
+            READER_BIND in engines
+            and engine is engines.get(None)
+            and not self._writing
+            and not self._flushing
+            and getattr(clause, "is_select", False)
+            and getattr(clause, "_for_update_arg", None) is None
+        ):
+            return engines[READER_BIND]
+        return engine
+
+
+@event.listens_for(RoutingSession, "after_begin")
+def _track_writer(session, transaction, connection):
+    if connection.engine is not session._db.engines.get(READER_BIND):
+        session._writing = True
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _reset_writer(session, transaction):
+    if transaction.parent is None:
+        session._writing = False
+
+
+db = SQLAlchemy(model_class=Base, session_options={"class_": RoutingSession})
 migrate = Migrate()
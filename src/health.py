@@ -0,0 +1,59 @@
+from collections import deque
+from threading import Lock
+from time import monotonic
+
+from flask import Flask, request
+
+from src.config import config
+
+
+class ErrorRate:
+    """
+    Sliding-window count of requests and server errors, bucketed per second.
+    """
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self._buckets: deque[list[int]] = deque()
+        self._lock = Lock()
+
+    def record(self, error: bool) -> None:
+        now = int(monotonic())
+        with self._lock:
+            if not self._buckets or self._buckets[0][0] != now:
+                self._buckets.appendleft([now, 0, 0])
+            bucket = self._buckets[0]
+            bucket[1] += 1
+            bucket[2] += error
+            self._trim(now)
+
+    def snapshot(self) -> tuple[int, int]:
+        """
+        Return the number of requests and errors seen within the window.
+        """
+        with self._lock:
+            self._trim(int(monotonic()))
+            requests = sum(bucket[1] for bucket in self._buckets)
+            errors = sum(bucket[2] for bucket in self._buckets)
+        return requests, errors
+
+    def _trim(self, now: int) -> None:
+        while self._buckets and self._buckets[-1][0] <= now - self.window:
+            self._buckets.pop()
+
+
+error_rate = ErrorRate(window=config.READINESS_ERROR_WINDOW)
+
+
+def register_error_tracking(app: Flask):
+    """
+    Attach an after_request hook to the app that feeds the error rate
+    reported by the readiness probe.
+    """
+
+    @app.after_request
+    def track_errors(response):
+        if request.blueprint != "health":
+            error_rate.record(response.status_code >= 500)
+
+        return response
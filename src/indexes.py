@@ -0,0 +1,217 @@
+import re
+from typing import Callable, NamedTuple
+
+import click
+from flask import Flask
+from flask.cli import AppGroup, with_appcontext
+from sqlalchemy import inspect, select
+
+from src.extensions import db
+from src.models import User
+from src.repositories import LogRepository, UserRepository
+from src.schemas import UserFilterParams
+from src.utils.queries import QueryCounter
+
+# Below this many rows planners rightly prefer sequential scans.
+SMALL_TABLE = 10_000
+
+indexes_cli = AppGroup(
+    "indexes", help="Check indexes against the repositories' queries."
+)
+
+
+class QueryPlan(NamedTuple):
+    statement: str
+    lines: list[str]
+    sequential_scans: list[str]
+    indexes: set[str]
+    sorts: bool
+
+
+def _query_shapes(user: User) -> list[tuple[str, Callable[[], object]]]:
+    """
+    The repositories' queries, with parameters taken from a representative user.
+    """
+    users = UserRepository()
+    day = user.created[:10]
+    return [
+        ("user by id", lambda: users.get_by_id(user.id)),
+        ("user version", lambda: users.get_version(user.id)),
+        ("user by username", lambda: users.get_by_username(user.username)),
+        ("user by phone", lambda: users.get_by_phone(user.phone)),
+        (
+            "users, newest first",
+            lambda: users.get_filtered_user_rows(UserFilterParams()),
+        ),
+        (
+            "users created on a day",
+            lambda: users.get_filtered_user_rows(
+                UserFilterParams(created_from=day, created_to=day)
+            ),
+        ),
+        ("user's logs", lambda: users.get_by_id(user.id).logs),
+        ("users pending purge", users.get_deleted),
+    ]
+
+
+def _explain_postgres(connection, statement: str, parameters) -> QueryPlan:
+    (result,) = connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {statement}", parameters
+    ).scalar()
+    lines, scans, indexes, sorts = [], [], set(), False
+
+    def walk(node: dict, depth: int) -> None:
+        nonlocal sorts
+        node_type = node["Node Type"]
+        relation = node.get("Relation Name")
+        index = node.get("Index Name")
+        lines.append(
+            "  " * depth
+            + node_type
+            + (f" on {relation}" if relation else "")
+            + (f" using {index}" if index else "")
+        )
+        if node_type == "Seq Scan":
+            scans.append(relation)
+        if index:
+            indexes.add(index)
+        if node_type in ("Sort", "Incremental Sort"):
+            sorts = True
+        for child in node.get("Plans", []):
+            walk(child, depth + 1)
+
+    walk(result["Plan"], 0)
+    return QueryPlan(statement, lines, scans, indexes, sorts)
+
+
+def _explain_sqlite(connection, statement: str, parameters) -> QueryPlan:
+    rows = connection.exec_driver_sql(
+        f"EXPLAIN QUERY PLAN {statement}", parameters
+    ).all()
+    lines, scans, indexes, sorts = [], [], set(), False
+    for row in rows:
+        detail = row[-1]
+        lines.append(detail)
+        if match := re.match(r"SCAN (\w+)$", detail):
+            scans.append(match.group(1))
+        if match := re.search(r"USING (?:COVERING )?INDEX (\w+)", detail):
+            indexes.add(match.group(1))
+        if "USE TEMP B-TREE" in detail:
+            sorts = True
+    return QueryPlan(statement, lines, scans, indexes, sorts)
+
+
+def _read_connection():
+    """
+    The session's connection for reads, on SQLite's readers when configured.
+    """
+    return db.session.connection(bind_arguments={"clause": select(User)})
+
+
+def explain(statement: str, parameters) -> QueryPlan:
+    """
+    Plan a statement with EXPLAIN, without running it.
+    """
+    connection = _read_connection()
+    if connection.dialect.name == "postgresql":
+        return _explain_postgres(connection, statement, parameters)
+    if connection.dialect.name == "sqlite":
+        return _explain_sqlite(connection, statement, parameters)
+    raise click.ClickException(
+        f"EXPLAIN is not supported on {connection.dialect.name}."
+    )
+
+
+def _index_scans() -> dict[str, int]:
+    """
+    How often Postgres used each index since its statistics were reset.
+    """
+    connection = _read_connection()
+    if connection.dialect.name != "postgresql":
+        return {}
+    rows = connection.exec_driver_sql(
+        "SELECT indexrelname, idx_scan FROM pg_stat_user_indexes"
+    ).all()
+    return dict(rows)
+
+
+@indexes_cli.command("advise")
+@click.option(
+    "--strict", is_flag=True, help="Exit with status 1 if any query scans a table."
+)
+@with_appcontext
+def advise(strict: bool):
+    """
+    EXPLAIN the repositories' queries, reporting sequential scans, sorts
+    outside an index, and indexes no query uses.
+    """
+    total = UserRepository().estimate_count()
+    user = db.session.scalars(
+        select(User).order_by(User.id).offset(total // 2).limit(1)
+    ).first()
+    if user is None:
+        raise click.ClickException("No users to take parameters from, run flask seed.")
+
+    sizes = {"users": total, "logs": LogRepository().estimate_count()}
+    click.echo(", ".join(f"{table}: ~{rows} rows" for table, rows in sizes.items()))
+    if min(sizes.values()) < SMALL_TABLE:
+        click.echo(
+            "Small tables are often scanned even when an index fits; "
+            "seed a larger dataset for realistic plans."
+        )
+    click.echo()
+
+    used, scanned = set(), False
+    for label, query in _query_shapes(user):
+        with QueryCounter() as counter:
+            query()
+
+        click.echo(label)
+        explained = set()
+        for statement, parameters in zip(counter.statements, counter.parameters):
+            if statement in explained:
+                continue
+            explained.add(statement)
+
+            plan = explain(statement, parameters)
+            used |= plan.indexes
+            for line in plan.lines:
+                click.echo(f"    {line}")
+            # Subqueries show up as scans too; only tables matter.
+            for table in set(plan.sequential_scans) & set(db.metadata.tables):
+                scanned = True
+                click.echo(f"  ! sequential scan on {table}")
+            if plan.sorts:
+                click.echo("  ! sorted outside an index")
+        click.echo()
+
+    scans = _index_scans()
+    inspector = inspect(_read_connection())
+    unused = [
+        (table, index)
+        for table in sizes
+        for index in inspector.get_indexes(table)
+        if index["name"] not in used
+    ]
+    click.echo("Indexes no query uses:" if unused else "Every index is used.")
+    for table, index in unused:
+        notes = []
+        if index["unique"]:
+            notes.append("enforces uniqueness")
+        if index["name"] in scans:
+            notes.append(f"{scans[index['name']]} scans since statistics reset")
+        click.echo(
+            f"  {table}.{index['name']}" + (f" ({', '.join(notes)})" if notes else "")
+        )
+
+    db.session.rollback()
+
+    if strict and scanned:
+        raise SystemExit(1)
+
+
+def register_index_advisor(app: Flask):
+    """
+    Add the `flask indexes` commands to the app.
+    """
+    app.cli.add_command(indexes_cli)
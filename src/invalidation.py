@@ -0,0 +1,223 @@
+import json
+import os
+import select
+import threading
+from typing import Any, Callable
+from uuid import uuid4
+
+from flask import Flask, current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.config import config
+from src.extensions import db
+
+# Postgres channel the entity changes are sent on.
+CHANNEL = "entity_changes"
+
+# Largest NOTIFY payload to send; Postgres refuses 8000 bytes or more.
+MAX_PAYLOAD = 7900
+
+# Seconds between reconnection attempts of a listener that lost its connection.
+RECONNECT_DELAY = 5.0
+
+# Identifies the changes this process sent, which it has already applied.
+# Regenerated in forked children, which share their parent's memory.
+ORIGIN = uuid4().hex
+
+Handler = Callable[[Any], None]
+
+_handlers: dict[str, list[Handler]] = {}
+_listener: "Listener | None" = None
+_listener_lock = threading.Lock()
+
+
+def on_change(entity: str):
+    """
+    Subscribe a function to the changes of an entity, by table name.
+
+    It is called with the key of each changed row once the change commits,
+    in this process and every other one listening, or with None when any row
+    may have changed. It must be quick, and safe to call more than once.
+    """
+
+    def decorator(handler: Handler) -> Handler:
+        _handlers.setdefault(entity, []).append(handler)
+        return handler
+
+    return decorator
+
+
+def publish(entity: str, key: Any = None) -> None:
+    """
+    Announce a change of an entity's row, or rows when `key` is None, made in
+    the current transaction of the session.
+
+    Handlers in this process run after the commit; on Postgres, the change is
+    also sent to other processes with `NOTIFY`, which is delivered on commit.
+    Nothing is sent while `CACHE_TTL` is 0 or the entity has no handlers.
+    """
+    if not config.CACHE_TTL or entity not in _handlers:
+        return
+    db.session.info.setdefault("entity_changes", set()).add((entity, key))
+
+
+def dispatch(changes) -> None:
+    """
+    Run the handlers of changed entities.
+    """
+    for entity, key in changes:
+        for handler in _handlers.get(entity, ()):
+            handler(key)
+
+
+def invalidate_all() -> None:
+    """
+    Run every handler as if any row changed, such as after missing changes.
+    """
+    dispatch((entity, None) for entity in _handlers)
+
+
+def _payload(changes: set[tuple[str, Any]]) -> str:
+    payload = json.dumps({"origin": ORIGIN, "changes": sorted(changes, key=str)})
+    if len(payload.encode()) > MAX_PAYLOAD:
+        # Too many rows to list, so each entity is invalidated whole.
+        entities = sorted({entity for entity, _ in changes})
+        payload = json.dumps(
+            {"origin": ORIGIN, "changes": [[entity, None] for entity in entities]}
+        )
+    return payload
+
+
+def _new_origin() -> None:
+    global ORIGIN
+    ORIGIN = uuid4().hex
+
+
+# Workers forked from a preloaded app would otherwise ignore each other's changes.
+os.register_at_fork(after_in_child=_new_origin)
+
+
+def receive(payload: str) -> None:
+    """
+    Apply the changes of a notification sent by another process.
+    """
+    message = json.loads(payload)
+    if message["origin"] != ORIGIN:
+        dispatch(tuple(change) for change in message["changes"])
+
+
+@event.listens_for(Session, "before_commit")
+def _notify(session: Session):
+    changes = session.info.get("entity_changes")
+    if changes and session.get_bind().dialect.name == "postgresql":
+        # On the DBAPI connection, like a deadline's SET LOCAL, so the NOTIFY
+        # takes no share of the writing request's query budget.
+        with session.connection().connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", (CHANNEL, _payload(changes)))
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch(session: Session):
+    changes = session.info.pop("entity_changes", None)
+    if changes:
+        dispatch(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session: Session):
+    session.info.pop("entity_changes", None)
+
+
+class Listener(threading.Thread):
+    """
+    Receives the changes other processes send on `CHANNEL`, on a dedicated
+    Postgres connection, and runs their handlers.
+
+    Changes sent while the connection is down are lost, so after
+    reconnecting every handler runs as if any row changed.
+    """
+
+    def __init__(self, app: Flask) -> None:
+        super().__init__(name="invalidation-listener", daemon=True)
+        self.app = app
+        self.pid = os.getpid()
+        self.stopped = threading.Event()
+        with app.app_context():
+            self.engine = db.engine
+        # Listen before any request caches a value, so no change is missed.
+        try:
+            self.connection = self._listen()
+        except Exception:
+            app.logger.exception("Could not listen for entity changes.")
+            self.connection = None
+
+    def _listen(self):
+        connection = self.engine.raw_connection()
+        connection.detach()
+        connection.dbapi_connection.autocommit = True
+        with connection.dbapi_connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL}")
+        return connection
+
+    def run(self) -> None:
+        while not self.stopped.is_set():
+            try:
+                if self.connection is None:
+                    self.connection = self._listen()
+                    invalidate_all()
+                self._receive(self.connection.dbapi_connection)
+            except Exception:
+                self.app.logger.exception("Lost the invalidation listener connection.")
+                self._close()
+                self.stopped.wait(RECONNECT_DELAY)
+        self._close()
+
+    def _receive(self, dbapi_connection) -> None:
+        readable, _, _ = select.select([dbapi_connection], [], [], RECONNECT_DELAY)
+        if not readable:
+            return
+        dbapi_connection.poll()
+        while dbapi_connection.notifies:
+            notify = dbapi_connection.notifies.pop(0)
+            try:
+                receive(notify.payload)
+            except Exception:
+                self.app.logger.exception("Could not apply the changes %r.", notify)
+
+    def _close(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def stop(self) -> None:
+        self.stopped.set()
+
+
+def start_listener(app: Flask) -> None:
+    """
+    Start this process's listener, on Postgres while caching is enabled.
+
+    A forked worker starts its own, as threads do not survive a fork.
+    """
+    global _listener
+
+    if _listener is not None and _listener.pid == os.getpid():
+        return
+    if not config.CACHE_TTL or db.engine.dialect.name != "postgresql":
+        return
+    with _listener_lock:
+        if _listener is not None and _listener.pid == os.getpid():
+            return
+        _listener = Listener(app)
+        _listener.start()
+
+
+def register_invalidation(app: Flask):
+    """
+    Start the listener of each worker process before its first request.
+    """
+
+    @app.before_request
+    def ensure_listener():
+        start_listener(current_app._get_current_object())
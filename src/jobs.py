@@ -0,0 +1,311 @@
+import os
+import signal
+import socket
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from time import monotonic
+from typing import Any, Callable
+
+import click
+from flask import Flask, current_app
+from flask.cli import with_appcontext
+
+from src.config import config
+from src.extensions import db
+from src.models import Job
+from src.repositories import JobRepository
+from src.repositories.job import utcnow
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    name: str
+    func: Callable[..., Any]
+    queue: str
+    max_attempts: int
+    every: int | None
+
+
+_jobs: dict[str, JobSpec] = {}
+
+
+def job(
+    name: str,
+    *,
+    queue: str = "default",
+    max_attempts: int | None = None,
+    every: int | None = None,
+):
+    """
+    Register a function as a job, run by `flask worker` with the keyword
+    arguments it was enqueued with.
+
+    Jobs run at least once: a job whose worker dies is run again once its
+    lease expires, so they must be safe to repeat.
+
+    Args:
+        name (str): Name the job is stored under, kept stable across releases.
+        queue (str): Queue the job runs on.
+        max_attempts (int | None): Runs before the job is failed, by default
+            JOB_MAX_ATTEMPTS.
+        every (int | None): Also run the job every `every` seconds.
+    """
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        if name in _jobs:
+            raise ValueError(f"A job named {name} is already registered.")
+        _jobs[name] = JobSpec(
+            name=name,
+            func=func,
+            queue=queue,
+            max_attempts=max_attempts or config.JOB_MAX_ATTEMPTS,
+            every=every,
+        )
+        return func
+
+    return decorator
+
+
+def enqueue(
+    name: str, *, delay: int = 0, key: str | None = None, **payload: Any
+) -> Job:
+    """
+    Queue a job with the session's current transaction, to run after `delay`
+    seconds. The job is only queued once the caller commits.
+
+    Args:
+        name (str): Name of a registered job.
+        delay (int): Seconds to wait before running the job.
+        key (str | None): Key under which the job is queued at most once.
+        **payload: JSON-serializable keyword arguments of the job.
+
+    Returns:
+        Job: The pending job.
+    """
+    spec = _jobs[name]
+    return JobRepository().enqueue(
+        {
+            "name": name,
+            "queue": spec.queue,
+            "payload": payload,
+            "key": key,
+            "run_at": utcnow() + timedelta(seconds=delay),
+        }
+    )
+
+
+def backoff(attempts: int) -> timedelta:
+    """
+    Delay before retrying a job that failed `attempts` times, doubling each time.
+    """
+    seconds = config.JOB_BACKOFF * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, config.JOB_MAX_BACKOFF))
+
+
+def perform(job: Job) -> None:
+    """
+    Run a claimed job, then delete it, retry it after a backoff, or fail it.
+    """
+    jobs = JobRepository()
+    spec = _jobs.get(job.name)
+    if spec is None:
+        jobs.fail(job, error=f"No job named {job.name} is registered.")
+        return
+    if job.attempts > spec.max_attempts:
+        # Its last attempt's worker died.
+        jobs.fail(job, error=job.last_error or "The worker running it died.")
+        return
+
+    try:
+        spec.func(**job.payload)
+    except Exception as ex:
+        db.session.rollback()
+        error = "".join(traceback.format_exception_only(ex)).strip()
+        if job.attempts >= spec.max_attempts:
+            current_app.logger.exception("Job %s %s failed.", job.id, job.name)
+            jobs.fail(job, error=error)
+        else:
+            current_app.logger.warning(
+                "Job %s %s failed, attempt %s of %s: %s",
+                job.id,
+                job.name,
+                job.attempts,
+                spec.max_attempts,
+                error,
+            )
+            jobs.retry(job, delay=backoff(job.attempts), error=error)
+        return
+
+    jobs.complete(job)
+
+
+def schedule_periodic(
+    now: datetime | None = None, scheduled: dict[str, int] | None = None
+) -> None:
+    """
+    Queue the next run of every periodic job, once however many workers do it.
+
+    Runs are aligned on multiples of the job's period since the epoch, and
+    keyed by it, so each is only queued once. Runs recorded in `scheduled`
+    are not queued again.
+    """
+    now = now or datetime.now(timezone.utc)
+    scheduled = {} if scheduled is None else scheduled
+    jobs = JobRepository()
+    for spec in _jobs.values():
+        if spec.every is None:
+            continue
+        slot = int(now.timestamp()) // spec.every + 1
+        if scheduled.get(spec.name) == slot:
+            continue
+        scheduled[spec.name] = slot
+        jobs.insert_or_ignore(
+            {
+                "name": spec.name,
+                "queue": spec.queue,
+                "payload": {},
+                "key": f"{spec.name}@{slot}",
+                "run_at": datetime.fromtimestamp(slot * spec.every, timezone.utc),
+            }
+        )
+
+
+class Worker:
+    """
+    Claims due jobs of its queues in batches and runs them on a thread pool
+    per queue, with at most that queue's concurrency running at once.
+    """
+
+    def __init__(self, app: Flask, queues: dict[str, int]) -> None:
+        self.app = app
+        self.queues = queues
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.lease = timedelta(seconds=config.JOB_LEASE_TIMEOUT)
+
+        self.executors = {
+            queue: ThreadPoolExecutor(
+                max_workers=size, thread_name_prefix=f"job-{queue}"
+            )
+            for queue, size in queues.items()
+        }
+        self.running = dict.fromkeys(queues, 0)
+        self.lock = threading.Lock()
+        # Set when a job finishes or the worker stops, to poll without waiting.
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+
+    def run(self) -> None:
+        """
+        Poll for jobs until stopped, then wait for the running ones.
+
+        Database errors are logged and retried after a delay doubling from
+        JOB_POLL_INTERVAL up to JOB_MAX_BACKOFF, so the worker outlives a
+        database restart.
+        """
+        scheduled: dict[str, int] = {}
+        extended = 0.0
+        failures = 0
+        while not self.stopping.is_set():
+            with self.app.app_context():
+                try:
+                    schedule_periodic(scheduled=scheduled)
+                    if monotonic() - extended >= self.lease.total_seconds() / 3:
+                        JobRepository().extend_leases(self.name, self.lease)
+                        extended = monotonic()
+                    claimed = self.poll()
+                    failures = 0
+                except Exception:
+                    self.app.logger.exception("Could not poll for jobs.")
+                    db.session.rollback()
+                    failures += 1
+
+            if failures:
+                delay = config.JOB_POLL_INTERVAL * 2 ** (failures - 1)
+                self.stopping.wait(min(delay, config.JOB_MAX_BACKOFF))
+            elif not claimed:
+                self.wakeup.wait(config.JOB_POLL_INTERVAL)
+                self.wakeup.clear()
+
+        for executor in self.executors.values():
+            executor.shutdown(wait=True)
+
+    def poll(self) -> int:
+        """
+        Claim as many jobs as each queue has free threads, and start them.
+
+        Returns:
+            int: The number of claimed jobs.
+        """
+        claimed = 0
+        for queue, size in self.queues.items():
+            with self.lock:
+                free = size - self.running[queue]
+            if free <= 0:
+                continue
+
+            for claimed_job in JobRepository().claim(
+                queue, self.name, free, self.lease
+            ):
+                with self.lock:
+                    self.running[queue] += 1
+                self.executors[queue].submit(self._perform, queue, claimed_job)
+                claimed += 1
+        return claimed
+
+    def stop(self, *args) -> None:
+        self.stopping.set()
+        self.wakeup.set()
+
+    def _perform(self, queue: str, claimed_job: Job) -> None:
+        try:
+            with self.app.app_context():
+                perform(claimed_job)
+        except Exception:
+            self.app.logger.exception("Could not run job %s.", claimed_job.id)
+        finally:
+            with self.lock:
+                self.running[queue] -= 1
+            self.wakeup.set()
+
+
+def _parse_queues(values: tuple[str, ...]) -> dict[str, int]:
+    queues = {}
+    for value in values:
+        queue, _, size = value.partition("=")
+        queues[queue] = int(size or 1)
+    return queues
+
+
+@click.command("worker")
+@click.option(
+    "--queue",
+    "queues",
+    multiple=True,
+    help="Queue to work on as NAME=THREADS, repeatable. Defaults to JOB_QUEUES.",
+)
+@with_appcontext
+def worker_command(queues: tuple[str, ...]):
+    """
+    Run queued jobs until interrupted.
+    """
+    worker = Worker(
+        current_app._get_current_object(),
+        _parse_queues(queues) if queues else config.JOB_QUEUES,
+    )
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+
+    click.echo(
+        f"Worker {worker.name} on "
+        + ", ".join(f"{queue} ({size})" for queue, size in worker.queues.items())
+    )
+    worker.run()
+
+
+def register_job_worker(app: Flask):
+    """Register the `flask worker` command."""
+
+    app.cli.add_command(worker_command)
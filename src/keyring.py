@@ -0,0 +1,98 @@
+from pathlib import Path
+from secrets import token_urlsafe
+from typing import NamedTuple
+
+import click
+from flask import Flask
+from flask.cli import AppGroup
+
+from src.config import config
+
+keys_cli = AppGroup("keys", help="Manage session signing keys.")
+
+
+class SigningKey(NamedTuple):
+    kid: str
+    secret: str
+
+
+def parse_keys(entries: list[str]) -> list[SigningKey]:
+    """
+    Parse `<kid>=<secret>` entries, skipping blank lines and comments.
+
+    Raises:
+        ValueError: If an entry is malformed or a key id is repeated.
+    """
+    keys: list[SigningKey] = []
+    for entry in entries:
+        entry = entry.strip()
+        if not entry or entry.startswith("#"):
+            continue
+
+        kid, sep, secret = entry.partition("=")
+        if not sep or not kid.strip() or not secret.strip():
+            raise ValueError("Invalid signing key entry: expected <kid>=<secret>.")
+        keys.append(SigningKey(kid=kid.strip(), secret=secret.strip()))
+
+    kids = [key.kid for key in keys]
+    if len(set(kids)) != len(kids):
+        raise ValueError("Signing key ids must be unique.")
+
+    return keys
+
+
+def is_ephemeral() -> bool:
+    """
+    Whether no signing key is configured, so each process makes up its own.
+    """
+    return not (config.SECRET_KEYS_FILE or config.SECRET_KEYS or config.SECRET_KEY)
+
+
+def load_keys() -> list[SigningKey]:
+    """
+    Load the active signing keys, oldest first.
+
+    Keys come from `SECRET_KEYS_FILE` (one entry per line), `SECRET_KEYS`
+    (comma-separated entries) or the single `SECRET_KEY`, in that order.
+    Without any of them a random per-process key is generated.
+    """
+    if config.SECRET_KEYS_FILE:
+        keys = parse_keys(Path(config.SECRET_KEYS_FILE).read_text().splitlines())
+    elif config.SECRET_KEYS:
+        keys = parse_keys(config.SECRET_KEYS.split(","))
+    elif config.SECRET_KEY:
+        keys = [SigningKey(kid="default", secret=config.SECRET_KEY)]
+    else:
+        keys = [SigningKey(kid="ephemeral", secret=token_urlsafe(32))]
+
+    if not keys:
+        raise ValueError("No signing keys configured.")
+
+    return keys
+
+
+def register_signing_keys(app: Flask):
+    """
+    Sign sessions with the newest key and verify them against every active
+    key, so appending a new key does not invalidate existing sessions.
+    """
+    keys = load_keys()
+
+    app.config["SECRET_KEY"] = keys[-1].secret
+    app.config["SECRET_KEY_FALLBACKS"] = [key.secret for key in reversed(keys[:-1])]
+
+    if is_ephemeral():
+        app.logger.warning(
+            "No signing key configured; sessions will not survive a restart."
+        )
+
+    app.cli.add_command(keys_cli)
+
+
+@keys_cli.command("generate")
+@click.argument("kid")
+def generate_key(kid: str):
+    """
+    Print a new `<kid>=<secret>` entry to append to the key ring.
+    """
+    click.echo(f"{kid}={token_urlsafe(32)}")
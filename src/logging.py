@@ -1,28 +1,69 @@
-from flask import Flask, request, session
+from time import perf_counter, time
 
+from flask import Flask, g, request, session
+
+from src.capture import should_capture, traffic_recorder
 from src.controllers import LogController
+from src.metrics import audit_log_write_duration
 from src.schemas import CreateLog
 
 log_controller = LogController()
 
 
+def defer_logs(log_requests: list[CreateLog]) -> None:
+    """
+    Queue action logs to be written together with the current request's own log.
+    """
+    g.setdefault("deferred_logs", []).extend(log_requests)
+
+
 def register_request_logging(app: Flask):
     """
     Attach an after_request hook to the app that writes every
-    authenticated user's action into the logs table.
+    authenticated user's admitted action into the logs table.
+
+    While `CAPTURE_ENABLED` is set, the same hook also records the request's
+    shape and timing for `flask traffic replay`.
     """
 
+    @app.before_request
+    def start_capture():
+        if should_capture():
+            g.capture_start = (time(), perf_counter())
+
     @app.after_request
     def log_request(response):
+        # Batches log their sub-requests along with themselves.
+        if g.get("batch_item"):
+            return response
+
+        capture_start = g.pop("capture_start", None)
+        if capture_start is not None:
+            started, start = capture_start
+            try:
+                traffic_recorder.record(
+                    started, response.status_code, perf_counter() - start
+                )
+            except OSError:
+                app.logger.exception("Could not record the request.")
+
+        log_requests = g.pop("deferred_logs", [])
+
+        # Shed requests are not logged, so shedding adds no load to the database.
         user_id = session.get("user_id")
-        if user_id:
+        if user_id and not g.get("shed"):
             log_request = CreateLog(
                 method=request.method,
                 endpoint=request.path,
                 status=str(response.status_code),
                 user_id=user_id,
             )
+            log_requests.append(log_request)
 
-            log_controller.create_log(log_request)
+        with audit_log_write_duration.time():
+            if len(log_requests) == 1:
+                log_controller.create_log(log_requests[0])
+            elif log_requests:
+                log_controller.create_logs(log_requests)
 
         return response
@@ -0,0 +1,298 @@
+import json
+import logging
+import os
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from time import monotonic, perf_counter
+
+from flask import Flask, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds, in seconds, of the latency histogram buckets.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Snapshot of the totals of exited workers, next to the live workers' ones.
+RETIRED_SNAPSHOT = "retired.json"
+
+
+def _key(labels: dict[str, str]) -> str:
+    return json.dumps(sorted(labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: str, **extra: str) -> str:
+    pairs = json.loads(key) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    """
+    A monotonically increasing count per label set.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str) -> None:
+        self.name = name
+        self.description = description
+        self.values: dict[str, float] = {}
+        self.lock = Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = _key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def snapshot(self) -> dict[str, float]:
+        with self.lock:
+            return dict(self.values)
+
+    def merge(self, values: dict[str, float]) -> None:
+        for key, value in values.items():
+            self.values[key] = self.values.get(key, 0) + value
+
+    def render(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(key)} {value}"
+            for key, value in sorted(self.values.items())
+        ]
+
+
+class Histogram:
+    """
+    Fixed-bucket latency distribution per label set.
+
+    Each label set keeps one count per bucket plus the sum and count of
+    all observations, so recording is a bisect and two additions.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str) -> None:
+        self.name = name
+        self.description = description
+        self.values: dict[str, list[float]] = {}
+        self.lock = Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _key(labels)
+        with self.lock:
+            data = self.values.get(key)
+            if data is None:
+                # One slot per bucket, one for +Inf, then the sum.
+                data = self.values[key] = [0] * (len(BUCKETS) + 2)
+            data[bisect_left(BUCKETS, value)] += 1
+            data[-1] += value
+
+    def snapshot(self) -> dict[str, list[float]]:
+        with self.lock:
+            return {key: list(data) for key, data in self.values.items()}
+
+    @contextmanager
+    def time(self, **labels: str):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - start, **labels)
+
+    def merge(self, values: dict[str, list[float]]) -> None:
+        for key, data in values.items():
+            current = self.values.setdefault(key, [0] * len(data))
+            for i, value in enumerate(data):
+                current[i] += value
+
+    def render(self) -> list[str]:
+        lines = []
+        for key, data in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip((*BUCKETS, "+Inf"), data[:-1]):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(key, le=str(bound))} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_format_labels(key)} {data[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    The metrics of one worker process.
+
+    With `METRICS_DIR` set, every worker periodically writes a snapshot to
+    `<METRICS_DIR>/<pid>.json`, and rendering merges all snapshots, so any
+    worker can answer a scrape for the whole server. Snapshots of exited
+    workers are folded into `RETIRED_SNAPSHOT`, so the files stay one per
+    live worker.
+    """
+
+    def __init__(self) -> None:
+        self.families: dict[str, Counter | Histogram] = {}
+        self._last_flush = monotonic()
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self.families.setdefault(name, Counter(name, description))
+
+    def histogram(self, name: str, description: str) -> Histogram:
+        return self.families.setdefault(name, Histogram(name, description))
+
+    def snapshot(self) -> dict[str, dict]:
+        return {name: family.snapshot() for name, family in self.families.items()}
+
+    def flush(self, force: bool = False) -> None:
+        """
+        Write this worker's snapshot, at most every `METRICS_FLUSH_INTERVAL` seconds.
+        """
+        if not config.METRICS_DIR:
+            return
+        if not force and monotonic() - self._last_flush < config.METRICS_FLUSH_INTERVAL:
+            return
+        self._last_flush = monotonic()
+
+        try:
+            _write_snapshot(f"{os.getpid()}.json", self.snapshot())
+        except OSError:
+            logger.exception("Could not write the metrics snapshot.")
+
+    def retire(self, pid: int) -> None:
+        """
+        Fold the snapshot of an exited worker into `RETIRED_SNAPSHOT`, in the
+        server's master process.
+        """
+        if not config.METRICS_DIR:
+            return
+
+        directory = Path(config.METRICS_DIR)
+        path = directory / f"{pid}.json"
+        try:
+            snapshot = json.loads(path.read_text())
+            retired_path = directory / RETIRED_SNAPSHOT
+            retired = (
+                json.loads(retired_path.read_text()) if retired_path.exists() else {}
+            )
+            for name, family in self.families.items():
+                merged = type(family)(name, family.description)
+                merged.merge(retired.get(name, {}))
+                merged.merge(snapshot.get(name, {}))
+                retired[name] = merged.values
+            _write_snapshot(RETIRED_SNAPSHOT, retired)
+            path.unlink()
+        except FileNotFoundError:
+            return
+        except OSError:
+            logger.exception("Could not retire the metrics snapshot of %s.", pid)
+
+    def render(self) -> str:
+        """
+        Render the metrics of every worker in the Prometheus text format.
+        """
+        if config.METRICS_DIR:
+            self.flush(force=True)
+            snapshots = [
+                json.loads(path.read_text())
+                for path in Path(config.METRICS_DIR).glob("*.json")
+            ]
+        else:
+            snapshots = [self.snapshot()]
+
+        lines = []
+        for name, family in self.families.items():
+            merged = type(family)(name, family.description)
+            for snapshot in snapshots:
+                merged.merge(snapshot.get(name, {}))
+            lines.append(f"# HELP {name} {family.description}")
+            lines.append(f"# TYPE {name} {family.kind}")
+            lines.extend(merged.render())
+        return "\n".join(lines) + "\n"
+
+
+def _write_snapshot(name: str, snapshot: dict[str, dict]) -> None:
+    """
+    Replace a snapshot file in `METRICS_DIR` at once, so it is never read half written.
+    """
+    directory = Path(config.METRICS_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    with NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False) as f:
+        json.dump(snapshot, f)
+    os.replace(f.name, directory / name)
+
+
+def clear_metrics() -> None:
+    """
+    Remove the snapshots of previous server runs.
+    """
+    if config.METRICS_DIR:
+        for path in Path(config.METRICS_DIR).glob("*.json"):
+            path.unlink(missing_ok=True)
+
+
+metrics = MetricsRegistry()
+
+http_requests = metrics.counter("http_requests_total", "Requests handled.")
+http_request_duration = metrics.histogram(
+    "http_request_duration_seconds", "Request latency in seconds."
+)
+db_query_duration = metrics.histogram(
+    "db_query_duration_seconds", "SQL statement latency in seconds."
+)
+password_hash_duration = metrics.histogram(
+    "password_hash_duration_seconds", "Password hashing latency in seconds."
+)
+audit_log_write_duration = metrics.histogram(
+    "audit_log_write_duration_seconds", "Audit log write latency in seconds."
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.metrics_start = perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "metrics_start", None)
+    if start is not None:
+        db_query_duration.observe(perf_counter() - start)
+
+
+def register_metrics(app: Flask):
+    """
+    Attach request hooks to the app that record per-route request counts
+    and latency.
+    """
+
+    @app.before_request
+    def start_request_timer():
+        g.request_start = perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        start = g.pop("request_start", None)
+        if start is None:
+            return response
+
+        labels = {
+            "blueprint": request.blueprint or "",
+            "route": request.url_rule.rule if request.url_rule else "unmatched",
+            "method": request.method,
+        }
+        http_request_duration.observe(perf_counter() - start, **labels)
+        http_requests.inc(status=str(response.status_code), **labels)
+        metrics.flush()
+
+        return response
@@ -3,7 +3,7 @@ from datetime import datetime
 import jdatetime
 import pytz
 from sqlalchemy import Integer, String
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, declared_attr, mapped_column
 
 
 def utc_to_jalali() -> str:
@@ -28,9 +28,7 @@ def utc_to_jalali() -> str:
 class IDMixin:
     """Mixin to add an auto-incrementing `id` field to a model."""
 
-    id: Mapped[int] = mapped_column(
-        Integer, primary_key=True, autoincrement=True, index=True
-    )
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
 
 class TimestampMixin:
@@ -41,3 +39,21 @@ class TimestampMixin:
         default=utc_to_jalali,
         nullable=False,
     )
+
+
+class VersionMixin:
+    """
+    Mixin to add a `version` counter that is bumped on every update.
+
+    The ORM manages it as the version id column: every UPDATE and DELETE is
+    conditional on the version that was loaded, and raises `StaleDataError`
+    if another transaction changed the row in between.
+    """
+
+    version: Mapped[int] = mapped_column(
+        Integer, default=1, server_default="1", nullable=False
+    )
+
+    @declared_attr.directive
+    def __mapper_args__(cls) -> dict:
+        return {"version_id_col": cls.version}
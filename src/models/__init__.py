@@ -1,6 +1,7 @@
 from src.extensions import Base
 
+from .job import Job, JobStatus
 from .log import Log
 from .user import User
 
-__all__ = ["Base", "User", "Log"]
+__all__ = ["Base", "User", "Log", "Job", "JobStatus"]
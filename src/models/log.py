@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.extensions import db
@@ -7,12 +7,20 @@ from src.mixins import IDMixin, TimestampMixin
 
 class Log(db.Model, IDMixin, TimestampMixin):
     __tablename__ = "logs"
+    __table_args__ = (
+        Index("ix_logs_user_id_created", "user_id", "created"),
+        # Logs are append-only, so a BRIN index answers time ranges at a
+        # fraction of a B-tree's size.
+        Index("ix_logs_created_brin", "created", postgresql_using="brin").ddl_if(
+            dialect="postgresql"
+        ),
+    )
 
     method: Mapped[str] = mapped_column(String(10), nullable=True)
     endpoint: Mapped[str] = mapped_column(String(255), nullable=True)
     status: Mapped[str] = mapped_column(String(10), nullable=True)
     user_id: Mapped[int] = mapped_column(
-        ForeignKey("users.id"), nullable=True, index=True
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=True
     )
 
     user = relationship("User", back_populates="logs")
@@ -1,17 +1,31 @@
-from sqlalchemy import String
+from sqlalchemy import Index, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.extensions import db
-from src.mixins import IDMixin, TimestampMixin
+from src.mixins import IDMixin, TimestampMixin, VersionMixin
 
 
-class User(db.Model, IDMixin, TimestampMixin):
+class User(db.Model, IDMixin, TimestampMixin, VersionMixin):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created", "created"),
+        Index(
+            "ix_users_deleted",
+            "deleted",
+            postgresql_where=text("deleted IS NOT NULL"),
+            sqlite_where=text("deleted IS NOT NULL"),
+        ),
+    )
 
     username: Mapped[str] = mapped_column(String(120), unique=True, nullable=False)
     phone: Mapped[str] = mapped_column(
         String(11), nullable=False, unique=True, index=True
     )
     password: Mapped[str] = mapped_column(String, nullable=False)
+    # Set when the user is deleted, until their logs are purged.
+    deleted: Mapped[str | None] = mapped_column(String(20), nullable=True)
 
-    logs = relationship("Log", back_populates="user", cascade="all, delete-orphan")
+    # The database deletes a user's logs, so they are never loaded for it.
+    logs = relationship(
+        "Log", back_populates="user", cascade="all, delete-orphan", passive_deletes=True
+    )
@@ -0,0 +1,172 @@
+import cProfile
+import json
+import os
+import pstats
+import re
+from collections import Counter
+from pathlib import Path
+from random import random
+from time import perf_counter, strftime
+from uuid import uuid4
+
+import click
+from flask import Flask, current_app, g, request
+from flask.cli import AppGroup
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from src.config import config
+
+PROFILE_HEADER = "X-Profile"
+
+profiles_cli = AppGroup("profiles", help="Capture and inspect request profiles.")
+
+
+def _serializer(app: Flask) -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(app.secret_key, salt="profile")
+
+
+def create_profile_token(app: Flask) -> str:
+    """
+    Sign a token for the `X-Profile` header.
+    """
+    return _serializer(app).dumps("profile")
+
+
+def _is_requested(app: Flask) -> bool:
+    """
+    Whether the request carries a valid, unexpired profiling token.
+    """
+    token = request.headers.get(PROFILE_HEADER)
+    if not token:
+        return False
+    try:
+        _serializer(app).loads(token, max_age=config.PROFILING_TOKEN_MAX_AGE)
+    except BadSignature:
+        return False
+    return True
+
+
+def _save_profile(profiler: cProfile.Profile, duration: float, status: int) -> None:
+    """
+    Dump the profile with its metadata, keeping only the newest
+    `PROFILING_MAX_FILES` profiles.
+    """
+    directory = Path(config.PROFILING_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    stem = "-".join(
+        [
+            strftime("%Y%m%dT%H%M%S"),
+            str(os.getpid()),
+            request.method,
+            re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root",
+            f"{duration * 1000:.0f}ms",
+            uuid4().hex[:8],
+        ]
+    )
+    profiler.dump_stats(directory / f"{stem}.prof")
+    (directory / f"{stem}.json").write_text(
+        json.dumps(
+            {
+                "method": request.method,
+                "route": route,
+                "path": request.path,
+                "status": status,
+                "duration_ms": round(duration * 1000, 3),
+                "pid": os.getpid(),
+            }
+        )
+    )
+
+    profiles = sorted(directory.glob("*.prof"), key=lambda path: path.stat().st_mtime)
+    for path in profiles[: -config.PROFILING_MAX_FILES]:
+        path.unlink(missing_ok=True)
+        path.with_suffix(".json").unlink(missing_ok=True)
+
+
+def register_profiling(app: Flask):
+    """
+    Attach request hooks to the app that profile requests carrying a signed
+    `X-Profile` token, or a sampled `PROFILING_SAMPLE_RATE` share of traffic.
+
+    Nothing is attached unless `PROFILING_ENABLED` is set.
+    """
+    app.cli.add_command(profiles_cli)
+
+    if not config.PROFILING_ENABLED:
+        return
+
+    @app.before_request
+    def start_profiler():
+        if not (random() < config.PROFILING_SAMPLE_RATE or _is_requested(app)):
+            return
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another request on this process is already being profiled.
+            return
+        g.profiler = profiler
+        g.profiler_start = perf_counter()
+
+    @app.after_request
+    def stop_profiler(response):
+        profiler = g.pop("profiler", None)
+        if profiler is None:
+            return response
+
+        profiler.disable()
+        duration = perf_counter() - g.pop("profiler_start")
+        try:
+            _save_profile(profiler, duration, response.status_code)
+        except OSError:
+            app.logger.exception("Could not save the request profile.")
+
+        return response
+
+
+@profiles_cli.command("token")
+def create_token():
+    """
+    Print a token for the `X-Profile` header, valid for `PROFILING_TOKEN_MAX_AGE` seconds.
+    """
+    click.echo(create_profile_token(current_app))
+
+
+@profiles_cli.command("summarize")
+@click.option("--route", help="Only include profiles of this route.")
+@click.option(
+    "--sort",
+    type=click.Choice(["cumulative", "tottime", "ncalls"]),
+    default="cumulative",
+    show_default=True,
+)
+@click.option("--limit", default=25, show_default=True, help="Functions to show.")
+def summarize_profiles(route: str | None, sort: str, limit: int):
+    """
+    Print the hottest functions across the captured profiles.
+    """
+    directory = Path(config.PROFILING_DIR)
+    files, routes = [], Counter()
+    for path in sorted(directory.glob("*.prof")):
+        metadata_path = path.with_suffix(".json")
+        metadata = (
+            json.loads(metadata_path.read_text()) if metadata_path.exists() else {}
+        )
+        if route and metadata.get("route") != route:
+            continue
+        files.append(str(path))
+        routes[f"{metadata.get('method', '?')} {metadata.get('route', '?')}"] += 1
+
+    if not files:
+        raise click.ClickException(f"No profiles found in {directory}.")
+
+    click.echo(f"{len(files)} profiles:")
+    for name, count in routes.most_common():
+        click.echo(f"  {count:>5}  {name}")
+    click.echo()
+
+    stats = pstats.Stats(*files, stream=click.get_text_stream("stdout"))
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
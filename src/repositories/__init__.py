@@ -1,5 +1,6 @@
 from .base import BaseRepository
+from .job import JobRepository
 from .log import LogRepository
 from .user import UserRepository
 
-__all__ = ["BaseRepository", "UserRepository", "LogRepository"]
+__all__ = ["BaseRepository", "UserRepository", "LogRepository", "JobRepository"]
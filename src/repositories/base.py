@@ -2,10 +2,28 @@ from datetime import datetime
 from typing import Any, Generic, Sequence, Type, TypeVar
 
 from pydantic import BaseModel
-from sqlalchemy import ScalarResult, Select, Subquery, func, select
-from sqlalchemy.exc import SQLAlchemyError
-
+from sqlalchemy import (
+    Insert,
+    Row,
+    ScalarResult,
+    Select,
+    Subquery,
+    Text,
+    cast,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+    text,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm.exc import StaleDataError
+
+from src.exceptions import BadRequestException, ConflictException
 from src.extensions import db
+from src.invalidation import publish
 
 ModelType = TypeVar("ModelType")
 
@@ -15,6 +33,10 @@ class BaseRepository(Generic[ModelType]):
     Base repository implementing common CRUD operations for all models.
     """
 
+    # Messages of the BadRequestException raised when a write repeats
+    # another row's value of a unique field, by field name.
+    unique_messages: dict[str, str] = {}
+
     def __init__(self, model_class: Type[ModelType]):
         """
         Initialize the repository with a specific model class.
@@ -28,6 +50,9 @@ class BaseRepository(Generic[ModelType]):
         """
         Create a new model instance.
 
+        On databases supporting `INSERT ... RETURNING` (Postgres, SQLite 3.35+)
+        the row comes back with the insert, instead of a refresh after commit.
+
         Args:
             attributes: Dictionary or Pydantic model containing the attributes.
 
@@ -35,34 +60,169 @@ class BaseRepository(Generic[ModelType]):
             The created model instance.
 
         Raises:
+            BadRequestException: If a field in `unique_messages` repeats another row's value.
             SQLAlchemyError: If there's an error during creation
         """
-        data = (
-            attributes.model_dump(exclude_unset=True)
-            if isinstance(attributes, BaseModel)
-            else attributes
-        )
+        data = self._data(attributes)
 
-        for key, value in data.items():
-            if isinstance(value, datetime) and value.tzinfo is not None:
-                data[key] = value.replace(tzinfo=None)
+        if self._dialect().insert_returning:
+            return self._insert_returning(insert(self.model_class).values(**data), data)
 
         try:
             model = self.model_class(**data)
             db.session.add(model)
+            db.session.flush()
+            self._changed(model)
             db.session.commit()
             db.session.refresh(model)
             return model
+        except IntegrityError as ex:
+            db.session.rollback()
+            raise self._unique_violation(data) or ex
+        except SQLAlchemyError as ex:
+            db.session.rollback()
+            raise ex
+
+    def create_unique(self, attributes: dict[str, Any] | BaseModel) -> ModelType:
+        """
+        Create a new model instance with `INSERT ... ON CONFLICT DO NOTHING
+        RETURNING`, a single statement however many requests race to insert
+        the same unique values.
+
+        Args:
+            attributes: Dictionary or Pydantic model containing the attributes.
+
+        Returns:
+            The created model instance.
+
+        Raises:
+            BadRequestException: If the row conflicts with an existing one.
+            NotImplementedError: If the database is neither Postgres nor SQLite.
+            SQLAlchemyError: If there's an error during creation.
+        """
+        data = self._data(attributes)
+
+        model = self.insert_or_ignore(data)
+        if model is None:
+            raise self._unique_violation(data) or BadRequestException(
+                message=f"{self.model_class.__name__} already exists."
+            )
+
+        return model
+
+    def insert_or_ignore(
+        self,
+        attributes: dict[str, Any] | BaseModel,
+        index_elements: Sequence[str] | None = None,
+    ) -> ModelType | None:
+        """
+        Insert a model instance unless it conflicts with an existing row.
+
+        Args:
+            attributes: Dictionary or Pydantic model containing the attributes.
+            index_elements: Columns of the unique constraint to check, by default
+                every unique constraint.
+
+        Returns:
+            The inserted model instance, or None on a conflict.
+
+        Raises:
+            NotImplementedError: If the database is neither Postgres nor SQLite.
+            SQLAlchemyError: If there's an error during the insert.
+        """
+        data = self._data(attributes)
+
+        statement = self._upsert_statement().values(**data)
+        statement = statement.on_conflict_do_nothing(index_elements=index_elements)
+        return self._insert_returning(statement, data, optional=True)
+
+    def create_many(
+        self, attributes_list: Sequence[dict[str, Any] | BaseModel]
+    ) -> list[ModelType]:
+        """
+        Create several model instances in a single commit.
+
+        Unlike `create`, the instances are not refreshed after the commit.
+
+        Args:
+            attributes_list: Dictionaries or Pydantic models containing the attributes.
+
+        Returns:
+            The created model instances.
+
+        Raises:
+            SQLAlchemyError: If there's an error during creation
+        """
+        models = [
+            self.model_class(
+                **(
+                    attributes.model_dump(exclude_unset=True)
+                    if isinstance(attributes, BaseModel)
+                    else attributes
+                )
+            )
+            for attributes in attributes_list
+        ]
+
+        try:
+            db.session.add_all(models)
+            db.session.flush()
+            for model in models:
+                self._changed(model)
+            db.session.commit()
+            return models
         except SQLAlchemyError as ex:
             db.session.rollback()
             raise ex
 
+    def upsert(
+        self,
+        attributes: dict[str, Any] | BaseModel,
+        index_elements: Sequence[str],
+        update_fields: Sequence[str] | None = None,
+    ) -> ModelType:
+        """
+        Insert a model instance, or update the row it conflicts with.
+
+        Args:
+            attributes: Dictionary or Pydantic model containing the attributes.
+            index_elements: Columns of the unique constraint to resolve conflicts on.
+            update_fields: Fields to overwrite on conflict, by default every given
+                field outside `index_elements`.
+
+        Returns:
+            The inserted or updated model instance.
+
+        Raises:
+            NotImplementedError: If the database is neither Postgres nor SQLite.
+            SQLAlchemyError: If there's an error during the upsert.
+        """
+        data = self._data(attributes)
+
+        statement = self._upsert_statement().values(**data)
+        if update_fields is None:
+            update_fields = [key for key in data if key not in index_elements]
+        set_ = {
+            field: statement.excluded[field]
+            for field in (update_fields or index_elements[:1])
+        }
+        version = self.model_class.__mapper__.version_id_col
+        if version is not None:
+            set_[version.key] = version + 1
+        statement = statement.on_conflict_do_update(
+            index_elements=index_elements, set_=set_
+        )
+        return self._insert_returning(statement, data)
+
     def update(
         self, model: ModelType, attributes: dict[str, Any] | BaseModel
     ) -> ModelType:
         """
         Update an existing model instance.
 
+        Models with a version id column get it bumped whenever a field changes,
+        and are only updated if their row still has the version they were loaded with.
+
         Args:
             model: The model instance to update.
             attributes: Dictionary or Pydantic model containing updated fields.
@@ -71,8 +231,11 @@ class BaseRepository(Generic[ModelType]):
             The updated model instance.
 
         Raises:
+            BadRequestException: If a field in `unique_messages` repeats another row's value.
+            ConflictException: If the row was changed since the model was loaded.
             SQLAlchemyError: If there's an error during update.
         """
+        data = {}
         if attributes:
             data = (
                 attributes.model_dump(exclude_unset=True)
@@ -88,8 +251,15 @@ class BaseRepository(Generic[ModelType]):
                 setattr(model, key, value)
 
         try:
+            self._changed(model)
             db.session.commit()
             return model
+        except StaleDataError:
+            db.session.rollback()
+            raise self._conflict()
+        except IntegrityError as ex:
+            db.session.rollback()
+            raise self._unique_violation(data, exclude=model) or ex
         except SQLAlchemyError as ex:
             db.session.rollback()
             raise ex
@@ -102,15 +272,160 @@ class BaseRepository(Generic[ModelType]):
             model: The model instance to delete.
 
         Raises:
+            ConflictException: If the row was changed since the model was loaded.
             SQLAlchemyError: If there's an error during deletion.
         """
         try:
+            self._changed(model)
             db.session.delete(model)
             db.session.commit()
+        except StaleDataError:
+            db.session.rollback()
+            raise self._conflict()
+        except SQLAlchemyError as ex:
+            db.session.rollback()
+            raise ex
+
+    def estimate_count(self) -> int:
+        """
+        Estimate the number of rows in the table without scanning it.
+
+        Postgres reads the planner's row estimate, and SQLite the highest rowid;
+        other databases, and tables Postgres has never analyzed, get an exact count.
+
+        Returns:
+            The estimated number of rows.
+        """
+        table = self.model_class.__table__
+        dialect = self._dialect().name
+
+        if dialect == "postgresql":
+            estimate = db.session.scalar(
+                text(
+                    "SELECT reltuples::bigint FROM pg_class"
+                    " WHERE oid = CAST(:table AS regclass)"
+                ),
+                {"table": table.name},
+            )
+            if estimate is not None and estimate >= 0:
+                return estimate
+        elif dialect == "sqlite":
+            query = select(func.max(literal_column("rowid"))).select_from(table)
+            return db.session.scalar(query) or 0
+
+        return self._count(self._query())
+
+    def _data(self, attributes: dict[str, Any] | BaseModel) -> dict[str, Any]:
+        """
+        Turn attributes into a dictionary of values, with naive datetimes.
+        """
+        data = (
+            attributes.model_dump(exclude_unset=True)
+            if isinstance(attributes, BaseModel)
+            else attributes
+        )
+
+        for key, value in data.items():
+            if isinstance(value, datetime) and value.tzinfo is not None:
+                data[key] = value.replace(tzinfo=None)
+
+        return data
+
+    def _changed(self, model: ModelType) -> None:
+        """
+        Publish the change of a model's row to the invalidation bus, for
+        caches of it to be evicted once the session commits.
+        """
+        publish(self.model_class.__tablename__, model.id)
+
+    def _dialect(self):
+        """
+        The dialect of the database the model is stored in.
+        """
+        return db.session.get_bind(mapper=self.model_class).dialect
+
+    def _upsert_statement(self) -> Insert:
+        """
+        The dialect's INSERT supporting `ON CONFLICT`.
+        """
+        dialect = self._dialect().name
+        if dialect == "postgresql":
+            return postgresql.insert(self.model_class)
+        if dialect == "sqlite":
+            return sqlite.insert(self.model_class)
+        raise NotImplementedError(f"ON CONFLICT is not supported on {dialect}.")
+
+    def _insert_returning(
+        self, statement: Insert, data: dict[str, Any], optional: bool = False
+    ) -> ModelType | None:
+        """
+        Execute an INSERT with `RETURNING` the full row, then commit.
+
+        The instance is kept out of the session over the commit so it is not
+        expired, which would cost a SELECT on first access. With `optional`,
+        an insert returning no row gives None.
+        """
+        try:
+            result = db.session.scalars(
+                statement.returning(self.model_class),
+                execution_options={"populate_existing": True},
+            )
+            model = result.one_or_none() if optional else result.one()
+            if model is not None:
+                self._changed(model)
+                db.session.expunge(model)
+            db.session.commit()
+            if model is not None:
+                db.session.add(model)
+            return model
+        except IntegrityError as ex:
+            db.session.rollback()
+            raise self._unique_violation(data) or ex
         except SQLAlchemyError as ex:
             db.session.rollback()
             raise ex
 
+    def _conflict(self) -> ConflictException:
+        """
+        The ConflictException for a write that lost to a concurrent one.
+        """
+        return ConflictException(
+            message=f"{self.model_class.__name__} was changed concurrently, "
+            "retry with its current version."
+        )
+
+    def _unique_violation(
+        self, data: dict[str, Any], exclude: ModelType | None = None
+    ) -> BadRequestException | None:
+        """
+        After a write conflicted, find the field in `unique_messages` whose
+        value another row already has, with a single SELECT.
+
+        Returns:
+            The BadRequestException for that field, or None if none matches.
+        """
+        columns = [
+            getattr(self.model_class, field)
+            for field in self.unique_messages
+            if field in data
+        ]
+        if not columns:
+            return None
+
+        query = select(*columns).filter(
+            or_(*(column == data[column.key] for column in columns))
+        )
+        if exclude is not None:
+            query = query.filter(self.model_class.id != exclude.id)
+
+        row = db.session.execute(query.limit(1)).first()
+        if row is None:
+            return None
+
+        for column, value in zip(columns, row):
+            if value == data[column.key]:
+                return BadRequestException(message=self.unique_messages[column.key])
+
     def _query(self) -> Select:
         """
         Construct a base SELECT query for the model.
@@ -151,6 +466,93 @@ class BaseRepository(Generic[ModelType]):
         result: ScalarResult[ModelType] = db.session.scalars(query)
         return result.all()
 
+    def _rows(self, query: Select) -> Sequence[Row]:
+        """
+        Execute a query of columns and return all results as named tuples.
+
+        Unlike `_all`, no model instances are built or added to the session's
+        identity map, for reads whose results are only serialized.
+
+        Args:
+            query: The SELECT query of columns to execute.
+
+        Returns:
+            A list of rows.
+        """
+        return db.session.execute(query).all()
+
+    def _json_page(
+        self, query: Select, fields: Sequence[str], limit: int, offset: int
+    ) -> str:
+        """
+        Have the database render a page of a query as the JSON document of a
+        PaginationResponse, with `json_build_object` and `json_agg` on
+        Postgres, and `json_object` and `json_group_array` on SQLite.
+
+        The items and their total come back together from a single statement,
+        as text, so no row is turned into Python objects. Keys are sorted like
+        in Flask's JSON responses, and items follow the query's ordering.
+
+        Args:
+            query: The ordered SELECT query of the items' columns.
+            fields: Names of the query's columns to render in every item.
+            limit: The most items in the page.
+            offset: The number of items to skip.
+
+        Returns:
+            The page as a JSON document.
+
+        Raises:
+            NotImplementedError: If the database is neither Postgres nor SQLite.
+        """
+        dialect = self._dialect().name
+        if dialect == "postgresql":
+            build_object, aggregate = func.json_build_object, func.json_agg
+        elif dialect == "sqlite":
+            build_object, aggregate = func.json_object, func.json_group_array
+        else:
+            raise NotImplementedError(f"JSON pages are not supported on {dialect}.")
+
+        def key_values(values: dict[str, Any]) -> list:
+            return [
+                part
+                for key in sorted(values)
+                for part in (literal_column(f"'{key}'"), values[key])
+            ]
+
+        if dialect == "postgresql":
+            # Postgres may aggregate a subquery's rows out of its order, so
+            # json_agg orders them by their position under the query's keys.
+            items_query = query.add_columns(
+                func.row_number()
+                .over(order_by=query._order_by_clauses)
+                .label("position")
+            )
+        else:
+            items_query = query
+        page = items_query.limit(limit).offset(offset).subquery()
+        item = build_object(*key_values({f: page.c[f] for f in fields}))
+        if dialect == "postgresql":
+            # json_agg of no rows is NULL, where json_group_array gives [].
+            items = func.coalesce(
+                aggregate(postgresql.aggregate_order_by(item, page.c.position)),
+                literal_column("'[]'::json"),
+            )
+        else:
+            items = aggregate(item)
+        total = (
+            select(func.count())
+            .select_from(query.order_by(None).subquery())
+            .scalar_subquery()
+        )
+        body = build_object(
+            *key_values(
+                {"items": items, "limit": limit, "offset": offset, "total": total}
+            )
+        )
+
+        return db.session.scalar(select(cast(body, Text)).select_from(page))
+
     def _count(self, query: Select) -> int:
         """
         Count the number of results returned by a query.
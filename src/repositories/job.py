@@ -0,0 +1,168 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Sequence
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.extensions import db
+from src.models import Job, JobStatus
+from src.repositories import BaseRepository
+
+
+def utcnow() -> datetime:
+    """
+    The current time in UTC, naive like the `jobs` columns.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class JobRepository(BaseRepository[Job]):
+    """Repository for Job model operations."""
+
+    def __init__(self):
+        super().__init__(Job)
+
+    def enqueue(self, attributes: dict[str, Any]) -> Job:
+        """
+        Add a job to the session without committing it, so it is queued by
+        the caller's next commit, along with the changes it follows up on.
+
+        Args:
+            attributes (dict[str, Any]): The job's attributes.
+
+        Returns:
+            Job: The pending job.
+        """
+        job = Job(**self._data(attributes))
+        db.session.add(job)
+
+        return job
+
+    def claim(
+        self, queue: str, worker: str, limit: int, lease: timedelta
+    ) -> Sequence[Job]:
+        """
+        Claim up to `limit` due jobs of a queue in a single statement.
+
+        Due jobs are queued ones whose `run_at` has passed, and running ones
+        whose lease expired with their worker. Rows locked by another worker's
+        claim are skipped (`FOR UPDATE SKIP LOCKED` on Postgres; SQLite's
+        single writer serializes claims anyway).
+
+        Args:
+            queue (str): The queue to claim from.
+            worker (str): The name of the claiming worker.
+            limit (int): The most jobs to claim.
+            lease (timedelta): How long the worker holds the jobs before
+                another worker may claim them, unless it extends the lease.
+
+        Returns:
+            Sequence[Job]: The claimed jobs, detached from the session.
+
+        Raises:
+            SQLAlchemyError: If there's an error during the claim.
+        """
+        now = utcnow()
+        due = (
+            select(Job.id)
+            .filter(
+                Job.queue == queue,
+                Job.run_at <= now,
+                Job.status != JobStatus.FAILED,
+            )
+            .order_by(Job.run_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        query = (
+            update(Job)
+            .where(Job.id.in_(due))
+            .values(
+                status=JobStatus.RUNNING,
+                attempts=Job.attempts + 1,
+                run_at=now + lease,
+                locked_by=worker,
+            )
+            .returning(Job)
+        )
+
+        try:
+            jobs = db.session.scalars(
+                query, execution_options={"synchronize_session": False}
+            ).all()
+            for job in jobs:
+                db.session.expunge(job)
+            db.session.commit()
+            return jobs
+        except SQLAlchemyError as ex:
+            db.session.rollback()
+            raise ex
+
+    def extend_leases(self, worker: str, lease: timedelta) -> int:
+        """
+        Extend the leases of a worker's running jobs.
+
+        Returns:
+            int: The number of jobs still held by the worker.
+        """
+        query = (
+            update(Job)
+            .where(Job.locked_by == worker, Job.status == JobStatus.RUNNING)
+            .values(run_at=utcnow() + lease)
+        )
+
+        return self._execute(query)
+
+    def complete(self, job: Job) -> None:
+        """
+        Delete a job that ran successfully, unless another worker claimed it since.
+        """
+        query = delete(Job).where(Job.id == job.id, Job.locked_by == job.locked_by)
+
+        self._execute(query)
+
+    def retry(self, job: Job, delay: timedelta, error: str) -> None:
+        """
+        Queue a job that raised again, to run after `delay`.
+        """
+        query = (
+            update(Job)
+            .where(Job.id == job.id, Job.locked_by == job.locked_by)
+            .values(
+                status=JobStatus.QUEUED,
+                run_at=utcnow() + delay,
+                locked_by=None,
+                last_error=error,
+            )
+        )
+
+        self._execute(query)
+
+    def fail(self, job: Job, error: str) -> None:
+        """
+        Keep a job that is not retried anymore as failed, for inspection.
+        """
+        query = (
+            update(Job)
+            .where(Job.id == job.id, Job.locked_by == job.locked_by)
+            .values(status=JobStatus.FAILED, locked_by=None, last_error=error)
+        )
+
+        self._execute(query)
+
+    def _execute(self, query) -> int:
+        """
+        Execute a bulk statement and commit it.
+
+        Returns:
+            int: The number of matched rows.
+        """
+        try:
+            result = db.session.execute(
+                query, execution_options={"synchronize_session": False}
+            )
+            db.session.commit()
+            return result.rowcount
+        except SQLAlchemyError as ex:
+            db.session.rollback()
+            raise ex
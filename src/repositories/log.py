@@ -1,9 +1,188 @@
+from heapq import merge
+from itertools import groupby, islice
+from typing import Any, NamedTuple, Sequence
+
+from pydantic import BaseModel
+from sqlalchemy import Engine, Row, Select, and_, delete, insert, or_, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.config import config
+from src.extensions import db
 from src.models import Log
 from src.repositories import BaseRepository
+from src.sharding import log_shards, shard_index
+
+
+class LogCursor(NamedTuple):
+    """
+    Position of the last log of a page, to read the next page after it.
+    """
+
+    created: str
+    shard: int
+    id: int
 
 
 class LogRepository(BaseRepository[Log]):
-    """Repository for Log model operations."""
+    """
+    Repository for Log model operations.
+
+    With `LOG_SHARDS` configured, logs are stored on the shard their user
+    routes to, and written and deleted there with plain statements: log IDs
+    are only unique within a shard. Otherwise they stay on the primary database.
+    """
 
     def __init__(self):
         super().__init__(Log)
+
+    @property
+    def sharded(self) -> bool:
+        return bool(config.LOG_SHARDS)
+
+    def create(self, attributes: dict[str, Any] | BaseModel) -> Log | Row:
+        """
+        Create a log, on its user's shard when sharded.
+
+        Returns:
+            Log | Row: The created log, as a row of its columns when sharded.
+        """
+        if not self.sharded:
+            return super().create(attributes)
+
+        data = self._data(attributes)
+        shards = log_shards()
+        engine = shards[shard_index(data.get("user_id"), len(shards))]
+        with engine.begin() as connection:
+            return connection.execute(
+                insert(Log).values(**data).returning(*Log.__table__.columns)
+            ).one()
+
+    def create_many(
+        self, attributes_list: Sequence[dict[str, Any] | BaseModel]
+    ) -> list[Log] | None:
+        """
+        Create several logs, with one write per shard they route to when sharded.
+
+        Returns:
+            list[Log] | None: The created logs, or None when sharded.
+        """
+        if not self.sharded:
+            return super().create_many(attributes_list)
+
+        shards = log_shards()
+
+        def route(data: dict[str, Any]) -> int:
+            return shard_index(data.get("user_id"), len(shards))
+
+        rows = sorted(map(self._data, attributes_list), key=route)
+        for index, shard_rows in groupby(rows, key=route):
+            with shards[index].begin() as connection:
+                connection.execute(insert(Log), list(shard_rows))
+
+    def get_page(
+        self,
+        limit: int,
+        after: LogCursor | None = None,
+        user_id: int | None = None,
+    ) -> tuple[list[Row], LogCursor | None]:
+        """
+        Retrieve logs newest first, with keyset pagination.
+
+        A user's logs are read from their shard alone. Other reads query every
+        shard for a page and merge them, ties in `created` ordered by shard,
+        then ID.
+
+        Args:
+            limit (int): The most logs to return.
+            after (LogCursor | None): The cursor returned with the previous page.
+            user_id (int | None): Only return this user's logs.
+
+        Returns:
+            tuple[list[Row], LogCursor | None]: The logs, and the cursor of the
+                next page, None on the last one.
+        """
+        shards: list[Engine | None] = log_shards() or [None]
+        indexes = range(len(shards))
+        if user_id is not None:
+            indexes = [shard_index(user_id, len(shards))]
+
+        pages = []
+        for index in indexes:
+            query = (
+                select(*Log.__table__.columns)
+                .order_by(Log.created.desc(), Log.id.desc())
+                .limit(limit)
+            )
+            if user_id is not None:
+                query = query.filter(Log.user_id == user_id)
+            if after is not None:
+                query = query.filter(self._before(after, index))
+            rows = self._read(shards[index], query)
+            pages.append([(LogCursor(row.created, index, row.id), row) for row in rows])
+
+        page = list(islice(merge(*pages, reverse=True), limit))
+        cursor = page[-1][0] if len(page) == limit else None
+
+        return [row for _, row in page], cursor
+
+    def delete_by_user(self, user_id: int, limit: int) -> int:
+        """
+        Delete up to `limit` of a user's logs, in one short transaction.
+
+        When sharded, the chunk is deleted from the first shard still holding
+        some of the user's logs, so logs left behind by an unfinished reshard
+        are purged too.
+
+        Args:
+            user_id (int): The ID of the user.
+            limit (int): The most logs to delete.
+
+        Returns:
+            int: The number of deleted logs.
+
+        Raises:
+            SQLAlchemyError: If there's an error during deletion.
+        """
+        chunk = select(Log.id).filter(Log.user_id == user_id).limit(limit)
+        query = delete(Log).where(Log.id.in_(chunk))
+
+        if self.sharded:
+            for engine in log_shards():
+                with engine.begin() as connection:
+                    deleted = connection.execute(query).rowcount
+                if deleted:
+                    return deleted
+            return 0
+
+        try:
+            result = db.session.execute(query)
+            db.session.commit()
+            return result.rowcount
+        except SQLAlchemyError as ex:
+            db.session.rollback()
+            raise ex
+
+    @staticmethod
+    def _before(cursor: LogCursor, shard: int):
+        """
+        Filter a shard's logs to those ordered after the cursor, newest first.
+        """
+        if shard < cursor.shard:
+            return Log.created <= cursor.created
+        if shard > cursor.shard:
+            return Log.created < cursor.created
+        return or_(
+            Log.created < cursor.created,
+            and_(Log.created == cursor.created, Log.id < cursor.id),
+        )
+
+    @staticmethod
+    def _read(engine: Engine | None, query: Select) -> Sequence[Row]:
+        """
+        Run a read on a shard, or on the session when logs are not sharded.
+        """
+        if engine is None:
+            return db.session.execute(query).all()
+
+        with engine.connect() as connection:
+            return connection.execute(query).all()
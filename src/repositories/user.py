@@ -1,5 +1,8 @@
 from typing import Sequence, Tuple
 
+from sqlalchemy import Row, Select, select
+
+from src.mixins import utc_to_jalali
 from src.models import User
 from src.repositories import BaseRepository
 from src.schemas import UserFilterParams
@@ -8,9 +11,20 @@ from src.schemas import UserFilterParams
 class UserRepository(BaseRepository[User]):
     """Repository for User model operations."""
 
+    unique_messages = {
+        "username": "User already exists with this username.",
+        "phone": "User already exists with this phone.",
+    }
+
     def __init__(self):
         super().__init__(User)
 
+    def _query(self) -> Select:
+        """
+        Construct a base SELECT query for users that are not deleted.
+        """
+        return super()._query().filter(User.deleted.is_(None))
+
     def get_by_id(self, id_: int) -> User | None:
         """
         Retrieve a user by ID.
@@ -26,6 +40,20 @@ class UserRepository(BaseRepository[User]):
 
         return self._one_or_none(query)
 
+    def get_version(self, id_: int) -> int | None:
+        """
+        Retrieve only the version counter of a user, without loading the row.
+
+        Args:
+            id_ (int): The ID of the user.
+
+        Returns:
+            int | None: The user's version if found; otherwise, None.
+        """
+        query = select(User.version).filter(User.id == id_, User.deleted.is_(None))
+
+        return self._one_or_none(query)
+
     def get_by_username(self, username: str) -> User | None:
         """
         Retrieve a user by username.
@@ -68,8 +96,67 @@ class UserRepository(BaseRepository[User]):
         Returns:
             Tuple[Sequence[User], int]: A tuple containing a list of matching users and the total count.
         """
-        query = self._query()
+        query = self._filter(self._query(), filter_params)
+
+        paginated_query = query.limit(filter_params.limit).offset(filter_params.offset)
+
+        users = self._all(query=paginated_query)
+        total = self._count(query=query)
+
+        return users, total
+
+    def get_filtered_user_rows(
+        self, filter_params: UserFilterParams
+    ) -> Tuple[Sequence[Row], int]:
+        """
+        Retrieve the public columns of filtered users as lightweight rows,
+        with pagination support, for read-only listings.
+
+        Rows skip the password hash, and are neither hydrated into User
+        instances nor tracked by the session.
+
+        Args:
+            filter_params (UserFilterParams): Filtering and pagination parameters.
+
+        Returns:
+            Tuple[Sequence[Row], int]: A tuple containing rows of `id`, `username`,
+                `phone`, `created` and `version`, and the total count.
+        """
+        query = select(User.id, User.username, User.phone, User.created, User.version)
+        query = self._filter(query.filter(User.deleted.is_(None)), filter_params)
+
+        paginated_query = query.limit(filter_params.limit).offset(filter_params.offset)
+
+        rows = self._rows(query=paginated_query)
+        total = self._count(query=query)
 
+        return rows, total
+
+    def get_filtered_users_json(self, filter_params: UserFilterParams) -> str:
+        """
+        Retrieve a page of filtered users rendered by the database as the JSON
+        of a `PaginationResponse[UserResponse]`, in a single statement.
+
+        Args:
+            filter_params (UserFilterParams): Filtering and pagination parameters.
+
+        Returns:
+            str: The page as a JSON document.
+        """
+        query = select(User.id, User.username, User.phone, User.created)
+        query = self._filter(query.filter(User.deleted.is_(None)), filter_params)
+
+        return self._json_page(
+            query,
+            fields=("id", "username", "phone", "created"),
+            limit=filter_params.limit,
+            offset=filter_params.offset,
+        )
+
+    def _filter(self, query: Select, filter_params: UserFilterParams) -> Select:
+        """
+        Apply the filters and ordering of a users listing to a query.
+        """
         if filter_params.username:
             query = query.filter(User.username == filter_params.username)
         if filter_params.phone:
@@ -82,11 +169,41 @@ class UserRepository(BaseRepository[User]):
         if filter_params.created_to:
             query = query.where(User.created <= f"{filter_params.created_to} 23:59:59")
 
-        query = query.order_by(User.created.desc())
+        return query.order_by(User.created.desc())
 
-        paginated_query = query.limit(filter_params.limit).offset(filter_params.offset)
+    def get_deleted(self) -> Sequence[User]:
+        """
+        Retrieve the users marked deleted whose logs are not purged yet.
 
-        users = self._all(query=paginated_query)
-        total = self._count(query=query)
+        Returns:
+            Sequence[User]: The deleted users.
+        """
+        query = select(User).filter(User.deleted.is_not(None))
 
-        return users, total
+        return self._all(query)
+
+    def get_deleted_by_id(self, id_: int) -> User | None:
+        """
+        Retrieve a user marked deleted by ID.
+
+        Args:
+            id_ (int): The ID of the user.
+
+        Returns:
+            User | None: The deleted user if found; otherwise, None.
+        """
+        query = select(User).filter(User.id == id_, User.deleted.is_not(None))
+
+        return self._one_or_none(query)
+
+    def mark_deleted(self, model: User) -> User:
+        """
+        Mark a user deleted, hiding it from every other query.
+
+        Args:
+            model (User): The user to mark.
+
+        Returns:
+            User: The marked user.
+        """
+        return self.update(model=model, attributes={"deleted": utc_to_jalali()})
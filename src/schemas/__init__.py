@@ -1,5 +1,8 @@
 from .auth import LoginRequest, LoginResponse
+from .batch import BatchItem, BatchItemResponse, BatchRequest, BatchResponse
+from .diagnostics import AllocationSite, IdentityMapReport, MemoryReport, ObjectCount
 from .filter import BaseFilterParams
+from .health import LivenessResponse, PoolStatus, ReadinessResponse
 from .log import CreateLog, LogResponse
 from .pagination import PaginationResponse
 from .user import RegisterUser, UpdateUser, UserFilterParams, UserResponse
@@ -15,4 +18,15 @@ __all__ = [
     "LoginResponse",
     "CreateLog",
     "LogResponse",
+    "BatchItem",
+    "BatchRequest",
+    "BatchItemResponse",
+    "BatchResponse",
+    "LivenessResponse",
+    "PoolStatus",
+    "ReadinessResponse",
+    "AllocationSite",
+    "ObjectCount",
+    "IdentityMapReport",
+    "MemoryReport",
 ]
@@ -0,0 +1,27 @@
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field
+
+
+class BatchItem(BaseModel):
+    method: Literal["GET", "POST", "PUT", "DELETE"] = Field(description="Method")
+    path: str = Field(
+        examples=["/api/v1/users/1"], description="Path, including any query string"
+    )
+    headers: dict[str, str] = Field(default_factory=dict, description="Headers")
+    body: dict[str, Any] | None = Field(None, description="JSON body")
+
+
+class BatchRequest(BaseModel):
+    requests: list[BatchItem] = Field(min_length=1, description="Sub-requests")
+
+
+class BatchItemResponse(BaseModel):
+    status: int = Field(examples=[200])
+    body: Any = Field(None, description="JSON body of the sub-response")
+
+
+class BatchResponse(BaseModel):
+    responses: list[BatchItemResponse] = Field(
+        ..., description="Sub-responses, in the order of the sub-requests."
+    )
@@ -0,0 +1,32 @@
+from pydantic import BaseModel, Field
+
+
+class AllocationSite(BaseModel):
+    location: str = Field(examples=["src/repositories/base.py:167"])
+    size: int = Field(description="Bytes allocated at this site.")
+    count: int = Field(description="Live allocations at this site.")
+    size_diff: int | None = Field(None, description="Change since the last snapshot.")
+    count_diff: int | None = Field(None, description="Change since the last snapshot.")
+
+
+class ObjectCount(BaseModel):
+    type: str = Field(examples=["User"])
+    count: int = Field(examples=[100])
+
+
+class IdentityMapReport(BaseModel):
+    requests: int = Field(description="Requests seen by this worker.")
+    last: int = Field(description="Identity map size at the end of the last request.")
+    max: int = Field(description="Largest identity map size at a request end.")
+    average: float = Field(description="Average identity map size at a request end.")
+
+
+class MemoryReport(BaseModel):
+    pid: int = Field(examples=[4242])
+    tracing: bool = Field(description="Whether tracemalloc is running.")
+    traced_current: int | None = Field(None, description="Bytes currently traced.")
+    traced_peak: int | None = Field(None, description="Peak bytes traced.")
+    snapshot_file: str | None = Field(None, description="Where the snapshot was saved.")
+    top_allocations: list[AllocationSite] = Field(default_factory=list)
+    object_counts: list[ObjectCount] = Field(default_factory=list)
+    identity_map: IdentityMapReport
@@ -0,0 +1,25 @@
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class LivenessResponse(BaseModel):
+    status: Literal["ok"] = Field("ok", examples=["ok"])
+
+
+class PoolStatus(BaseModel):
+    size: int | None = Field(None, description="Configured pool size.")
+    checked_out: int | None = Field(None, description="Connections in use.")
+    overflow: int | None = Field(None, description="Connections beyond the pool size.")
+    saturation: float | None = Field(
+        None, description="Share of the pool and overflow in use, from 0 to 1."
+    )
+
+
+class ReadinessResponse(BaseModel):
+    status: Literal["ok", "unavailable"] = Field(examples=["ok"])
+    database: bool = Field(description="Whether the database answered in time.")
+    pool: PoolStatus = Field(description="Connection pool usage of this worker.")
+    requests: int = Field(description="Requests seen within the error window.")
+    error_rate: float = Field(description="Share of those requests that failed.")
+    reasons: list[str] = Field(default_factory=list, examples=[["pool saturated"]])
@@ -23,6 +23,7 @@ class UserResponse(BaseModel):
     username: str = Field(examples=["johndoe"])
     phone: str = Field(examples=["09123456789"])
     created: str = Field(examples=["1404-02-29 11:26:15"])
+    version: int | None = Field(None, exclude=True)
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -0,0 +1,283 @@
+import io
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+from random import Random
+from typing import Iterator
+
+import click
+import jdatetime
+from flask import Flask
+from flask.cli import with_appcontext
+from sqlalchemy import create_engine, func, insert, select, text
+from sqlalchemy.pool import NullPool
+
+from src.extensions import db
+from src.models import Log, User
+from src.repositories import LogRepository
+from src.utils import hash_password
+
+FIRST_NAMES = ["ali", "sara", "reza", "maryam", "mohammad", "zahra", "amir", "fatemeh"]
+LAST_NAMES = ["ahmadi", "hosseini", "karimi", "moradi", "rezaei", "sadeghi", "jafari"]
+
+# Endpoint shapes with their share of traffic, most of it reads.
+LOG_ENDPOINTS = [
+    ("GET", "/api/v1/users", 40),
+    ("GET", "/api/v1/users/{id}", 30),
+    ("POST", "/api/v1/auth/login", 10),
+    ("PUT", "/api/v1/users/{id}", 8),
+    ("POST", "/api/v1/batch", 5),
+    ("DELETE", "/api/v1/auth/logout", 5),
+    ("DELETE", "/api/v1/users/{id}", 2),
+]
+LOG_STATUSES = [("200", 90), ("404", 5), ("400", 3), ("401", 1), ("500", 1)]
+
+# Multiplier coprime with 10**9, so distinct IDs map to distinct phones.
+PHONE_MULTIPLIER = 387420489
+
+
+def _jalali_days(days: int) -> list[str]:
+    """
+    The Jalali dates of the last `days` days.
+    """
+    today = jdatetime.date.today()
+    return [
+        (today - jdatetime.timedelta(days=offset)).strftime("%Y-%m-%d")
+        for offset in range(days)
+    ]
+
+
+def _timestamp(rng: Random, days: list[str]) -> str:
+    seconds = rng.randrange(86400)
+    return (
+        f"{rng.choice(days)} {seconds // 3600:02d}:{seconds // 60 % 60:02d}:"
+        f"{seconds % 60:02d}"
+    )
+
+
+def user_rows(
+    rng: Random, start_id: int, count: int, password: str, days: list[str]
+) -> Iterator[tuple]:
+    """
+    Users with unique usernames and valid, unique `09xxxxxxxxx` phones.
+    """
+    for id_ in range(start_id, start_id + count):
+        username = f"{rng.choice(FIRST_NAMES)}.{rng.choice(LAST_NAMES)}{id_}"
+        phone = f"09{id_ * PHONE_MULTIPLIER % 10**9:09d}"
+        yield id_, username, phone, password, _timestamp(rng, days), 1
+
+
+def log_rows(
+    rng: Random,
+    start_id: int,
+    count: int,
+    user_ids: array,
+    days: list[str],
+) -> Iterator[tuple]:
+    """
+    Logs of existing users, sorted by ID, with skewed endpoints and statuses,
+    where the first users are the most active: the first 1% of users write
+    about a fifth of the logs.
+    """
+    endpoints_weights = list(accumulate(weight for *_, weight in LOG_ENDPOINTS))
+    statuses_weights = list(accumulate(weight for _, weight in LOG_STATUSES))
+    users = len(user_ids)
+
+    for id_ in range(start_id, start_id + count):
+        method, endpoint, _ = rng.choices(LOG_ENDPOINTS, cum_weights=endpoints_weights)[
+            0
+        ]
+        user_id = user_ids[int(users * rng.random() ** 3)]
+        yield (
+            id_,
+            _timestamp(rng, days),
+            method,
+            endpoint.format(id=rng.choice(user_ids)),
+            rng.choices(LOG_STATUSES, cum_weights=statuses_weights)[0][0],
+            user_id,
+        )
+
+
+USER_COLUMNS = ["id", "username", "phone", "password", "created", "version"]
+LOG_COLUMNS = ["id", "created", "method", "endpoint", "status", "user_id"]
+
+
+# Arguments shared by every chunk of a load, sent once to each loader process.
+_extra: tuple = ()
+
+
+def _set_extra(extra: tuple) -> None:
+    global _extra
+    _extra = extra
+
+
+def _rows(kind: str, seed: int, chunk: int, start_id: int, count: int, extra):
+    """
+    The rows of one chunk, which depend only on the seed and the chunk number.
+    """
+    rng = Random(f"{seed}:{kind}:{chunk}")
+    if kind == "users":
+        return user_rows(rng, start_id, count, *extra)
+    return log_rows(rng, start_id, count, *extra)
+
+
+def _copy_chunk(
+    url: str, kind: str, seed: int, chunk: int, start_id: int, count: int
+) -> int:
+    """
+    Load one chunk with `COPY`, on a connection of this process.
+
+    Users go through a staging table, so those whose username or phone is
+    already taken are skipped rather than failing the chunk.
+
+    Returns:
+        int: The number of loaded rows.
+    """
+    columns = ", ".join(USER_COLUMNS if kind == "users" else LOG_COLUMNS)
+    buffer = io.StringIO()
+    for row in _rows(kind, seed, chunk, start_id, count, _extra):
+        buffer.write("\t".join(map(str, row)))
+        buffer.write("\n")
+    buffer.seek(0)
+
+    engine = create_engine(url, poolclass=NullPool)
+    connection = engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            if kind == "users":
+                cursor.execute(
+                    "CREATE TEMP TABLE seed_users (LIKE users) ON COMMIT DROP"
+                )
+                cursor.copy_expert(f"COPY seed_users ({columns}) FROM STDIN", buffer)
+                cursor.execute(
+                    f"INSERT INTO users ({columns}) SELECT {columns} FROM seed_users"
+                    " ON CONFLICT DO NOTHING"
+                )
+                count = cursor.rowcount
+            else:
+                cursor.copy_expert(f"COPY {kind} ({columns}) FROM STDIN", buffer)
+        connection.commit()
+    finally:
+        connection.close()
+        engine.dispose()
+    return count
+
+
+def _load(kind: str, total: int, chunk_size: int, workers: int, seed: int, extra):
+    """
+    Load `total` rows after the table's current highest ID, in chunks.
+
+    On Postgres the chunks are loaded with `COPY` by parallel processes;
+    other databases get batched inserts. With LOG_SHARDS, logs are written
+    through the log repository to their users' shards, which number them.
+    Users whose username or phone is taken are skipped.
+
+    Returns:
+        int: The number of loaded rows.
+    """
+    model = User if kind == "users" else Log
+    columns = USER_COLUMNS if kind == "users" else LOG_COLUMNS
+    start_id = (db.session.scalar(select(func.max(model.id))) or 0) + 1
+    chunks = [
+        (chunk, start_id + offset, min(chunk_size, total - offset))
+        for chunk, offset in enumerate(range(0, total, chunk_size))
+    ]
+
+    loaded = 0
+    logs = LogRepository()
+    if kind == "logs" and logs.sharded:
+        for chunk, chunk_start, count in chunks:
+            rows = _rows(kind, seed, chunk, chunk_start, count, extra)
+            logs.create_many([dict(zip(columns[1:], row[1:])) for row in rows])
+            loaded += count
+            click.echo(f"  {kind}: {loaded}/{total}", err=True)
+    elif db.engine.dialect.name == "postgresql":
+        url = db.engine.url.render_as_string(hide_password=False)
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_set_extra, initargs=(extra,)
+        ) as executor:
+            futures = [
+                executor.submit(_copy_chunk, url, kind, seed, *chunk)
+                for chunk in chunks
+            ]
+            for future in futures:
+                loaded += future.result()
+                click.echo(f"  {kind}: {loaded}/{total}", err=True)
+
+        db.session.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('{kind}', 'id'), "
+                f"(SELECT max(id) FROM {kind}))"
+            )
+        )
+        db.session.execute(text(f"ANALYZE {kind}"))
+        db.session.commit()
+    else:
+        # Users whose username or phone is taken are skipped.
+        statement = insert(model.__table__).prefix_with("OR IGNORE", dialect="sqlite")
+        for chunk, chunk_start, count in chunks:
+            rows = _rows(kind, seed, chunk, chunk_start, count, extra)
+            result = db.session.execute(
+                statement, [dict(zip(columns, row)) for row in rows]
+            )
+            db.session.commit()
+            loaded += result.rowcount
+            click.echo(f"  {kind}: {loaded}/{total}", err=True)
+
+    return loaded
+
+
+@click.command("seed")
+@click.option("--users", default=1000, show_default=True, help="Users to create.")
+@click.option("--logs", default=10000, show_default=True, help="Logs to create.")
+@click.option("--chunk-size", default=100_000, show_default=True)
+@click.option("--workers", default=4, show_default=True, help="Parallel loaders.")
+@click.option("--seed", default=0, show_default=True, help="Random seed.")
+@click.option("--days", default=365, show_default=True, help="Span of timestamps.")
+@click.option(
+    "--password",
+    default="Seed@1234",
+    show_default=True,
+    help="Password of every seeded user.",
+)
+@with_appcontext
+def seed_command(
+    users: int,
+    logs: int,
+    chunk_size: int,
+    workers: int,
+    seed: int,
+    days: int,
+    password: str,
+):
+    """
+    Fill the database with a reproducible synthetic dataset.
+
+    Logs are spread over every user in the table, seeded or not. Users whose
+    username or phone is already taken are skipped.
+    """
+    jalali_days = _jalali_days(days)
+
+    seeded_users = seeded_logs = 0
+    if users:
+        password_hash = hash_password(password)
+        seeded_users = _load(
+            "users", users, chunk_size, workers, seed, (password_hash, jalali_days)
+        )
+
+    if logs:
+        # The IDs themselves, as deleted users leave gaps between them.
+        user_ids = array("q", db.session.scalars(select(User.id).order_by(User.id)))
+        if not user_ids:
+            raise click.ClickException("Seed some users before logs.")
+        seeded_logs = _load(
+            "logs", logs, chunk_size, workers, seed, (user_ids, jalali_days)
+        )
+
+    click.echo(f"Seeded {seeded_users} users and {seeded_logs} logs.")
+
+
+def register_seed_command(app: Flask):
+    """Register the `flask seed` command."""
+
+    app.cli.add_command(seed_command)
@@ -1,10 +1,26 @@
 from flask import Flask, jsonify
 
+from src.admission import register_admission_control
 from src.api import register_blueprints
+from src.capture import register_traffic_capture
+from src.compression import register_compression
 from src.config import config
+from src.diagnostics import register_memory_diagnostics
 from src.exceptions import CustomException
 from src.extensions import db, migrate
+from src.health import register_error_tracking
+from src.indexes import register_index_advisor
+from src.invalidation import register_invalidation
+from src.jobs import register_job_worker
+from src.keyring import register_signing_keys
 from src.logging import register_request_logging
+from src.metrics import register_metrics
+from src.profiling import register_profiling
+from src.seeding import register_seed_command
+from src.sharding import log_shard_urls, register_log_sharding
+from src.sqlite import is_sqlite, register_sqlite, sqlite_binds, sqlite_engine_options
+from src.utils.deadlines import register_deadlines
+from src.utils.queries import register_query_budgets
 
 
 def register_error_handlers(app: Flask) -> None:
@@ -14,7 +30,23 @@ def register_error_handlers(app: Flask) -> None:
             "message": exc.message,
             "code": exc.error_code,
         }
-        return jsonify(payload), exc.code
+        return jsonify(payload), exc.code, exc.headers
+
+
+def engine_options(url: str | None = None) -> dict:
+    """Connection pool settings for the default engine, or another database's."""
+
+    url = url or config.DATABASE_URL
+    if is_sqlite(url):
+        return sqlite_engine_options(url)
+
+    return {
+        "pool_size": config.DATABASE_POOL_SIZE,
+        "max_overflow": config.DATABASE_MAX_OVERFLOW,
+        "pool_recycle": config.DATABASE_POOL_RECYCLE,
+        "pool_pre_ping": True,
+        "connect_args": {"connect_timeout": config.DATABASE_CONNECT_TIMEOUT},
+    }
 
 
 def create_app():
@@ -23,14 +55,39 @@ def create_app():
     app = Flask(__name__)
 
     app.config["SQLALCHEMY_DATABASE_URI"] = config.DATABASE_URL
-    app.config["SECRET_KEY"] = config.SECRET_KEY
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options()
+    app.config["SQLALCHEMY_BINDS"] = {
+        **sqlite_binds(config.DATABASE_URL),
+        **{
+            key: {"url": url, **engine_options(url)}
+            for key, url in log_shard_urls().items()
+        },
+    }
+
+    register_signing_keys(app)
 
     db.init_app(app)
-    migrate.init_app(app, db)
+    migrate.init_app(app, db, render_as_batch=True)
+    register_sqlite(app)
 
     register_blueprints(app)
     register_error_handlers(app)
+    register_query_budgets(app)
     register_request_logging(app)
+    # After request logging, so the deadline is lifted before the action log is written.
+    register_deadlines(app)
+    register_compression(app)
+    register_error_tracking(app)
+    register_metrics(app)
+    register_admission_control(app)
+    register_profiling(app)
+    register_traffic_capture(app)
+    register_memory_diagnostics(app)
+    register_invalidation(app)
+    register_seed_command(app)
+    register_index_advisor(app)
+    register_job_worker(app)
+    register_log_sharding(app)
 
     return app
 
@@ -0,0 +1,55 @@
+from flask import Flask
+from sqlalchemy.pool import QueuePool
+
+from src.config import config
+from src.extensions import db
+from src.keyring import is_ephemeral
+
+
+def dispose_engines(app: Flask) -> None:
+    """
+    Drop the connections a forked worker inherited from its parent.
+
+    `close=False` leaves the parent's connections open for the parent,
+    so the two processes never share a socket.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def prewarm_engines(app: Flask) -> None:
+    """
+    Fill each engine's pool up front and return the connections to it,
+    so a worker's first requests do not pay for connecting.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            size = (
+                engine.pool.size()
+                if isinstance(engine.pool, QueuePool)
+                else config.DATABASE_POOL_SIZE
+            )
+            connections = []
+            try:
+                for _ in range(size):
+                    connections.append(engine.connect())
+            except Exception:
+                app.logger.exception("Could not pre-warm the database pool.")
+            finally:
+                for connection in connections:
+                    connection.close()
+
+
+def check_signing_keys(workers: int) -> None:
+    """
+    Refuse to run several workers with per-process signing keys, since a
+    session signed by one worker would fail verification on another.
+
+    Raises:
+        RuntimeError: If more than one worker would use an ephemeral key.
+    """
+    if workers > 1 and is_ephemeral():
+        raise RuntimeError(
+            "Set SECRET_KEYS_FILE, SECRET_KEYS or SECRET_KEY to run more than one worker."
+        )
@@ -0,0 +1,294 @@
+from collections import Counter
+from itertools import groupby
+from operator import itemgetter
+
+import click
+from flask import Flask
+from flask.cli import AppGroup, with_appcontext
+from sqlalchemy import (
+    Column,
+    Engine,
+    Integer,
+    MetaData,
+    Table,
+    Text,
+    create_engine,
+    delete,
+    func,
+    insert,
+    select,
+)
+
+from src.config import config
+from src.extensions import db
+from src.models import Log
+
+# Bind key of the i-th database in `LOG_SHARDS`.
+LOG_SHARD_BIND = "logs_{}"
+
+logs_cli = AppGroup("logs", help="Manage the log shards.")
+
+
+def _shard_metadata() -> MetaData:
+    """
+    The logs table as created on the shards: without its foreign key, since
+    `users` stays on the primary database. Along with `log_moves`, the logs
+    copied to the shard by a reshard that are not yet deleted from their source.
+    """
+    metadata = MetaData()
+    table = Log.__table__.to_metadata(metadata)
+    for constraint in list(table.foreign_key_constraints):
+        table.constraints.discard(constraint)
+    table.foreign_keys.clear()
+    for column in table.columns:
+        column.foreign_keys.clear()
+    # Copies lose the dialects indexes are limited to.
+    for index in table.indexes:
+        original = next(i for i in Log.__table__.indexes if i.name == index.name)
+        if original._ddl_if is not None:
+            index.ddl_if(**original._ddl_if._asdict())
+
+    Table(
+        "log_moves",
+        metadata,
+        Column("source", Text, primary_key=True),
+        Column("log_id", Integer, primary_key=True),
+        Column("user_id", Integer, nullable=True),
+    )
+    return metadata
+
+
+shard_metadata = _shard_metadata()
+log_moves = shard_metadata.tables["log_moves"]
+
+
+def log_shard_urls() -> dict[str, str]:
+    """
+    The `LOG_SHARDS` databases by bind key, `logs_0`, `logs_1` and so on.
+    """
+    return {LOG_SHARD_BIND.format(i): url for i, url in enumerate(config.LOG_SHARDS)}
+
+
+def log_shards() -> list[Engine]:
+    """
+    The engines of the log shards, in `LOG_SHARDS` order, or none when logs
+    are kept on the primary database.
+    """
+    return [db.engines[key] for key in log_shard_urls()]
+
+
+def jump_hash(key: int, buckets: int) -> int:
+    """
+    Jump consistent hash (Lamping and Veach): spreads keys evenly over
+    `buckets`, and going from n to n + 1 buckets only moves 1/(n + 1) of them.
+    """
+    key &= 0xFFFFFFFFFFFFFFFF
+    bucket, jump = -1, 0
+    while jump < buckets:
+        bucket = jump
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        jump = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+
+def shard_index(user_id: int | None, shards: int) -> int:
+    """
+    The index of the shard holding a user's logs, by `LOG_SHARD_ROUTING`.
+
+    "jump" uses a jump consistent hash of the user ID, so adding a shard only
+    moves the logs the new shard takes. "modulo" takes the ID modulo the
+    number of shards, which spreads sequential IDs perfectly evenly, but
+    moves most logs whenever the number of shards changes.
+    """
+    if user_id is None or shards <= 1:
+        return 0
+    if config.LOG_SHARD_ROUTING == "modulo":
+        return user_id % shards
+    return jump_hash(user_id, shards)
+
+
+def move_logs(
+    source: Engine,
+    shards: list[Engine],
+    chunk_size: int,
+    source_index: int | None = None,
+    dry_run: bool = False,
+) -> Counter:
+    """
+    Move the logs of a database that are not on their user's shard there,
+    in chunks of `chunk_size`.
+
+    Every chunk is copied to its shard and journaled in `log_moves` in one
+    transaction, then deleted from the source, then its journal entries. Log
+    IDs are only unique per database, so the copies get new ones; the journal
+    is what lets a move interrupted in between finish without copying the
+    chunk twice: it is resumed by deleting the journaled logs from the source.
+
+    Args:
+        source: The database to move logs from.
+        shards: The log shards.
+        chunk_size: The most logs to copy and delete at once.
+        source_index: The source's index in `shards`, if it is one of them.
+        dry_run: Only count the logs to move.
+
+    Returns:
+        Counter: The number of moved logs by shard index.
+    """
+    source_key = source.url.render_as_string(hide_password=True)
+    if not dry_run:
+        for shard in shards:
+            _finish_moves(source, source_key, shard)
+
+    with source.connect() as connection:
+        counts = connection.execute(
+            select(Log.user_id, func.count()).group_by(Log.user_id)
+        ).all()
+
+    columns = [column for column in Log.__table__.columns if column.key != "id"]
+    moved = Counter()
+    for user_id, count in counts:
+        target = shard_index(user_id, len(shards))
+        if target == source_index:
+            continue
+        if dry_run:
+            moved[target] += count
+            continue
+
+        chunk = (
+            select(Log.id, *columns)
+            .filter(Log.user_id.is_not_distinct_from(user_id))
+            .order_by(Log.id)
+            .limit(chunk_size)
+        )
+        while True:
+            with source.connect() as connection:
+                rows = connection.execute(chunk).all()
+            if not rows:
+                break
+            with shards[target].begin() as connection:
+                connection.execute(
+                    insert(Log),
+                    [
+                        {column.key: row._mapping[column.key] for column in columns}
+                        for row in rows
+                    ],
+                )
+                connection.execute(
+                    insert(log_moves),
+                    [
+                        {"source": source_key, "log_id": row.id, "user_id": user_id}
+                        for row in rows
+                    ],
+                )
+            _finish_moves(source, source_key, shards[target])
+            moved[target] += len(rows)
+
+    return moved
+
+
+def _finish_moves(source: Engine, source_key: str, shard: Engine) -> None:
+    """
+    Delete the logs journaled as copied to a shard from their source, then
+    their journal entries.
+
+    Logs are matched by user as well as ID, in case the source reused the ID
+    of a moved log since.
+    """
+    with shard.connect() as connection:
+        journaled = connection.execute(
+            select(log_moves.c.user_id, log_moves.c.log_id)
+            .filter(log_moves.c.source == source_key)
+            .order_by(log_moves.c.user_id)
+        ).all()
+
+    for user_id, entries in groupby(journaled, key=itemgetter(0)):
+        ids = [log_id for _, log_id in entries]
+        with source.begin() as connection:
+            connection.execute(
+                delete(Log).where(
+                    Log.id.in_(ids), Log.user_id.is_not_distinct_from(user_id)
+                )
+            )
+        with shard.begin() as connection:
+            connection.execute(
+                delete(log_moves).where(
+                    log_moves.c.source == source_key, log_moves.c.log_id.in_(ids)
+                )
+            )
+
+
+@logs_cli.command("init")
+@with_appcontext
+def init_shards():
+    """
+    Create the logs and log_moves tables on every log shard missing them.
+    """
+    shards = log_shards()
+    if not shards:
+        raise click.ClickException("No LOG_SHARDS are configured.")
+
+    for index, engine in enumerate(shards):
+        shard_metadata.create_all(engine)
+        click.echo(f"Shard {index}: {engine.url.render_as_string()}")
+
+
+@logs_cli.command("reshard")
+@click.option(
+    "--from-primary",
+    is_flag=True,
+    help="Also move the logs written to the primary database before sharding.",
+)
+@click.option(
+    "--source",
+    "sources",
+    multiple=True,
+    help="URL of a database removed from LOG_SHARDS to drain, repeatable.",
+)
+@click.option(
+    "--chunk-size",
+    type=int,
+    help="Logs to move at once. Defaults to LOG_RESHARD_CHUNK_SIZE.",
+)
+@click.option("--dry-run", is_flag=True, help="Only count the logs to move.")
+@with_appcontext
+def reshard(
+    from_primary: bool, sources: tuple[str, ...], chunk_size: int | None, dry_run: bool
+):
+    """
+    Move every log to the shard its user routes to under the current
+    LOG_SHARDS and LOG_SHARD_ROUTING.
+
+    Run it after changing either; new logs are written to their new shard
+    right away. Run it again after an interruption to finish the moves.
+    """
+    shards = log_shards()
+    if not shards:
+        raise click.ClickException("No LOG_SHARDS are configured.")
+    chunk_size = chunk_size or config.LOG_RESHARD_CHUNK_SIZE
+
+    # Shards added since the last run have no table yet.
+    for engine in shards:
+        shard_metadata.create_all(engine)
+
+    plan = [(f"shard {index}", engine, index) for index, engine in enumerate(shards)]
+    if from_primary:
+        plan.append(("primary", db.engine, None))
+    retired = [create_engine(url) for url in sources]
+    plan.extend((f"source {engine.url}", engine, None) for engine in retired)
+
+    verb = "Would move" if dry_run else "Moved"
+    try:
+        for label, engine, index in plan:
+            moved = move_logs(engine, shards, chunk_size, index, dry_run)
+            for target, count in sorted(moved.items()):
+                click.echo(f"{verb} {count} logs from {label} to shard {target}.")
+    finally:
+        for engine in retired:
+            engine.dispose()
+
+
+def register_log_sharding(app: Flask):
+    """
+    Add the `flask logs` commands to the app.
+    """
+    app.cli.add_command(logs_cli)
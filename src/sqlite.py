@@ -0,0 +1,116 @@
+from functools import partial
+
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.engine import URL, Engine, make_url
+
+from src.config import config
+from src.extensions import READER_BIND, db
+
+
+def is_sqlite(url: str | URL) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def is_file_database(url: str | URL) -> bool:
+    """
+    Whether the URL names an SQLite database file, rather than an in-memory one.
+    """
+    url = make_url(url)
+    return (
+        is_sqlite(url)
+        and url.database not in (None, "", ":memory:")
+        and url.query.get("mode") != "memory"
+    )
+
+
+def _pool_options(size: int) -> dict:
+    return {
+        "pool_size": size,
+        "max_overflow": 0,
+        "pool_timeout": config.SQLITE_BUSY_TIMEOUT,
+        "connect_args": {
+            "timeout": config.SQLITE_BUSY_TIMEOUT,
+            "check_same_thread": False,
+        },
+    }
+
+
+def sqlite_engine_options(url: str | URL) -> dict:
+    """
+    Options of the default engine, which is the only writer for a database file.
+    """
+    if not is_file_database(url):
+        return {}
+    return _pool_options(1)
+
+
+def sqlite_binds(url: str | URL) -> dict:
+    """
+    The `READER_BIND` engine serving reads for a database file, alongside the writer.
+    """
+    if not is_file_database(url):
+        return {}
+    return {READER_BIND: {"url": url, **_pool_options(config.SQLITE_READERS)}}
+
+
+def read_engine() -> Engine:
+    """
+    The engine for standalone reads: the SQLite readers when configured,
+    otherwise the default engine.
+    """
+    return db.engines.get(READER_BIND, db.engine)
+
+
+def _set_pragmas(dbapi_connection, connection_record, file: bool, read_only: bool):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys = ON")
+    if file:
+        cursor.execute("PRAGMA journal_mode = WAL")
+        cursor.execute(f"PRAGMA synchronous = {config.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size = {config.SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size = -{config.SQLITE_CACHE_SIZE}")
+        cursor.execute("PRAGMA temp_store = MEMORY")
+    if read_only:
+        cursor.execute("PRAGMA query_only = ON")
+    cursor.close()
+
+
+def _disable_driver_transactions(dbapi_connection, connection_record):
+    # Leave BEGIN to `_begin_immediate` rather than the driver.
+    dbapi_connection.isolation_level = None
+
+
+def _begin_immediate(connection):
+    # Take the write lock up front, so writers queue on `busy_timeout`
+    # instead of failing when a read transaction tries to upgrade. Sent on
+    # the driver connection so it is not counted as a query, like Postgres'
+    # implicit BEGIN.
+    connection.connection.driver_connection.execute("BEGIN IMMEDIATE")
+
+
+def register_sqlite(app: Flask):
+    """
+    Tune the app's SQLite engines, if any.
+
+    Every connection enforces foreign keys. For a database file, connections
+    also use WAL, `SQLITE_SYNCHRONOUS`, `SQLITE_MMAP_SIZE` and `SQLITE_CACHE_SIZE`;
+    the `READER_BIND` connections are read-only, and the single writer
+    starts its transactions with `BEGIN IMMEDIATE`.
+    """
+    with app.app_context():
+        engines = dict(db.engines)
+
+    for key, engine in engines.items():
+        if engine.dialect.name != "sqlite":
+            continue
+
+        file = is_file_database(engine.url)
+        event.listen(
+            engine,
+            "connect",
+            partial(_set_pragmas, file=file, read_only=key == READER_BIND),
+        )
+        if file and key is None:
+            event.listen(engine, "connect", _disable_driver_transactions)
+            event.listen(engine, "begin", _begin_immediate)
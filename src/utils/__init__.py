@@ -1,4 +1,22 @@
-from .auth import login_required
+from .auth import admin_required, hash_password, login_required, verify_password
+from .cache import LocalCache, cache_headers, is_not_modified, make_etag
+from .deadlines import deadline, request_deadline
+from .queries import max_queries, query_budget
 from .validators import PasswordValidator, PhoneValidator
 
-__all__ = ["PasswordValidator", "PhoneValidator", "login_required"]
+__all__ = [
+    "PasswordValidator",
+    "PhoneValidator",
+    "login_required",
+    "admin_required",
+    "hash_password",
+    "verify_password",
+    "make_etag",
+    "is_not_modified",
+    "cache_headers",
+    "LocalCache",
+    "max_queries",
+    "query_budget",
+    "deadline",
+    "request_deadline",
+]
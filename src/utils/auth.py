@@ -1,8 +1,11 @@
 from functools import wraps
 
 from flask import session
+from werkzeug.security import check_password_hash, generate_password_hash
 
-from src.exceptions import UnauthorizedException
+from src.config import config
+from src.exceptions import ForbiddenException, UnauthorizedException
+from src.metrics import password_hash_duration
 
 
 def login_required(fn):
@@ -16,3 +19,35 @@ def login_required(fn):
         return fn(*args, **kwargs)
 
     return wrapper
+
+
+def admin_required(fn):
+    """
+    Check that user is authenticated and listed in `ADMIN_USER_IDS`.
+    """
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if "user_id" not in session:
+            raise UnauthorizedException(message="Authentication required.")
+        if session["user_id"] not in config.ADMIN_USER_IDS:
+            raise ForbiddenException(message="Admin access required.")
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def hash_password(password: str) -> str:
+    """
+    Hash a password, recording how long it took.
+    """
+    with password_hash_duration.time(operation="generate"):
+        return generate_password_hash(password=password)
+
+
+def verify_password(password_hash: str, password: str) -> bool:
+    """
+    Check a password against its hash, recording how long it took.
+    """
+    with password_hash_duration.time(operation="check"):
+        return check_password_hash(password_hash, password)
@@ -0,0 +1,106 @@
+from collections import OrderedDict
+from hashlib import sha1
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Hashable
+
+from flask import request
+from werkzeug.http import quote_etag
+
+from src.config import config
+
+
+def make_etag(*parts) -> str:
+    """
+    Build a strong ETag value from the given parts.
+    """
+    raw = ":".join(str(part) for part in parts)
+    return sha1(raw.encode(), usedforsecurity=False).hexdigest()
+
+
+def is_not_modified(etag: str) -> bool:
+    """
+    Check whether the request's If-None-Match header matches the ETag.
+
+    Uses weak comparison, so ETags weakened by response compression still match.
+    """
+    return request.if_none_match.contains_weak(etag)
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+    """
+    Build the ETag and Cache-Control headers for a cacheable response.
+    """
+    return {"ETag": quote_etag(etag), "Cache-Control": config.CACHE_CONTROL}
+
+
+class LocalCache:
+    """
+    A thread-safe in-process cache, keeping up to `CACHE_SIZE` entries for
+    `CACHE_TTL` seconds, least recently used first out. It stores nothing
+    while `CACHE_TTL` is 0.
+
+    Entries are evicted when the rows they were read from change, by handlers
+    subscribed to the invalidation bus (`src.invalidation`).
+    """
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = Lock()
+        # Bumped by every eviction, so values read before one are not stored after it.
+        self._generation = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if entry[0] <= monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def get_or_set(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        """
+        Get the value cached under `key`, or load and cache it.
+
+        A value loaded while the key was evicted is returned but not cached,
+        since it may have been read before the change that evicted it.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        generation = self._generation
+        value = load()
+        self.set(key, value, generation=generation)
+        return value
+
+    def set(self, key: Hashable, value: Any, generation: int | None = None) -> None:
+        if not config.CACHE_TTL:
+            return
+
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (monotonic() + config.CACHE_TTL, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > config.CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+    def evict(self, key: Hashable) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_MISSING = object()
@@ -0,0 +1,242 @@
+import sqlite3
+from contextlib import ContextDecorator
+from contextvars import ContextVar, Token
+from math import ceil
+from time import monotonic
+
+from flask import Flask, current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.config import config
+from src.exceptions import BadRequestException, GatewayTimeoutException
+from src.extensions import db
+
+# Header in which clients send how many seconds they will wait for the response.
+DEADLINE_HEADER = "X-Request-Timeout"
+
+# SQLite VM instructions between checks of the deadline while a statement runs.
+SQLITE_PROGRESS_STEPS = 10000
+
+# Connection info key of the transaction and milliseconds of the statement
+# timeout a deadline last set.
+STATEMENT_TIMEOUT_SET = "deadline_statement_timeout"
+
+# Share of its time left by which a statement may run past the deadline, so
+# the statement timeout is not set again before every statement.
+STATEMENT_TIMEOUT_SLACK = 0.1
+
+_current_deadline: ContextVar["Deadline | None"] = ContextVar(
+    "current_deadline", default=None
+)
+
+
+class Deadline:
+    """
+    A point in time by which the current work should be done.
+    """
+
+    def __init__(self, expires_at: float) -> None:
+        self.expires_at = expires_at
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        return cls(monotonic() + seconds)
+
+    def remaining(self) -> float:
+        """
+        Seconds left until the deadline, negative once it passed.
+        """
+        return self.expires_at - monotonic()
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+def current_deadline() -> Deadline | None:
+    """
+    The deadline of the current context, if any.
+    """
+    return _current_deadline.get()
+
+
+class deadline(ContextDecorator):
+    """
+    Bound the SQL statements of the wrapped block or function by a deadline,
+    `seconds` from now or an existing `Deadline`.
+
+    Deadlines nest, the earliest one applies. Statements starting after the
+    deadline raise GatewayTimeoutException without reaching the database;
+    Postgres cancels running ones with `statement_timeout`, and SQLite
+    interrupts them.
+
+    Seconds count from entering the block, or from each call of a decorated
+    function.
+
+    Usage:
+        with deadline(2.5):
+            user_controller.get_users(filter_params)
+    """
+
+    def __init__(self, limit: float | Deadline | None) -> None:
+        self.limit = limit
+        self._tokens: list[Token] = []
+
+    def _recreate_cm(self) -> "deadline":
+        # Each call of a decorated function counts from its own start.
+        return type(self)(self.limit)
+
+    def __enter__(self) -> Deadline | None:
+        outer = _current_deadline.get()
+        inner = self.limit
+        if isinstance(inner, (int, float)):
+            inner = Deadline.after(inner)
+        if outer is not None and (inner is None or outer.expires_at < inner.expires_at):
+            inner = outer
+        self._tokens.append(_current_deadline.set(inner))
+        return inner
+
+    def __exit__(self, *exc_info) -> None:
+        _current_deadline.reset(self._tokens.pop())
+
+
+def request_deadline(seconds: float):
+    """
+    Declare how many seconds a view's requests may take, instead of
+    `REQUEST_DEADLINE`.
+
+    Place it under the route decorator so the deadline stays on the registered view.
+    """
+
+    def decorator(fn):
+        fn.request_deadline = seconds
+        return fn
+
+    return decorator
+
+
+def _exceeded() -> GatewayTimeoutException:
+    if has_app_context():
+        g.deadline_exceeded = True
+    return GatewayTimeoutException(
+        message="The request did not complete within its deadline."
+    )
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _apply_deadline(conn, cursor, statement, parameters, context, executemany):
+    current = _current_deadline.get()
+    if current is None:
+        return
+
+    remaining = current.remaining()
+    if remaining <= 0:
+        raise _exceeded()
+    if conn.dialect.name == "postgresql":
+        # 0 would disable the timeout, so at least 1 ms.
+        milliseconds = max(ceil(remaining * 1000), 1)
+        # LOCAL lasts until the transaction ends, so a timeout set earlier in
+        # it is kept while it is not much longer than the time left.
+        transaction = conn.get_transaction()
+        set_in, applied = conn.info.get(STATEMENT_TIMEOUT_SET, (None, 0))
+        if set_in is transaction and (
+            milliseconds <= applied <= milliseconds * (1 + STATEMENT_TIMEOUT_SLACK)
+        ):
+            return
+        cursor.execute(f"SET LOCAL statement_timeout = {milliseconds}")
+        conn.info[STATEMENT_TIMEOUT_SET] = (transaction, milliseconds)
+
+
+@event.listens_for(Engine, "handle_error")
+def _translate_timeout(context):
+    if _current_deadline.get() is None:
+        return
+
+    error = context.original_exception
+    cancelled = getattr(error, "pgcode", None) == "57014" or (
+        isinstance(error, sqlite3.OperationalError) and str(error) == "interrupted"
+    )
+    if cancelled:
+        raise _exceeded() from context.sqlalchemy_exception
+
+
+def _interrupt_expired() -> bool:
+    current = _current_deadline.get()
+    return current is not None and current.expired
+
+
+@event.listens_for(Engine, "connect")
+def _install_progress_handler(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.set_progress_handler(_interrupt_expired, SQLITE_PROGRESS_STEPS)
+
+
+def _seconds(value: str) -> float:
+    try:
+        seconds = float(value)
+    except ValueError:
+        seconds = 0
+    if not seconds > 0:
+        raise BadRequestException(
+            message=f"{DEADLINE_HEADER} must be a positive number of seconds."
+        )
+    return seconds
+
+
+def _reset_statement_timeout() -> None:
+    """
+    Lift the statement timeout a deadline set in the session's open
+    transaction, which would otherwise bound its later statements too.
+    """
+    session = db.session()
+    if not session.in_transaction():
+        return
+    connection = session.connection()
+    if connection.info.pop(STATEMENT_TIMEOUT_SET, False):
+        connection.exec_driver_sql("RESET statement_timeout")
+
+
+def register_deadlines(app: Flask):
+    """
+    Attach request hooks to the app that bound every request's SQL statements
+    by a deadline: the view's `request_deadline`, or `REQUEST_DEADLINE` unless 0,
+    shortened to the `X-Request-Timeout` header's seconds when the client waits less.
+
+    The deadline is lifted before the after_request hooks registered earlier,
+    so the action log of a request that ran out of time is still written.
+    """
+
+    @app.before_request
+    def start_deadline():
+        view = current_app.view_functions.get(request.endpoint)
+        seconds = getattr(view, "request_deadline", config.REQUEST_DEADLINE)
+
+        header = request.headers.get(DEADLINE_HEADER)
+        if header is not None:
+            client_seconds = _seconds(header)
+            seconds = min(seconds, client_seconds) if seconds else client_seconds
+
+        if seconds:
+            g.request_deadline = deadline(seconds)
+            g.request_deadline.__enter__()
+
+    def end_deadline():
+        scope = g.pop("request_deadline", None)
+        if scope is not None:
+            scope.__exit__(None, None, None)
+        # Postgres aborts the transaction of a cancelled statement.
+        if g.pop("deadline_exceeded", False):
+            db.session.rollback()
+        elif scope is not None:
+            _reset_statement_timeout()
+
+    @app.after_request
+    def lift_deadline(response):
+        end_deadline()
+        return response
+
+    @app.teardown_request
+    def clear_deadline(exc):
+        # Requests that failed before after_request still hold their deadline.
+        end_deadline()
@@ -0,0 +1,145 @@
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+
+from flask import Flask, current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.config import config
+
+_active_counters: ContextVar[tuple["QueryCounter", ...]] = ContextVar(
+    "active_query_counters", default=()
+)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised when a block or request runs more SQL statements than its budget.
+    """
+
+
+class QueryCounter:
+    """
+    Records the SQL statements, and their parameters, executed in the current
+    context while active.
+
+    Counters nest, every active counter sees every statement.
+    """
+
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+        self.parameters: list = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def start(self) -> "QueryCounter":
+        _active_counters.set(_active_counters.get() + (self,))
+        return self
+
+    def stop(self) -> None:
+        _active_counters.set(
+            tuple(counter for counter in _active_counters.get() if counter is not self)
+        )
+
+    def __enter__(self) -> "QueryCounter":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    for counter in _active_counters.get():
+        counter.statements.append(statement)
+        counter.parameters.append(parameters)
+
+
+def _exceeded_message(name: str, counter: QueryCounter, budget: int) -> str:
+    statements = "\n".join(f"  {statement}" for statement in counter.statements)
+    return f"{name} ran {counter.count} queries, over its budget of {budget}:\n{statements}"
+
+
+class max_queries(ContextDecorator):
+    """
+    Fail when the wrapped block or function runs more than `budget` SQL statements.
+
+    Usage:
+        with max_queries(2):
+            client.get("/api/v1/users/1")
+    """
+
+    def __init__(self, budget: int) -> None:
+        self.budget = budget
+        self.counter: QueryCounter | None = None
+
+    def __enter__(self) -> QueryCounter:
+        self.counter = QueryCounter().start()
+        return self.counter
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        self.counter.stop()
+        if exc_type is None and self.counter.count > self.budget:
+            raise QueryBudgetExceeded(
+                _exceeded_message("Block", self.counter, self.budget)
+            )
+
+
+def query_budget(budget: int):
+    """
+    Declare how many SQL statements a view may run per request, request hooks
+    such as the action log included.
+
+    Place it under the route decorator so the budget stays on the registered view.
+    """
+
+    def decorator(fn):
+        fn.query_budget = budget
+        return fn
+
+    return decorator
+
+
+def register_query_budgets(app: Flask):
+    """
+    Attach request hooks to the app that count each request's SQL statements
+    and compare them with the view's declared `query_budget`.
+
+    Requests over budget are logged when `QUERY_BUDGET_MODE` is "log" and fail
+    when it is "raise". Nothing is attached while it is "off".
+    """
+    if config.QUERY_BUDGET_MODE == "off":
+        return
+
+    @app.before_request
+    def start_query_counter():
+        g.query_counter = QueryCounter().start()
+
+    @app.after_request
+    def check_query_budget(response):
+        counter = g.pop("query_counter", None)
+        if counter is None:
+            return response
+        counter.stop()
+
+        view = current_app.view_functions.get(request.endpoint)
+        budget = getattr(view, "query_budget", None)
+        if budget is None or counter.count <= budget:
+            return response
+
+        message = _exceeded_message(
+            f"{request.method} {request.url_rule.rule}", counter, budget
+        )
+        if config.QUERY_BUDGET_MODE == "raise":
+            raise QueryBudgetExceeded(message)
+        app.logger.warning(message)
+        return response
+
+    @app.teardown_request
+    def stop_query_counter(exc):
+        # Requests that failed before after_request still hold their counter.
+        counter = g.pop("query_counter", None)
+        if counter is not None:
+            counter.stop()
@@ -0,0 +1,114 @@
+from http import HTTPStatus
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from src.config import config
+from src.extensions import db
+from src.models import Log, User
+
+
+def create_user(
+    username: str = "testuser", phone: str = "09123456789", password: str = "Test@123"
+) -> User:
+    """
+    Helper to create and persist a single User instance.
+    """
+    user = User(
+        username=username, phone=phone, password=generate_password_hash(password)
+    )
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+class TestBatchEndpoint:
+    """
+    Tests for the batch endpoint.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, session, monkeypatch):
+        db.session = session
+        self.client = client
+        # Sub-requests share the single test connection, so run them in order.
+        monkeypatch.setattr(config, "BATCH_MAX_WORKERS", 1)
+
+        self.admin = create_user(
+            username="admin", phone="09123456780", password="Test@123"
+        )
+        resp = self.client.post(
+            "/api/v1/auth/login", json={"username": "admin", "password": "Test@123"}
+        )
+        assert resp.status_code == HTTPStatus.OK
+
+    def test_batch_dispatches_in_order(self):
+        """
+        Each sub-request should get its own status and body, in order.
+        """
+        user = create_user(username="alice", phone="09123456781")
+        payload = {
+            "requests": [
+                {"method": "GET", "path": f"/api/v1/users/{user.id}"},
+                {"method": "GET", "path": "/api/v1/users/9999"},
+                {
+                    "method": "PUT",
+                    "path": f"/api/v1/users/{user.id}",
+                    "body": {"username": "alice2"},
+                },
+                {"method": "GET", "path": "/api/v1/users?username=alice2"},
+            ]
+        }
+
+        resp = self.client.post("/api/v1/batch", json=payload)
+
+        assert resp.status_code == HTTPStatus.OK
+        responses = resp.get_json()["responses"]
+        assert [r["status"] for r in responses] == [200, 404, 200, 200]
+        assert responses[0]["body"]["username"] == "alice"
+        assert responses[2]["body"]["username"] == "alice2"
+        assert responses[3]["body"]["total"] == 1
+
+    def test_batch_uses_caller_session(self):
+        """
+        Sub-requests should be unauthorized when the caller is logged out.
+        """
+        self.client.delete("/api/v1/auth/logout")
+        payload = {"requests": [{"method": "GET", "path": "/api/v1/users"}]}
+
+        resp = self.client.post("/api/v1/batch", json=payload)
+
+        assert resp.get_json()["responses"][0]["status"] == HTTPStatus.UNAUTHORIZED
+
+    def test_batch_writes_logs_together(self):
+        """
+        The batch and each of its sub-requests should be logged.
+        """
+        payload = {
+            "requests": [
+                {"method": "GET", "path": f"/api/v1/users/{self.admin.id}"},
+                {"method": "GET", "path": "/api/v1/users"},
+            ]
+        }
+        before = db.session.query(Log).count()
+
+        self.client.post("/api/v1/batch", json=payload)
+
+        endpoints = [
+            log.endpoint for log in db.session.query(Log).order_by(Log.id)[before:]
+        ]
+        assert endpoints == [
+            f"/api/v1/users/{self.admin.id}",
+            "/api/v1/users",
+            "/api/v1/batch",
+        ]
+
+    def test_batch_rejects_nested_batch(self):
+        """
+        A batch must not contain another batch.
+        """
+        payload = {"requests": [{"method": "POST", "path": "/api/v1/batch"}]}
+
+        resp = self.client.post("/api/v1/batch", json=payload)
+
+        assert resp.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,81 @@
+import gzip
+import json
+import zlib
+from http import HTTPStatus
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from src.compression import compress_stream
+from src.extensions import db
+from src.models import User
+
+
+def create_users(count: int) -> None:
+    """
+    Helper to persist several users sharing one password hash.
+    """
+    password = generate_password_hash("Test@123")
+    db.session.add_all(
+        User(username=f"user{i}", phone=f"0912345{i:04d}", password=password)
+        for i in range(count)
+    )
+    db.session.commit()
+
+
+class TestCompression:
+    """
+    Tests for response compression.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, session):
+        db.session = session
+        self.client = client
+
+        create_users(20)
+        resp = self.client.post(
+            "/api/v1/auth/login", json={"username": "user0", "password": "Test@123"}
+        )
+        assert resp.status_code == HTTPStatus.OK
+
+    def test_large_json_is_gzipped(self):
+        """
+        A large JSON page should be gzipped when the client accepts it.
+        """
+        resp = self.client.get("/api/v1/users", headers={"Accept-Encoding": "gzip"})
+
+        assert resp.status_code == HTTPStatus.OK
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in resp.headers["Vary"]
+        assert resp.headers["ETag"].startswith("W/")
+        data = json.loads(gzip.decompress(resp.data))
+        assert data["total"] == 20
+
+    def test_no_accept_encoding_is_identity(self):
+        """
+        Responses should stay uncompressed when the client does not ask for it.
+        """
+        resp = self.client.get("/api/v1/users")
+
+        assert "Content-Encoding" not in resp.headers
+        assert resp.get_json()["total"] == 20
+
+    def test_small_response_is_not_compressed(self):
+        """
+        Responses below the size threshold should not be compressed.
+        """
+        resp = self.client.delete(
+            "/api/v1/auth/logout", headers={"Accept-Encoding": "gzip"}
+        )
+
+        assert "Content-Encoding" not in resp.headers
+
+    def test_compress_stream_deflate(self):
+        """
+        compress_stream should produce a valid stream from several chunks.
+        """
+        chunks = [b"a" * 1000, b"b" * 1000]
+        data = b"".join(compress_stream(chunks, "deflate"))
+
+        assert zlib.decompress(data) == b"".join(chunks)
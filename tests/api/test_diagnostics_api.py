@@ -0,0 +1,92 @@
+import tracemalloc
+from http import HTTPStatus
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from src.config import config
+from src.extensions import db
+from src.models import User
+
+
+def create_user(
+    username: str = "testuser", phone: str = "09123456789", password: str = "Test@123"
+) -> User:
+    """
+    Helper to create and persist a single User instance.
+    """
+    user = User(
+        username=username, phone=phone, password=generate_password_hash(password)
+    )
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+class TestDiagnosticsEndpoints:
+    """
+    Tests for memory diagnostics endpoints.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, session, monkeypatch):
+        db.session = session
+        self.client = client
+
+        self.admin = create_user(username="admin", phone="09123456780")
+        monkeypatch.setattr(config, "ADMIN_USER_IDS", [self.admin.id])
+
+    def login(self, username: str) -> None:
+        resp = self.client.post(
+            "/api/v1/auth/login", json={"username": username, "password": "Test@123"}
+        )
+        assert resp.status_code == HTTPStatus.OK
+
+    def test_memory_report_requires_admin(self):
+        """
+        Non-admin users should get 403.
+        """
+        create_user(username="bob", phone="09123456781")
+        self.login("bob")
+
+        resp = self.client.get("/api/v1/diagnostics/memory")
+
+        assert resp.status_code == HTTPStatus.FORBIDDEN
+
+    def test_memory_report_diffs_snapshots(self):
+        """
+        Consecutive reports should compare allocation sites with the previous snapshot.
+        """
+        self.login("admin")
+        tracemalloc.start()
+        try:
+            first = self.client.get("/api/v1/diagnostics/memory?limit=5")
+            second = self.client.get("/api/v1/diagnostics/memory?limit=5")
+        finally:
+            tracemalloc.stop()
+
+        assert first.status_code == HTTPStatus.OK
+        data = second.get_json()
+        assert data["tracing"] is True
+        assert data["identity_map"]["requests"] >= 1
+        assert data["top_allocations"][0]["size_diff"] is not None
+
+    def test_only_the_newest_snapshots_are_kept(self, tmp_path, monkeypatch):
+        """
+        Saving a report's snapshot should remove all but the newest DIAGNOSTICS_KEEP.
+        """
+        monkeypatch.setattr(config, "DIAGNOSTICS_DIR", str(tmp_path))
+        monkeypatch.setattr(config, "DIAGNOSTICS_KEEP", 2)
+        for name in ("20000101T000000-1", "20000102T000000-1"):
+            (tmp_path / f"{name}.snapshot").write_bytes(b"")
+        self.login("admin")
+        tracemalloc.start()
+        try:
+            resp = self.client.get("/api/v1/diagnostics/memory?limit=5")
+        finally:
+            tracemalloc.stop()
+
+        assert resp.status_code == HTTPStatus.OK
+        kept = sorted(path.name for path in tmp_path.glob("*.snapshot"))
+        assert len(kept) == 2
+        assert kept[0] == "20000102T000000-1.snapshot"
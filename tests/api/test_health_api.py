@@ -0,0 +1,71 @@
+from http import HTTPStatus
+from time import monotonic
+
+import pytest
+
+from src.config import config
+from src.controllers import HealthController, health
+from src.health import ErrorRate
+
+
+class TestHealthEndpoints:
+    """
+    Tests for liveness and readiness endpoints.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, monkeypatch):
+        self.client = client
+        self.error_rate = ErrorRate(window=60)
+        monkeypatch.setattr(health, "error_rate", self.error_rate)
+
+    def test_liveness(self):
+        """
+        Liveness should always return 200.
+        """
+        resp = self.client.get("/healthz")
+
+        assert resp.status_code == HTTPStatus.OK
+        assert resp.get_json() == {"status": "ok"}
+
+    def test_readiness_ok(self):
+        """
+        Readiness should return 200 when the database answers.
+        """
+        resp = self.client.get("/readyz")
+
+        assert resp.status_code == HTTPStatus.OK
+        data = resp.get_json()
+        assert data["status"] == "ok"
+        assert data["database"] is True
+
+    def test_readiness_fails_on_error_rate(self):
+        """
+        Readiness should return 503 once most recent requests failed.
+        """
+        for i in range(30):
+            self.error_rate.record(error=i % 3 != 0)
+
+        resp = self.client.get("/readyz")
+
+        assert resp.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        data = resp.get_json()
+        assert data["requests"] == 30
+        assert "error rate too high" in data["reasons"]
+
+    def test_ping_is_bounded_when_no_connection_is_free(self, monkeypatch):
+        """
+        The database ping should give up within READINESS_DB_TIMEOUT when it
+        cannot get a connection, instead of waiting for the pool.
+        """
+        monkeypatch.setattr(health, "_ping_engines", {})
+        monkeypatch.setattr(config, "READINESS_DB_TIMEOUT", 100)
+        controller = HealthController()
+
+        with health.ping_engine().connect():
+            start = monotonic()
+            assert controller.ping_database() is False
+            assert monotonic() - start < 1
+
+        assert controller.ping_database() is True
+        health.ping_engine().dispose()
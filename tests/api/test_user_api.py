@@ -3,8 +3,10 @@ from http import HTTPStatus
 import pytest
 from werkzeug.security import generate_password_hash
 
+from src.config import config
 from src.extensions import db
 from src.models import User
+from src.utils.queries import QueryCounter
 
 
 def create_user(
@@ -76,6 +78,77 @@ class TestUserBlueprintEndpoints:
         assert data["id"] == user.id
         assert data["username"] == "user3"
 
+    def test_get_user_etag_not_modified(self):
+        """
+        Test get user with a matching If-None-Match returns 304 without a body.
+        """
+        user = create_user(username="user6", phone="09123456790", password="Test@123")
+        resp = self.client.get(f"/api/v1/users/{user.id}")
+        etag = resp.headers["ETag"]
+        assert resp.headers["Cache-Control"]
+
+        resp2 = self.client.get(
+            f"/api/v1/users/{user.id}", headers={"If-None-Match": etag}
+        )
+        assert resp2.status_code == HTTPStatus.NOT_MODIFIED
+        assert resp2.headers["ETag"] == etag
+        assert resp2.data == b""
+
+    def test_get_user_etag_changes_after_update(self):
+        """
+        Test updating a user bumps its version and invalidates the old ETag.
+        """
+        user = create_user(username="user7", phone="09123456791", password="Test@123")
+        etag = self.client.get(f"/api/v1/users/{user.id}").headers["ETag"]
+
+        self.client.put(f"/api/v1/users/{user.id}", json={"username": "user7b"})
+
+        resp = self.client.get(
+            f"/api/v1/users/{user.id}", headers={"If-None-Match": etag}
+        )
+        assert resp.status_code == HTTPStatus.OK
+        assert resp.headers["ETag"] != etag
+        assert resp.get_json()["username"] == "user7b"
+
+    def test_get_users_etag_not_modified(self):
+        """
+        Test get users with a matching page ETag returns 304.
+        """
+        resp = self.client.get("/api/v1/users?limit=10&offset=0")
+        etag = resp.headers["ETag"]
+
+        resp2 = self.client.get(
+            "/api/v1/users?limit=10&offset=0", headers={"If-None-Match": etag}
+        )
+        assert resp2.status_code == HTTPStatus.NOT_MODIFIED
+
+    @pytest.mark.parametrize(
+        "query",
+        ["limit=10&offset=0", "limit=1&offset=1", "username=alice", "offset=50"],
+    )
+    def test_get_users_json_pages(self, monkeypatch, query):
+        """
+        Test pages rendered by the database match the regular ones, in one statement.
+        """
+        create_user(username="alice", phone="09123456781", password="Test@123")
+        create_user(username="bob", phone="09123456782", password="Test@123")
+        expected = self.client.get(f"/api/v1/users?{query}").get_json()
+
+        monkeypatch.setattr(config, "DATABASE_JSON_PAGES", True)
+        with QueryCounter() as counter:
+            resp = self.client.get(f"/api/v1/users?{query}")
+
+        assert resp.status_code == HTTPStatus.OK
+        assert resp.mimetype == "application/json"
+        assert resp.get_json() == expected
+        # The page, then the action log.
+        assert counter.count == 2
+
+        resp2 = self.client.get(
+            f"/api/v1/users?{query}", headers={"If-None-Match": resp.headers["ETag"]}
+        )
+        assert resp2.status_code == HTTPStatus.NOT_MODIFIED
+
     def test_get_user_not_found(self):
         """
         Test not found user returns 404.
@@ -116,6 +189,35 @@ class TestUserBlueprintEndpoints:
         data = resp.get_json()
         assert data["phone"] == "09123456787"
 
+    def test_update_user_if_match(self):
+        """
+        Test update with If-Match applies once per ETag and returns the new ETag.
+        """
+        user = create_user(username="gina", phone="09123456792", password="Test@123")
+        etag = self.client.get(f"/api/v1/users/{user.id}").headers["ETag"]
+
+        resp = self.client.put(
+            f"/api/v1/users/{user.id}",
+            json={"username": "gina2"},
+            headers={"If-Match": etag},
+        )
+        assert resp.status_code == HTTPStatus.OK
+        assert resp.headers["ETag"] != etag
+        assert (
+            resp.headers["ETag"]
+            == self.client.get(f"/api/v1/users/{user.id}").headers["ETag"]
+        )
+
+        resp2 = self.client.put(
+            f"/api/v1/users/{user.id}",
+            json={"username": "gina3"},
+            headers={"If-Match": etag},
+        )
+        assert resp2.status_code == HTTPStatus.PRECONDITION_FAILED
+        assert self.client.get(f"/api/v1/users/{user.id}").get_json()["username"] == (
+            "gina2"
+        )
+
     def test_update_user_not_found(self):
         """
         Test updates not found user returns 404.
@@ -135,6 +237,19 @@ class TestUserBlueprintEndpoints:
         resp2 = self.client.get(f"/api/v1/users/{user.id}")
         assert resp2.status_code == HTTPStatus.NOT_FOUND
 
+    def test_delete_user_deferred(self, monkeypatch):
+        """
+        Test deferred delete marks the user and queues its purge within budget.
+        """
+        monkeypatch.setattr(config, "USER_DELETE_MODE", "deferred")
+        user = create_user(username="grace", phone="09123456789", password="Test@1234")
+
+        resp = self.client.delete(f"/api/v1/users/{user.id}")
+        assert resp.status_code == HTTPStatus.NO_CONTENT
+
+        resp2 = self.client.get(f"/api/v1/users/{user.id}")
+        assert resp2.status_code == HTTPStatus.NOT_FOUND
+
     def test_delete_user_not_found(self):
         """
         Test delete not exists user returns 404.
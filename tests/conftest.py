@@ -2,12 +2,14 @@ import pytest
 from sqlalchemy.orm import scoped_session, sessionmaker
 
 from src.config import config
-from src.extensions import db
+from src.extensions import RoutingSession, db
 from src.server import create_app
 
 
 @pytest.fixture(scope="session")
 def app():
+    # Views over their declared query budget fail the test.
+    config.QUERY_BUDGET_MODE = "raise"
     app = create_app()
     app.config["SQLALCHEMY_DATABASE_URI"] = config.DATABASE_TEST_URL
     app.config["TESTING"] = True
@@ -16,7 +18,8 @@ def app():
         db.create_all()
         yield app
         db.session.remove()
-        db.drop_all()
+        # Apps created by other tests may have registered more bind keys.
+        db.drop_all(bind_key=None)
 
 
 @pytest.fixture(scope="session")
@@ -50,3 +53,24 @@ def session(_db, engine):
 @pytest.fixture
 def client(app, session):
     return app.test_client()
+
+
+@pytest.fixture
+def sqlite_app(tmp_path, monkeypatch):
+    """
+    An app of its own on an SQLite database file, in an app context, with
+    the routing session the app uses outside of tests.
+
+    Configure the app by patching `config` in fixtures requested before this one.
+    """
+    monkeypatch.setattr(config, "DATABASE_URL", f"sqlite:///{tmp_path / 'app.db'}")
+    app = create_app()
+
+    with app.app_context():
+        db.create_all()
+        routing_session = scoped_session(sessionmaker(class_=RoutingSession, db=db))
+        monkeypatch.setattr(db, "session", routing_session)
+        yield app
+        routing_session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
@@ -1,17 +1,20 @@
 from datetime import datetime, timedelta, timezone
 
 import pytest
+from sqlalchemy import update
 
+from src.config import config
 from src.controllers import UserController
-from src.exceptions import BadRequestException, NotFoundException
+from src.exceptions import BadRequestException, ConflictException, NotFoundException
 from src.extensions import db
-from src.models import User
+from src.models import Log, User
 from src.schemas import (
     RegisterUser,
     UpdateUser,
     UserFilterParams,
     UserResponse,
 )
+from src.utils.queries import QueryCounter
 
 
 def create_user(
@@ -26,6 +29,14 @@ def create_user(
     return user
 
 
+def create_logs(user: User, count: int) -> None:
+    """
+    Helper to persist `count` logs of a user.
+    """
+    db.session.add_all(Log(method="GET", user_id=user.id) for _ in range(count))
+    db.session.commit()
+
+
 class TestUserController:
     """
     Tests for methods in UserController:
@@ -88,6 +99,28 @@ class TestUserController:
         returned_ids = {item.id for item in paginated.items}
         assert returned_ids == {u.id for u in users}
 
+    def test_get_users_reads_rows(self):
+        """
+        get_users should build the page from rows, without loading User
+        instances into the session.
+        """
+        user = create_user()
+        id_, created, version = user.id, user.created, user.version
+        db.session.expunge_all()
+
+        paginated = self.controller.get_users(filter_params=UserFilterParams())
+
+        assert len(db.session.identity_map) == 0
+        (item,) = paginated.items
+        assert isinstance(item, UserResponse)
+        assert item.model_dump() == {
+            "id": id_,
+            "username": "testuser",
+            "phone": "09123456789",
+            "created": created,
+        }
+        assert item.version == version
+
     def test_register_user_success(self):
         """
         register_user should create a new user and return UserResponse.
@@ -112,6 +145,28 @@ class TestUserController:
         with pytest.raises(BadRequestException):
             self.controller.register_user(register_user=req)
 
+    def test_register_user_single_statement(self):
+        """
+        register_user should insert the user with a single statement.
+        """
+        req = RegisterUser(username="ben", phone="09123456782", password="Test@123")
+        with QueryCounter() as counter:
+            self.controller.register_user(register_user=req)
+
+        assert counter.count == 1
+        assert counter.statements[0].startswith("INSERT INTO users")
+
+    def test_register_user_phone_conflict(self):
+        """
+        register_user should raise BadRequestException naming the phone if it already exists.
+        """
+        create_user(username="sam", phone="09123456781", password="Test@123")
+        req = RegisterUser(username="ted", phone="09123456781", password="Test@123")
+        with pytest.raises(BadRequestException) as exc_info:
+            self.controller.register_user(register_user=req)
+
+        assert exc_info.value.message == "User already exists with this phone."
+
     def test_update_user_success(self):
         """
         update_user should change provided fields and return updated UserResponse.
@@ -126,6 +181,22 @@ class TestUserController:
         updated = db.session.query(User).get(user.id)
         assert updated.phone == "09123456780"
 
+    def test_update_user_concurrent_conflict(self):
+        """
+        update_user should raise ConflictException if the user changed after it was read.
+        """
+        user = create_user(username="ivy", phone="09123456783", password="Test@123")
+        assert user.version == 1
+        # Another transaction's update, behind the session's back.
+        db.session.execute(
+            update(User).filter(User.id == user.id).values(version=User.version + 1),
+            execution_options={"synchronize_session": False},
+        )
+
+        req = UpdateUser(phone="09123456784")
+        with pytest.raises(ConflictException):
+            self.controller.update_user(user_id=user.id, update_user_request=req)
+
     def test_update_user_not_found(self):
         """
         update_user should raise NotFoundException for non-existent user.
@@ -149,3 +220,42 @@ class TestUserController:
         """
         with pytest.raises(NotFoundException):
             self.controller.delete_user(user_id=7777)
+
+    def test_delete_user_cascades_in_database(self):
+        """
+        delete_user should leave deleting the user's logs to the database,
+        without loading them.
+        """
+        user = create_user(username="ann", phone="55566677789", password="pwd")
+        create_logs(user, 3)
+
+        with QueryCounter() as counter:
+            self.controller.delete_user(user_id=user.id)
+
+        assert not any("FROM logs" in statement for statement in counter.statements)
+        assert db.session.query(Log).filter_by(user_id=user.id).count() == 0
+
+    def test_delete_user_deferred(self, monkeypatch):
+        """
+        In deferred mode delete_user should hide the user at once, and
+        purge_deleted_users should delete its logs in chunks, then the user.
+        """
+        monkeypatch.setattr(config, "USER_DELETE_MODE", "deferred")
+        monkeypatch.setattr(config, "USER_PURGE_IN_BACKGROUND", False)
+        monkeypatch.setattr(config, "USER_PURGE_CHUNK_SIZE", 2)
+        user = create_user(username="max", phone="55566677790", password="pwd")
+        create_logs(user, 5)
+
+        self.controller.delete_user(user_id=user.id)
+
+        with pytest.raises(NotFoundException):
+            self.controller.get_user(user_id=user.id)
+        assert db.session.query(Log).filter_by(user_id=user.id).count() == 5
+
+        with QueryCounter() as counter:
+            assert self.controller.purge_deleted_users() == 1
+
+        deletes = [s for s in counter.statements if s.startswith("DELETE FROM logs")]
+        assert len(deletes) == 4
+        assert db.session.query(Log).filter_by(user_id=user.id).count() == 0
+        assert db.session.get(User, user.id) is None
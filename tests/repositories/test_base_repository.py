@@ -36,11 +36,11 @@ class DummySchema(BaseModel):
 @pytest.fixture(scope="module", autouse=True)
 def setup_tables(engine):
     """
-    Create all tables for DummyModel before tests and drop them afterward.
+    Create the DummyModel table before tests and drop it afterward.
     """
-    db.metadata.create_all(bind=engine)
+    DummyModel.__table__.create(bind=engine, checkfirst=True)
     yield
-    db.metadata.drop_all(bind=engine)
+    DummyModel.__table__.drop(bind=engine)
 
 
 pytestmark = pytest.mark.usefixtures("session")
@@ -0,0 +1,165 @@
+import threading
+from http import HTTPStatus
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from src import admission as admission_module
+from src.admission import AdmissionController, GradientLimit, Priority
+from src.config import config
+from src.extensions import db
+from src.models import Log, User
+
+
+def fixed_limit(limit: int) -> GradientLimit:
+    return GradientLimit(limit, limit, limit, tolerance=2.0)
+
+
+class TestGradientLimit:
+    """
+    Tests for the latency-driven concurrency limit.
+    """
+
+    def test_shrinks_on_slowdown_and_recovers(self):
+        """
+        The limit should shrink while busy requests slow down, and grow back
+        once they are fast again.
+        """
+        limit = GradientLimit(8, 1, 8, tolerance=2.0)
+        for _ in range(20):
+            limit.update("/users", latency=0.01, in_flight=1)
+        assert limit.value == 8
+
+        for _ in range(20):
+            limit.update("/users", latency=0.1, in_flight=8)
+        assert limit.value < 2
+
+        for _ in range(20):
+            limit.update("/users", latency=0.01, in_flight=int(limit.value))
+        assert limit.value == 8
+
+    def test_ignores_latency_while_not_busy(self):
+        """
+        Slow requests should not move the limit while most of it is unused.
+        """
+        limit = GradientLimit(8, 1, 8, tolerance=2.0)
+        limit.update("/users", latency=0.01, in_flight=1)
+        for _ in range(20):
+            limit.update("/users", latency=0.1, in_flight=1)
+
+        assert limit.value == 8
+
+
+class TestAdmissionController:
+    """
+    Tests for admitting, queueing and shedding requests.
+    """
+
+    def test_sheds_after_queue_timeout(self):
+        """
+        A request should be shed once it waited the timeout for a slot.
+        """
+        controller = AdmissionController(fixed_limit(1))
+        assert controller.acquire(Priority.HIGH, timeout=0)
+        assert not controller.acquire(Priority.HIGH, timeout=0.01)
+
+        controller.release("/users", 0.01)
+        assert controller.acquire(Priority.HIGH, timeout=0)
+
+    def test_admits_waiters_by_priority(self):
+        """
+        A freed slot should go to the highest priority waiter, even if it came last.
+        """
+        controller = AdmissionController(fixed_limit(1))
+        assert controller.acquire(Priority.HIGH, timeout=0)
+
+        admitted = []
+
+        def wait(level: Priority, timeout: float):
+            if controller.acquire(level, timeout):
+                admitted.append(level)
+
+        low = threading.Thread(target=wait, args=(Priority.LOW, 0.3))
+        low.start()
+        while not controller._waiters:
+            pass
+        high = threading.Thread(target=wait, args=(Priority.HIGH, 5))
+        high.start()
+        while len(controller._waiters) < 2:
+            pass
+
+        controller.release("/users", 0.01)
+        high.join()
+        low.join()
+
+        assert admitted == [Priority.HIGH]
+        assert controller.in_flight == 1
+
+
+class TestAdmissionHooks:
+    """
+    Tests for shedding requests in the app.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, session, monkeypatch):
+        db.session = session
+        self.client = client
+        user = User(
+            username="admin",
+            phone="09123456780",
+            password=generate_password_hash("Test@123"),
+        )
+        db.session.add(user)
+        db.session.commit()
+        self.user_id = user.id
+        self.client.post(
+            "/api/v1/auth/login", json={"username": "admin", "password": "Test@123"}
+        )
+
+        self.controller = AdmissionController(fixed_limit(1))
+        monkeypatch.setattr(admission_module, "admission", self.controller)
+        monkeypatch.setattr(config, "ADMISSION_QUEUE_TIMEOUT", 0.01)
+
+    def test_requests_are_admitted_and_released(self):
+        """
+        Admitted requests should hold a slot only while they run.
+        """
+        resp = self.client.get(f"/api/v1/users/{self.user_id}")
+
+        assert resp.status_code == HTTPStatus.OK
+        assert self.controller.in_flight == 0
+
+    def test_overloaded_requests_are_shed(self):
+        """
+        Requests finding no slot should get 503 with Retry-After, without
+        being logged, while probes are still answered.
+        """
+        logs = db.session.query(Log).count()
+        self.controller.acquire(Priority.HIGH, timeout=0)
+
+        resp = self.client.get(f"/api/v1/users/{self.user_id}")
+        assert resp.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert resp.headers["Retry-After"] == str(config.ADMISSION_RETRY_AFTER)
+        assert resp.get_json()["code"] == HTTPStatus.SERVICE_UNAVAILABLE
+        assert db.session.query(Log).count() == logs
+
+        assert self.client.get("/healthz").status_code == HTTPStatus.OK
+
+    def test_batch_sub_requests_run_on_the_batch_slot(self, monkeypatch):
+        """
+        Sub-requests of a batch should run on the slot the batch holds, so
+        they are not shed even when it is the only one.
+        """
+        monkeypatch.setattr(config, "BATCH_MAX_WORKERS", 1)
+
+        resp = self.client.post(
+            "/api/v1/batch",
+            json={
+                "requests": [{"method": "GET", "path": f"/api/v1/users/{self.user_id}"}]
+            },
+        )
+
+        assert resp.status_code == HTTPStatus.OK
+        assert resp.get_json()["responses"][0]["status"] == HTTPStatus.OK
+        assert self.controller.in_flight == 0
@@ -0,0 +1,68 @@
+import json
+import threading
+
+import pytest
+from werkzeug.serving import make_server
+
+from src.capture import REDACTED
+from src.config import config
+from src.server import create_app
+
+
+class TestTrafficCapture:
+    """
+    Tests for traffic capture and replay.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "CAPTURE_ENABLED", True)
+        monkeypatch.setattr(config, "CAPTURE_DIR", str(tmp_path))
+        self.directory = tmp_path
+        self.app = create_app()
+        self.client = self.app.test_client()
+        self.runner = self.app.test_cli_runner()
+
+    def test_requests_are_captured_sanitized(self):
+        """
+        Matched requests should be recorded with redacted query values.
+        """
+        self.client.get("/healthz?phone=09123456789&page=2")
+        self.client.get("/no-such-route")
+
+        (path,) = self.directory.glob("*.jsonl")
+        (record,) = [json.loads(line) for line in path.read_text().splitlines()]
+        assert record["m"] == "GET"
+        assert record["r"] == "/healthz"
+        assert record["q"] == [["phone", REDACTED], ["page", "2"]]
+        assert record["s"] == 200
+        assert record["d"] >= 0
+
+    def test_replay_reports_latency_and_errors(self):
+        """
+        replay should re-issue the captured requests against the target.
+        """
+        for _ in range(5):
+            self.client.get("/healthz")
+
+        server = make_server("127.0.0.1", 0, self.app, threaded=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            result = self.runner.invoke(
+                args=[
+                    "traffic",
+                    "replay",
+                    "--target",
+                    f"http://127.0.0.1:{server.server_port}",
+                    "--speed",
+                    "max",
+                ]
+            )
+        finally:
+            server.shutdown()
+
+        assert result.exit_code == 0, result.output
+        assert "5 requests in" in result.output
+        assert "GET /healthz" in result.output
+        assert "statuses: 200=5" in result.output
@@ -0,0 +1,140 @@
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from time import monotonic, sleep
+
+import pytest
+from sqlalchemy import select, text
+
+from src.exceptions import GatewayTimeoutException
+from src.extensions import db
+from src.models import User
+from src.utils import deadline
+from src.utils.deadlines import (
+    DEADLINE_HEADER,
+    STATEMENT_TIMEOUT_SET,
+    current_deadline,
+)
+
+# Counts forever, until interrupted.
+ENDLESS_QUERY = text(
+    "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n)"
+    " SELECT count(*) FROM n"
+)
+
+
+class TestDeadline:
+    """
+    Tests for bounding SQL statements by a deadline.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup(self, session):
+        db.session = session
+
+    def test_running_statement_is_interrupted(self):
+        """
+        A statement still running at the deadline should be stopped.
+        """
+        start = monotonic()
+        with pytest.raises(GatewayTimeoutException):
+            with deadline(0.05):
+                db.session.execute(ENDLESS_QUERY)
+
+        assert monotonic() - start < 5
+
+    def test_statements_after_the_deadline_fail(self):
+        """
+        Statements starting after the deadline should fail, and ones outside
+        of it should run.
+        """
+        with deadline(0.01):
+            sleep(0.02)
+            with pytest.raises(GatewayTimeoutException):
+                db.session.scalars(select(User)).all()
+
+        assert current_deadline() is None
+        assert db.session.scalars(select(User)).all() == []
+
+    def test_earliest_deadline_applies(self):
+        """
+        Nested deadlines should never extend the enclosing one.
+        """
+        with deadline(1) as outer:
+            with deadline(60) as inner:
+                assert inner is outer
+            with deadline(0.5) as inner:
+                assert inner.expires_at < outer.expires_at
+            assert current_deadline() is outer
+
+    def test_statement_timeout_is_set_once_per_transaction(self):
+        """
+        Statements of a transaction should share the statement timeout the
+        first one set, while it does not overrun the deadline by much.
+        """
+        if db.engine.dialect.name != "postgresql":
+            pytest.skip("Only Postgres has a statement timeout.")
+
+        with deadline(60):
+            db.session.scalars(select(User)).all()
+            connection = db.session.connection()
+            first = connection.info[STATEMENT_TIMEOUT_SET]
+            sleep(0.01)
+            db.session.scalars(select(User)).all()
+
+            assert connection.info[STATEMENT_TIMEOUT_SET] is first
+
+    def test_decorated_calls_count_from_their_start(self):
+        """
+        Each call of a decorated function should get the full limit, from
+        any thread, however long after decorating it.
+        """
+
+        @deadline(0.05)
+        def read_users():
+            sleep(0.01)
+            return current_deadline().remaining()
+
+        sleep(0.1)
+        assert read_users() > 0
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            remaining = list(executor.map(lambda _: read_users(), range(8)))
+        assert all(seconds > 0 for seconds in remaining)
+        assert current_deadline() is None
+
+
+class TestRequestDeadline:
+    """
+    Tests for the deadlines of requests.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, session):
+        db.session = session
+        self.client = client
+
+    def test_client_timeout_shortens_the_deadline(self):
+        """
+        A request running out of the client's timeout should get 504.
+        """
+        resp = self.client.post(
+            "/api/v1/users",
+            json={
+                "username": "test",
+                "phone": "09123456789",
+                "password": "Test@123",
+            },
+            headers={DEADLINE_HEADER: "0.000001"},
+        )
+
+        assert resp.status_code == HTTPStatus.GATEWAY_TIMEOUT
+        assert resp.get_json()["code"] == HTTPStatus.GATEWAY_TIMEOUT
+        assert current_deadline() is None
+
+    def test_invalid_client_timeout(self):
+        """
+        A timeout that is not a positive number should be rejected.
+        """
+        resp = self.client.get("/api/v1/users", headers={DEADLINE_HEADER: "soon"})
+
+        assert resp.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,46 @@
+from sqlalchemy import text
+
+from src.extensions import db
+from src.models import User
+
+
+class TestIndexAdvisor:
+    """
+    Tests for the `flask indexes advise` command.
+    """
+
+    def test_advise_reports_plans(self, app, session):
+        """
+        advise should plan every query shape against the existing indexes.
+        """
+        db.session = session
+        for i in range(3):
+            db.session.add(
+                User(username=f"user{i}", phone=f"0912345678{i}", password="hash")
+            )
+        db.session.commit()
+        if db.engine.dialect.name == "postgresql":
+            # Postgres rightly scans tables this small unless told not to.
+            db.session.execute(text("SET LOCAL enable_seqscan = off"))
+
+        result = app.test_cli_runner().invoke(args=["indexes", "advise"])
+
+        assert result.exit_code == 0, result.output
+        assert "users: ~3 rows" in result.output
+        assert "user by phone" in result.output
+        # Plans are worded per database, but name the indexes they use.
+        plans = result.output.split("Indexes no query uses:")[0]
+        assert "ix_users_phone" in plans
+        assert "ix_logs_user_id_created" in plans
+        assert "sequential scan on users" not in result.output
+
+    def test_advise_needs_users(self, app, session):
+        """
+        advise should ask for data when there are no users to sample.
+        """
+        db.session = session
+
+        result = app.test_cli_runner().invoke(args=["indexes", "advise"])
+
+        assert result.exit_code == 1
+        assert "run flask seed" in result.output
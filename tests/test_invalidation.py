@@ -0,0 +1,233 @@
+import json
+import os
+from http import HTTPStatus
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from src.config import config
+from src.controllers import UserController
+from src.controllers.user import user_cache, users_page_cache
+from src import invalidation
+from src.extensions import db
+from src.invalidation import _new_origin, _payload, publish, receive
+from src.models import User
+from src.schemas import UpdateUser, UserFilterParams
+from src.utils import LocalCache
+from src.utils.queries import QueryCounter
+
+
+class TestLocalCache:
+    """
+    Tests for the in-process cache.
+    """
+
+    def test_disabled_without_ttl(self, monkeypatch):
+        """
+        Nothing should be cached while CACHE_TTL is 0.
+        """
+        monkeypatch.setattr(config, "CACHE_TTL", 0)
+        cache = LocalCache()
+        cache.set("key", 1)
+
+        assert cache.get("key") is None
+
+    def test_evicts_least_recently_used(self, monkeypatch):
+        """
+        Entries beyond CACHE_SIZE should be evicted, least recently used first.
+        """
+        monkeypatch.setattr(config, "CACHE_TTL", 60)
+        monkeypatch.setattr(config, "CACHE_SIZE", 2)
+        cache = LocalCache()
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+    def test_value_loaded_across_an_eviction_is_not_cached(self, monkeypatch):
+        """
+        A value that may predate an eviction should not be cached.
+        """
+        monkeypatch.setattr(config, "CACHE_TTL", 60)
+        cache = LocalCache()
+
+        def load():
+            cache.evict("key")
+            return "stale"
+
+        assert cache.get_or_set("key", load) == "stale"
+        assert cache.get("key") is None
+        assert cache.get_or_set("key", lambda: "fresh") == "fresh"
+        assert cache.get("key") == "fresh"
+
+
+class TestInvalidation:
+    """
+    Tests for evicting cached users when they change.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup(self, session, monkeypatch):
+        monkeypatch.setattr(config, "CACHE_TTL", 60)
+        db.session = session
+        user_cache.clear()
+        users_page_cache.clear()
+        self.controller = UserController()
+        yield
+        user_cache.clear()
+        users_page_cache.clear()
+
+    def create_user(self) -> User:
+        user = User(username="alice", phone="09123456789", password="pwd")
+        db.session.add(user)
+        db.session.commit()
+        return user
+
+    def test_cached_until_updated(self):
+        """
+        A cached user should be served without queries until it is updated.
+        """
+        user = self.create_user()
+        self.controller.get_user(user_id=user.id)
+
+        with QueryCounter() as counter:
+            self.controller.get_user(user_id=user.id)
+            etag = self.controller.get_user_etag(user_id=user.id)
+        assert counter.count == 0
+
+        self.controller.update_user(
+            user_id=user.id, update_user_request=UpdateUser(phone="09123456780")
+        )
+
+        assert self.controller.get_user(user_id=user.id).phone == "09123456780"
+        assert self.controller.get_user_etag(user_id=user.id) != etag
+
+    def test_pages_evicted_by_any_user_change(self):
+        """
+        Cached pages should be evicted when a user is created.
+        """
+        self.create_user()
+        assert self.controller.get_users(UserFilterParams()).total == 1
+
+        self.controller.user_repository.create(
+            {"username": "bob", "phone": "09123456781", "password": "pwd"}
+        )
+
+        assert self.controller.get_users(UserFilterParams()).total == 2
+
+    def test_rolled_back_changes_are_discarded(self):
+        """
+        Changes of a rolled back transaction should not be published.
+        """
+        user_id = self.create_user().id
+        self.controller.get_user(user_id=user_id)
+
+        publish("users", user_id)
+        db.session.rollback()
+
+        assert "entity_changes" not in db.session.info
+        assert user_cache.get(user_id) is not None
+
+    def test_receive_applies_other_processes_changes(self):
+        """
+        Notifications from other processes should evict, and this process's
+        own be ignored, as it applied them on commit.
+        """
+        user = self.create_user()
+        self.controller.get_user(user_id=user.id)
+
+        receive(
+            json.dumps({"origin": invalidation.ORIGIN, "changes": [["users", user.id]]})
+        )
+        assert user_cache.get(user.id) is not None
+
+        receive(json.dumps({"origin": "other", "changes": [["users", user.id]]}))
+        assert user_cache.get(user.id) is None
+
+    def test_forked_workers_apply_each_others_changes(self, monkeypatch):
+        """
+        A forked worker should apply the changes of its parent and siblings,
+        which were forked with the same origin.
+        """
+        user = self.create_user()
+        self.controller.get_user(user_id=user.id)
+        parent_origin = invalidation.ORIGIN
+        monkeypatch.setattr(invalidation, "ORIGIN", invalidation.ORIGIN)
+
+        _new_origin()
+        receive(json.dumps({"origin": parent_origin, "changes": [["users", user.id]]}))
+
+        assert invalidation.ORIGIN != parent_origin
+        assert user_cache.get(user.id) is None
+
+    def test_fork_regenerates_origin(self):
+        """
+        A forked child should get its own origin.
+        """
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.write(write_end, invalidation.ORIGIN.encode())
+            os._exit(0)
+        os.close(write_end)
+        os.waitpid(pid, 0)
+        with os.fdopen(read_end) as pipe:
+            child_origin = pipe.read()
+
+        assert child_origin and child_origin != invalidation.ORIGIN
+
+    def test_large_payloads_invalidate_whole_entities(self):
+        """
+        Changes too many to notify should be sent as entity-wide changes.
+        """
+        payload = json.loads(_payload({("users", i) for i in range(5000)}))
+
+        assert payload == {"origin": invalidation.ORIGIN, "changes": [["users", None]]}
+
+
+class TestInvalidationBudgets:
+    """
+    Tests for publishing changes within the writing requests' query budgets.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, session, monkeypatch):
+        db.session = session
+        if db.engine.dialect.name != "postgresql":
+            pytest.skip("Changes are only sent with NOTIFY on Postgres.")
+        monkeypatch.setattr(config, "CACHE_TTL", 60)
+        self.client = client
+        user = User(
+            username="admin",
+            phone="09123456780",
+            password=generate_password_hash("Test@123"),
+        )
+        db.session.add(user)
+        db.session.commit()
+        self.client.post(
+            "/api/v1/auth/login", json={"username": "admin", "password": "Test@123"}
+        )
+        yield
+        user_cache.clear()
+        users_page_cache.clear()
+
+    def test_writes_stay_within_budget(self):
+        """
+        Notifying other processes should not count towards the budgets.
+        """
+        resp = self.client.post(
+            "/api/v1/users",
+            json={"username": "alice", "phone": "09123456781", "password": "Test@123"},
+        )
+        assert resp.status_code == HTTPStatus.CREATED
+        user_id = resp.get_json()["id"]
+
+        resp = self.client.put(
+            f"/api/v1/users/{user_id}", json={"phone": "09123456782"}
+        )
+        assert resp.status_code == HTTPStatus.OK
+
+        resp = self.client.delete(f"/api/v1/users/{user_id}")
+        assert resp.status_code == HTTPStatus.NO_CONTENT
@@ -0,0 +1,186 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, update
+
+from src.config import config
+from src.extensions import db
+from src.jobs import Worker, enqueue, job, perform, schedule_periodic
+from src.models import Job, JobStatus
+from src.repositories import JobRepository
+from src.repositories.job import utcnow
+
+calls = []
+done = threading.Semaphore(0)
+
+
+@job("tests.record", queue="tests")
+def record(**payload):
+    calls.append(payload)
+    done.release()
+
+
+@job("tests.explode", queue="tests", max_attempts=2)
+def explode():
+    raise RuntimeError("boom")
+
+
+class TestJobs:
+    """
+    Tests for queueing, claiming and running jobs, on an SQLite database file.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup(self, sqlite_app):
+        self.app = sqlite_app
+        calls.clear()
+        while done.acquire(blocking=False):
+            pass
+        self.jobs = JobRepository()
+
+    def claim(self, limit: int = 10, worker: str = "test") -> list[Job]:
+        return list(self.jobs.claim("tests", worker, limit, timedelta(minutes=5)))
+
+    def queued(self) -> list[Job]:
+        db.session.expire_all()
+        return list(db.session.scalars(select(Job).filter(Job.queue == "tests")))
+
+    def test_enqueue_commits_with_the_caller(self):
+        """
+        A job should only be queued once the caller's transaction commits.
+        """
+        enqueue("tests.record", n=1)
+        db.session.rollback()
+        assert self.queued() == []
+
+        enqueue("tests.record", n=2)
+        db.session.commit()
+        (queued,) = self.queued()
+        assert queued.payload == {"n": 2}
+        assert queued.status == JobStatus.QUEUED
+
+    def test_perform_runs_and_deletes_the_job(self):
+        """
+        A claimed job should run with its payload and be deleted once it succeeds.
+        """
+        enqueue("tests.record", n=1)
+        db.session.commit()
+
+        (claimed,) = self.claim()
+        assert claimed.status == JobStatus.RUNNING
+        assert claimed.attempts == 1
+        assert self.claim() == []
+
+        perform(claimed)
+        assert calls == [{"n": 1}]
+        assert self.queued() == []
+
+    def test_failures_are_retried_with_backoff_then_failed(self):
+        """
+        A raising job should be queued again after a backoff, then failed
+        after its last attempt.
+        """
+        enqueue("tests.explode")
+        db.session.commit()
+
+        perform(self.claim()[0])
+        (retried,) = self.queued()
+        assert retried.status == JobStatus.QUEUED
+        assert "boom" in retried.last_error
+        delay = retried.run_at - utcnow()
+        assert timedelta(0) < delay <= timedelta(seconds=config.JOB_BACKOFF)
+        assert self.claim() == []
+
+        db.session.execute(update(Job).values(run_at=utcnow()))
+        db.session.commit()
+        perform(self.claim()[0])
+        (failed,) = self.queued()
+        assert failed.status == JobStatus.FAILED
+        assert failed.attempts == 2
+        assert self.claim() == []
+
+    def test_claim_limits_and_expired_leases(self):
+        """
+        Claims should take at most `limit` due jobs, and jobs whose lease expired.
+        """
+        for n in range(3):
+            enqueue("tests.record", n=n)
+        enqueue("tests.record", delay=60, n=3)
+        db.session.commit()
+
+        assert len(self.claim(limit=2)) == 2
+        assert len(self.claim(limit=2)) == 1
+        assert self.claim() == []
+
+        # The first worker died without extending its leases.
+        db.session.execute(update(Job).values(run_at=utcnow()))
+        db.session.commit()
+        reclaimed = self.claim(worker="other")
+        assert len(reclaimed) == 4
+        assert {claimed.attempts for claimed in reclaimed} == {1, 2}
+
+    def test_periodic_jobs_are_queued_once_per_run(self):
+        """
+        Every worker scheduling periodic jobs should queue each run once.
+        """
+        now = datetime.now(timezone.utc)
+        schedule_periodic(now)
+        schedule_periodic(now)
+
+        runs = db.session.scalars(select(Job.key)).all()
+        assert len(runs) == len(set(runs)) > 0
+        assert all(
+            run_at > utcnow() for run_at in db.session.scalars(select(Job.run_at))
+        )
+
+    def test_worker_runs_queued_jobs(self):
+        """
+        A worker should run the jobs of its queues until stopped.
+        """
+        worker = Worker(self.app, {"tests": 2})
+        thread = threading.Thread(target=worker.run)
+        thread.start()
+        try:
+            for n in range(3):
+                enqueue("tests.record", n=n)
+                db.session.commit()
+            for _ in range(3):
+                assert done.acquire(timeout=10)
+        finally:
+            worker.stop()
+            thread.join(timeout=10)
+
+        assert sorted(call["n"] for call in calls) == [0, 1, 2]
+        assert not thread.is_alive()
+
+    def test_worker_survives_a_failed_poll(self, monkeypatch):
+        """
+        A worker should log a failed poll and retry after a delay.
+        """
+        monkeypatch.setattr(config, "JOB_POLL_INTERVAL", 0.01)
+        worker = Worker(self.app, {"tests": 1})
+        poll = worker.poll
+        failures = []
+
+        def flaky_poll():
+            if not failures:
+                failures.append(True)
+                raise RuntimeError("connection lost")
+            return poll()
+
+        monkeypatch.setattr(worker, "poll", flaky_poll)
+        enqueue("tests.record", n=1)
+        db.session.commit()
+
+        thread = threading.Thread(target=worker.run)
+        thread.start()
+        try:
+            assert done.acquire(timeout=10)
+        finally:
+            worker.stop()
+            thread.join(timeout=10)
+
+        assert failures
+        assert calls == [{"n": 1}]
+        assert not thread.is_alive()
@@ -0,0 +1,66 @@
+import pytest
+from flask import Flask, session
+
+from src.config import config
+from src.keyring import SigningKey, parse_keys, register_signing_keys
+
+
+def make_app() -> Flask:
+    """
+    Helper to build a bare app signed with the configured key ring.
+    """
+    app = Flask(__name__)
+    register_signing_keys(app)
+
+    @app.route("/login")
+    def login():
+        session["user_id"] = 1
+        return {}
+
+    @app.route("/me")
+    def me():
+        return {"user_id": session.get("user_id")}
+
+    return app
+
+
+class TestKeyRing:
+    """
+    Tests for loading and rotating session signing keys.
+    """
+
+    def test_parse_keys_skips_comments(self):
+        """
+        parse_keys should read `<kid>=<secret>` entries in order.
+        """
+        keys = parse_keys(["# rotated 2025-06", "", "k1=one", " k2 = two "])
+
+        assert keys == [SigningKey("k1", "one"), SigningKey("k2", "two")]
+
+    @pytest.mark.parametrize("entries", [["k1"], ["=secret"], ["k1=a", "k1=b"]])
+    def test_parse_keys_rejects_invalid(self, entries):
+        """
+        parse_keys should reject malformed entries and duplicate key ids.
+        """
+        with pytest.raises(ValueError):
+            parse_keys(entries)
+
+    def test_rotation_keeps_sessions(self, monkeypatch):
+        """
+        A session signed with an older key should survive adding a new key,
+        and fail once that key is retired.
+        """
+        monkeypatch.setattr(config, "SECRET_KEYS", "k1=first-secret")
+        client = make_app().test_client()
+        client.get("/login")
+        cookie = client.get_cookie("session").value
+
+        monkeypatch.setattr(config, "SECRET_KEYS", "k1=first-secret,k2=second-secret")
+        rotated = make_app().test_client()
+        rotated.set_cookie("session", cookie)
+        assert rotated.get("/me").get_json() == {"user_id": 1}
+
+        monkeypatch.setattr(config, "SECRET_KEYS", "k2=second-secret")
+        retired = make_app().test_client()
+        retired.set_cookie("session", cookie)
+        assert retired.get("/me").get_json() == {"user_id": None}
@@ -0,0 +1,77 @@
+import json
+from http import HTTPStatus
+
+from src.config import config
+from src.metrics import Histogram, MetricsRegistry
+
+
+class TestMetrics:
+    """
+    Tests for the metrics registry and endpoint.
+    """
+
+    def test_histogram_buckets_are_cumulative(self):
+        """
+        Histogram should render cumulative buckets, sum and count.
+        """
+        histogram = Histogram("latency_seconds", "Latency.")
+        histogram.observe(0.003, route="/a")
+        histogram.observe(0.2, route="/a")
+        histogram.observe(30, route="/a")
+
+        lines = histogram.render()
+
+        assert 'latency_seconds_bucket{route="/a",le="0.005"} 1' in lines
+        assert 'latency_seconds_bucket{route="/a",le="0.25"} 2' in lines
+        assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+        assert 'latency_seconds_count{route="/a"} 3' in lines
+
+    def test_render_merges_worker_snapshots(self, tmp_path, monkeypatch):
+        """
+        With METRICS_DIR set, rendering should add up every worker's snapshot.
+        """
+        monkeypatch.setattr(config, "METRICS_DIR", str(tmp_path))
+        registry = MetricsRegistry()
+        counter = registry.counter("jobs_total", "Jobs.")
+        counter.inc(queue="default")
+        (tmp_path / "1.json").write_text(
+            json.dumps({"jobs_total": {'[["queue", "default"]]': 4}})
+        )
+
+        output = registry.render()
+
+        assert 'jobs_total{queue="default"} 5' in output
+
+    def test_exited_workers_are_folded_together(self, tmp_path, monkeypatch):
+        """
+        Snapshots of exited workers should be folded into one file, without
+        changing the rendered totals.
+        """
+        monkeypatch.setattr(config, "METRICS_DIR", str(tmp_path))
+        registry = MetricsRegistry()
+        registry.counter("jobs_total", "Jobs.")
+        for pid, count in ((1, 4), (2, 3)):
+            (tmp_path / f"{pid}.json").write_text(
+                json.dumps({"jobs_total": {'[["queue", "default"]]': count}})
+            )
+
+        registry.retire(1)
+        registry.retire(2)
+        registry.retire(3)
+
+        assert [path.name for path in tmp_path.glob("*.json")] == ["retired.json"]
+        assert 'jobs_total{queue="default"} 7' in registry.render()
+
+    def test_metrics_endpoint(self, client):
+        """
+        The metrics endpoint should expose per-route request counts.
+        """
+        client.get("/healthz")
+
+        resp = client.get("/metrics")
+
+        assert resp.status_code == HTTPStatus.OK
+        assert resp.mimetype == "text/plain"
+        text = resp.get_data(as_text=True)
+        assert "# TYPE http_request_duration_seconds histogram" in text
+        assert 'route="/healthz"' in text
@@ -0,0 +1,46 @@
+import pytest
+
+from src.config import config
+from src.profiling import PROFILE_HEADER, create_profile_token
+from src.server import create_app
+
+
+class TestProfiling:
+    """
+    Tests for on-demand request profiling.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "PROFILING_ENABLED", True)
+        monkeypatch.setattr(config, "PROFILING_DIR", str(tmp_path))
+        monkeypatch.setattr(config, "PROFILING_MAX_FILES", 2)
+        self.directory = tmp_path
+        self.app = create_app()
+        self.client = self.app.test_client()
+        self.runner = self.app.test_cli_runner()
+
+    def test_unsigned_request_is_not_profiled(self):
+        """
+        Requests without a valid token should not be profiled.
+        """
+        self.client.get("/healthz")
+        self.client.get("/healthz", headers={PROFILE_HEADER: "forged"})
+
+        assert list(self.directory.iterdir()) == []
+
+    def test_signed_request_is_profiled_and_rotated(self):
+        """
+        Requests with a valid token should be profiled, keeping the newest files.
+        """
+        token = create_profile_token(self.app)
+        for _ in range(3):
+            self.client.get("/healthz", headers={PROFILE_HEADER: token})
+
+        assert len(list(self.directory.glob("*.prof"))) == 2
+        assert len(list(self.directory.glob("*.json"))) == 2
+
+        result = self.runner.invoke(args=["profiles", "summarize", "--limit", "5"])
+        assert result.exit_code == 0
+        assert "2 profiles:" in result.output
+        assert "GET /healthz" in result.output
@@ -0,0 +1,86 @@
+import pytest
+from sqlalchemy import select
+
+from src.extensions import db
+from src.models import User
+from src.utils import max_queries, query_budget
+from src.utils.queries import QueryBudgetExceeded, QueryCounter
+
+
+class TestMaxQueries:
+    """
+    Tests for the query budget guards.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup(self, session):
+        db.session = session
+
+    def test_within_budget(self):
+        """
+        max_queries should let a block within its budget through.
+        """
+        with max_queries(2) as counter:
+            db.session.scalars(select(User)).all()
+            db.session.scalars(select(User)).all()
+
+        assert counter.count == 2
+
+    def test_over_budget(self):
+        """
+        max_queries should fail a block over its budget, listing the statements.
+        """
+        with pytest.raises(
+            QueryBudgetExceeded, match="ran 2 queries, over its budget of 1"
+        ):
+            with max_queries(1):
+                db.session.scalars(select(User)).all()
+                db.session.scalars(select(User)).all()
+
+    def test_decorator(self):
+        """
+        max_queries should also guard a whole function.
+        """
+
+        @max_queries(0)
+        def load_users():
+            return db.session.scalars(select(User)).all()
+
+        with pytest.raises(QueryBudgetExceeded):
+            load_users()
+
+    def test_counters_nest(self):
+        """
+        Every active counter should see the statements run inside it.
+        """
+        with QueryCounter() as outer:
+            db.session.scalars(select(User)).all()
+            with QueryCounter() as inner:
+                db.session.scalars(select(User)).all()
+
+        assert (outer.count, inner.count) == (2, 1)
+
+    def test_views_declare_budgets(self, app):
+        """
+        Every v1 view other than batch should declare its query budget.
+        """
+        unbudgeted = [
+            endpoint
+            for endpoint, view in app.view_functions.items()
+            if endpoint.startswith("v1.")
+            and endpoint != "v1.batch.batch"
+            and not hasattr(view, "query_budget")
+        ]
+
+        assert unbudgeted == []
+
+    def test_query_budget_sets_attribute(self):
+        """
+        query_budget should record the budget on the view.
+        """
+
+        @query_budget(3)
+        def view():
+            pass
+
+        assert view.query_budget == 3
@@ -0,0 +1,61 @@
+import re
+from random import Random
+
+from sqlalchemy import select
+
+from src.extensions import db
+from src.models import Log, User
+from src.seeding import user_rows
+
+
+class TestSeedCommand:
+    """
+    Tests for the `flask seed` command.
+    """
+
+    def test_seed_users_and_logs(self, app, session):
+        """
+        seed should load the requested rows in chunks, with valid phones.
+        """
+        db.session = session
+        result = app.test_cli_runner().invoke(
+            args=["seed", "--users", "25", "--logs", "120", "--chunk-size", "10"]
+        )
+
+        assert result.exit_code == 0, result.output
+        users = db.session.query(User).all()
+        assert len(users) == 25
+        assert all(re.fullmatch(r"09\d{9}", user.phone) for user in users)
+        assert len({user.phone for user in users}) == 25
+        assert db.session.query(Log).count() == 120
+
+    def test_seed_skips_taken_phones(self, app, session):
+        """
+        seed should skip users whose phone is taken, and only give logs to
+        users that exist.
+        """
+        db.session = session
+        taken_phone = next(user_rows(Random(0), 2, 1, "hash", ["1404-01-01"]))[2]
+        db.session.add(User(username="admin", phone=taken_phone, password="hash"))
+        db.session.commit()
+
+        result = app.test_cli_runner().invoke(
+            args=["seed", "--users", "5", "--logs", "50"]
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "Seeded 4 users and 50 logs." in result.output
+        user_ids = set(db.session.scalars(select(User.id)))
+        assert 2 not in user_ids
+        assert set(db.session.scalars(select(Log.user_id))) <= user_ids
+
+    def test_rows_are_deterministic(self):
+        """
+        The same seed should produce the same rows.
+        """
+        days = ["1404-01-01", "1404-01-02"]
+
+        first = list(user_rows(Random(7), 1, 50, "hash", days))
+        second = list(user_rows(Random(7), 1, 50, "hash", days))
+
+        assert first == second
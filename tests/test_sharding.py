@@ -0,0 +1,270 @@
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, func, insert, select
+
+from src.config import config
+from src.controllers import UserController
+from src.extensions import db
+from src.jobs import perform
+from src.models import Log, User
+from src.repositories import JobRepository, LogRepository
+from src.server import create_app
+from src.sharding import (
+    jump_hash,
+    log_moves,
+    log_shards,
+    shard_index,
+    shard_metadata,
+)
+from src.utils.queries import QueryCounter
+
+
+def log_counts(engine) -> Counter:
+    """
+    Count the logs of a database by user ID.
+    """
+    with engine.connect() as connection:
+        return Counter(
+            dict(
+                connection.execute(
+                    select(Log.user_id, func.count()).group_by(Log.user_id)
+                ).all()
+            )
+        )
+
+
+class TestShardRouting:
+    """
+    Tests for routing users to log shards.
+    """
+
+    def test_jump_hash_moves_few_keys(self):
+        """
+        Adding a bucket should only move keys to the new bucket, about 1/n of them.
+        """
+        before = [jump_hash(key, 4) for key in range(10000)]
+        after = [jump_hash(key, 5) for key in range(10000)]
+
+        moved = [(old, new) for old, new in zip(before, after) if old != new]
+        assert all(new == 4 for _, new in moved)
+        assert 1500 < len(moved) < 2500
+        assert sorted(Counter(before).values())[0] > 2300
+
+    def test_routing(self, monkeypatch):
+        """
+        Logs without a user, and every log with a single shard, go to the first.
+        """
+        assert shard_index(None, 4) == 0
+        assert shard_index(7, 1) == 0
+        assert shard_index(7, 4) == jump_hash(7, 4)
+
+        monkeypatch.setattr(config, "LOG_SHARD_ROUTING", "modulo")
+        assert shard_index(7, 4) == 3
+
+
+class TestLogSharding:
+    """
+    Tests for storing logs on shards, on SQLite database files.
+    """
+
+    @pytest.fixture
+    def shard_config(self, tmp_path, monkeypatch):
+        self.tmp_path = tmp_path
+        monkeypatch.setattr(config, "LOG_SHARDS", self.shard_urls(2))
+        monkeypatch.setattr(config, "USER_DELETE_MODE", "cascade")
+        # Keep the shards' bind keys from outliving the test in db.metadatas.
+        monkeypatch.setattr(db, "metadatas", dict(db.metadatas))
+
+    @pytest.fixture(autouse=True)
+    def setup(self, shard_config, sqlite_app):
+        self.app = sqlite_app
+        self.logs = LogRepository()
+        self.users = [self.create_user(i) for i in range(20)]
+
+    def shard_urls(self, count: int) -> list[str]:
+        return [f"sqlite:///{self.tmp_path / f'logs_{i}.db'}" for i in range(count)]
+
+    def create_user(self, i: int) -> User:
+        user = User(username=f"user{i}", phone=f"0912000{i:04}", password="pwd")
+        db.session.add(user)
+        db.session.commit()
+        return user
+
+    def init_shards(self) -> None:
+        result = self.app.test_cli_runner().invoke(args=["logs", "init"])
+        assert result.exit_code == 0, result.output
+
+    def reshard(self, *args: str) -> str:
+        result = self.app.test_cli_runner().invoke(args=["logs", "reshard", *args])
+        assert result.exit_code == 0, result.output
+        return result.output
+
+    def assert_routed(self) -> None:
+        shards = log_shards()
+        for index, engine in enumerate(shards):
+            for user_id in log_counts(engine):
+                assert shard_index(user_id, len(shards)) == index
+
+    def test_writes_go_to_the_users_shard(self):
+        """
+        Logs should be written to their user's shard only.
+        """
+        self.init_shards()
+        self.logs.create({"method": "GET", "user_id": self.users[0].id})
+        self.logs.create_many(
+            [{"method": "POST", "user_id": user.id} for user in self.users]
+        )
+
+        shards = log_shards()
+        assert sum(log_counts(engine).total() for engine in shards) == 21
+        assert all(log_counts(engine) for engine in shards)
+        assert log_counts(db.engine) == Counter()
+        self.assert_routed()
+
+    def test_seeded_logs_go_to_the_shards(self):
+        """
+        flask seed should write logs to their users' shards.
+        """
+        self.init_shards()
+        result = self.app.test_cli_runner().invoke(
+            args=["seed", "--users", "0", "--logs", "50", "--chunk-size", "20"]
+        )
+
+        assert result.exit_code == 0, result.output
+        assert log_counts(db.engine) == Counter()
+        assert sum(log_counts(engine).total() for engine in log_shards()) == 50
+        self.assert_routed()
+
+    def test_scatter_gather_pages(self):
+        """
+        Pages read across shards should list every log once, newest first,
+        and a user's pages only their logs.
+        """
+        self.init_shards()
+        # Few distinct timestamps, so pages split ties across shards.
+        self.logs.create_many(
+            [
+                {
+                    "method": "GET",
+                    "user_id": user.id,
+                    "created": datetime(2025, 1, i % 3 + 1),
+                }
+                for user in self.users
+                for i in range(3)
+            ]
+        )
+
+        seen, cursor = [], None
+        while True:
+            rows, cursor = self.logs.get_page(limit=7, after=cursor)
+            seen.extend(rows)
+            if cursor is None:
+                break
+
+        assert len(seen) == 60
+        keys = [(row.user_id, row.id) for row in seen]
+        assert len(set(keys)) == 60
+        created = [row.created for row in seen]
+        assert created == sorted(created, reverse=True)
+
+        user_id = self.users[5].id
+        rows, cursor = self.logs.get_page(limit=10, user_id=user_id)
+        assert [row.user_id for row in rows] == [user_id] * 3
+        assert cursor is None
+
+    def test_reshard(self, monkeypatch):
+        """
+        Resharding should move the primary's logs to the shards, and when a
+        shard is added, only the logs routed to it.
+        """
+        with db.engine.begin() as connection:
+            connection.execute(
+                insert(Log), [{"method": "GET", "user_id": u.id} for u in self.users]
+            )
+
+        assert "Would move" in self.reshard("--from-primary", "--dry-run")
+        assert log_counts(db.engine).total() == 20
+
+        self.reshard("--from-primary", "--chunk-size", "1")
+        assert log_counts(db.engine) == Counter()
+        self.assert_routed()
+
+        before = [log_counts(engine) for engine in log_shards()]
+        monkeypatch.setattr(config, "LOG_SHARDS", self.shard_urls(3))
+        self.app = create_app()
+        with self.app.app_context():
+            output = self.reshard()
+            after = [log_counts(engine) for engine in log_shards()]
+            self.assert_routed()
+            for engine in db.engines.values():
+                engine.dispose()
+
+        assert "to shard 2" in output
+        assert sum(counts.total() for counts in after) == 20
+        for old, new in zip(before, after):
+            assert set(new) <= set(old)
+
+    def test_interrupted_reshard_resumes(self):
+        """
+        A reshard interrupted between copying a chunk and deleting it from the
+        source should finish on the next run, without copying it twice.
+        """
+        with db.engine.begin() as connection:
+            connection.execute(
+                insert(Log), [{"method": "GET", "user_id": u.id} for u in self.users]
+            )
+
+        def interrupt(conn, cursor, statement, *args):
+            if statement.startswith("DELETE FROM logs"):
+                raise KeyboardInterrupt
+
+        event.listen(db.engine, "before_cursor_execute", interrupt)
+        try:
+            result = self.app.test_cli_runner().invoke(
+                args=["logs", "reshard", "--from-primary"]
+            )
+        finally:
+            event.remove(db.engine, "before_cursor_execute", interrupt)
+        assert result.exit_code != 0
+
+        copied = sum(log_counts(engine).total() for engine in log_shards())
+        assert copied == 1
+        assert log_counts(db.engine).total() == 20
+
+        self.reshard("--from-primary")
+
+        assert log_counts(db.engine) == Counter()
+        assert sum(log_counts(engine).total() for engine in log_shards()) == 20
+        self.assert_routed()
+        for engine in log_shards():
+            with engine.connect() as connection:
+                assert connection.execute(select(log_moves)).all() == []
+
+    def test_delete_purges_shard_logs_in_background(self):
+        """
+        Deleting a user should hide it at once, and its purge job should
+        delete its logs from its shard, then the user.
+        """
+        self.init_shards()
+        user_id = self.users[0].id
+        self.logs.create_many([{"method": "GET", "user_id": user_id}] * 3)
+        self.logs.create({"method": "GET", "user_id": self.users[1].id})
+
+        with QueryCounter() as counter:
+            UserController().delete_user(user_id=user_id)
+
+        assert not any("logs" in statement for statement in counter.statements)
+        assert db.session.get(User, user_id).deleted is not None
+
+        (claimed,) = JobRepository().claim("purge", "test", 10, timedelta(minutes=5))
+        perform(claimed)
+
+        db.session.expire_all()
+        assert db.session.get(User, user_id) is None
+
+        counts = sum((log_counts(engine) for engine in log_shards()), Counter())
+        assert user_id not in counts
+        assert counts.total() == 1
+        assert shard_metadata.tables["logs"].foreign_keys == set()
@@ -0,0 +1,81 @@
+import pytest
+from sqlalchemy import select, update
+
+from src.extensions import READER_BIND, db
+from src.models import User
+from src.repositories.base import BaseRepository
+from src.utils import max_queries
+
+
+class TestSQLiteBackend:
+    """
+    Tests for running on an SQLite database file.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup(self, sqlite_app):
+        self.app = sqlite_app
+        self.writer = db.engines[None]
+        self.reader = db.engines[READER_BIND]
+        self.repository = BaseRepository(User)
+
+    def create_user(self, username: str = "alice", phone: str = "09123456781") -> User:
+        return self.repository.create(
+            {"username": username, "phone": phone, "password": "hash"}
+        )
+
+    def test_connections_are_tuned(self):
+        """
+        Both engines should use WAL, and only the readers should be read-only.
+        """
+        with self.writer.connect() as connection:
+            assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert connection.exec_driver_sql("PRAGMA query_only").scalar() == 0
+            assert connection.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+        with self.reader.connect() as connection:
+            assert connection.exec_driver_sql("PRAGMA query_only").scalar() == 1
+        assert self.writer.pool.size() == 1
+
+    def test_reads_use_readers_until_the_transaction_writes(self):
+        """
+        Reads should go to the readers, and stay on the writer once it is used.
+        """
+        query = select(User)
+        assert db.session.get_bind(mapper=User, clause=query) is self.reader
+
+        db.session.execute(update(User).values(password="other"))
+        assert db.session.get_bind(mapper=User, clause=query) is self.writer
+
+        db.session.commit()
+        assert db.session.get_bind(mapper=User, clause=query) is self.reader
+
+    def test_create_returns_row_without_refresh(self):
+        """
+        create should get the row back from the INSERT alone.
+        """
+        with max_queries(1):
+            user = self.create_user()
+            assert (user.id, user.version) == (1, 1)
+
+    def test_upsert_updates_conflicting_row(self):
+        """
+        upsert should update the row sharing the unique key instead of failing.
+        """
+        self.create_user()
+
+        user = self.repository.upsert(
+            {"username": "alice", "phone": "09123456782", "password": "hash"},
+            index_elements=["username"],
+        )
+
+        assert user.phone == "09123456782"
+        assert db.session.scalars(select(User)).all() == [user]
+
+    def test_estimate_count(self):
+        """
+        estimate_count should follow the number of inserted rows.
+        """
+        for i in range(3):
+            self.create_user(username=f"user{i}", phone=f"0912345678{i}")
+
+        assert self.repository.estimate_count() == 3